@@ -0,0 +1,100 @@
+"""Measure checkpoint overhead and check that resumed runs match.
+
+Run from the repository root (needs NumPy):
+
+    python benchmarks/bench_checkpoint.py
+
+The script times a run with checkpoints allowed every second (far more
+often than the 30 s default) against one without. The checkpointer still
+spaces writes so that they, final write included, fit half of the 1%
+budget; the run (about 30 s) is long enough for periodic writes as well
+as the final one, with room for slow fsyncs. It then stops a
+checkpointed run halfway, resumes it from the file and checks the final
+table is identical to the uninterrupted one. Exits with status 1 if the
+overhead exceeds 1% or the tables differ.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from blackjack_counter.checkpoint import Checkpointer  # noqa: E402
+from blackjack_counter.parallel import ParallelRunner, SimulationCancelled  # noqa: E402
+from blackjack_counter.simulation import TrueCountTask  # noqa: E402
+
+SEED = 20240601
+UNITS = 1_200
+UNIT_SHOES = 5_000
+INTERVAL = 1.0
+BUDGET = 0.01
+
+
+def main() -> None:
+    task = TrueCountTask("wong_halves", shoes_per_unit=UNIT_SHOES)
+    print(f"{UNITS} units x {UNIT_SHOES:,} shoes, checkpoint every {INTERVAL:g} s")
+
+    start = time.perf_counter()
+    reference = ParallelRunner(task, UNITS, SEED, workers=1).run()
+    plain = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "run.npz"
+
+        checkpointer = Checkpointer(path, task, SEED, UNITS, interval=INTERVAL)
+        initial, skip = checkpointer.resume()
+        runner = ParallelRunner(task, UNITS, SEED, workers=1, on_unit=checkpointer.on_unit)
+        start = time.perf_counter()
+        runner.run(skip=skip, initial=initial)
+        checkpointer.write()
+        checked = time.perf_counter() - start
+        size = path.stat().st_size
+        path.unlink()
+
+        # Interrupt halfway, then resume from the file in a fresh checkpointer.
+        first = Checkpointer(path, task, SEED, UNITS, interval=INTERVAL)
+        initial, skip = first.resume()
+
+        def stop_halfway(index: int, result: object) -> None:
+            first.on_unit(index, result)
+            if len(first.completed) == UNITS // 2:
+                runner.cancel()
+
+        runner = ParallelRunner(task, UNITS, SEED, workers=1, on_unit=stop_halfway)
+        try:
+            runner.run(skip=skip, initial=initial)
+        except SimulationCancelled:
+            pass
+        first.write()
+
+        second = Checkpointer(path, task, SEED, UNITS, interval=INTERVAL)
+        initial, skip = second.resume()
+        resumed = ParallelRunner(task, UNITS, SEED, workers=1, on_unit=second.on_unit).run(
+            skip=skip, initial=initial
+        )
+
+    # The final write counts: ``checked`` spans the run and that write.
+    overhead = checkpointer.write_seconds / checked
+    print(f"without checkpoints  {plain:>7.2f} s")
+    print(f"with checkpoints     {checked:>7.2f} s  ({checkpointer.writes} writes of {size:,} bytes)")
+    print(f"time spent writing   {checkpointer.write_seconds * 1000:>7.2f} ms  ({overhead:.3%} of the run)")
+    print(f"resumed after {len(skip)} of {UNITS} units")
+
+    failed = False
+    if not (np.array_equal(reference.counts, resumed.counts) and reference.shoes == resumed.shoes):
+        print("resumed run differs from the uninterrupted run")
+        failed = True
+    else:
+        print("resumed run matches the uninterrupted run")
+    if overhead > BUDGET:
+        print(f"checkpoint overhead is above the {BUDGET:.0%} budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
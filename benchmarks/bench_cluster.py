@@ -0,0 +1,76 @@
+"""Run a sweep through the TCP coordinator on localhost and check the results.
+
+Run from the repository root (needs NumPy):
+
+    python benchmarks/bench_cluster.py
+
+Starts a coordinator on a free port, launches several worker processes,
+kills one of them partway through so its units are re-queued, and checks
+the merged tables match a single-process ``ParallelRunner`` run with the
+same seed. Exits with status 1 on any mismatch.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from blackjack_counter.cluster import Coordinator, spawn_local_workers, sweep_jobs  # noqa: E402
+from blackjack_counter.parallel import ParallelRunner  # noqa: E402
+
+SEED = 20240601
+WORKERS = 3
+SHOES = 40_000
+UNIT_SHOES = 2_000
+SYSTEMS = ("hilo", "wong_halves")
+DECKS = (2, 6)
+PENETRATIONS = (0.75,)
+
+
+def main() -> None:
+    jobs = sweep_jobs(SYSTEMS, DECKS, PENETRATIONS, SHOES, UNIT_SHOES, SEED)
+    total_units = sum(job.units for job in jobs)
+    print(f"{len(jobs)} grid points x {jobs[0].units} units x {UNIT_SHOES:,} shoes, {WORKERS} workers")
+
+    start = time.perf_counter()
+    expected = [ParallelRunner(job.task, job.units, job.seed, workers=1).run() for job in jobs]
+    local = time.perf_counter() - start
+
+    coordinator = Coordinator(jobs, port=0, lease_units=2, timeout=30.0)
+    host, port = coordinator.address
+    outcome = {}
+    server = threading.Thread(target=lambda: outcome.setdefault("results", coordinator.serve()))
+    start = time.perf_counter()
+    server.start()
+    workers = spawn_local_workers(WORKERS, host, port)
+
+    # Kill one worker once the sweep is under way; its lease must be re-queued.
+    while coordinator.completed < total_units // 4 and server.is_alive():
+        time.sleep(0.01)
+    workers[0].kill()
+    server.join()
+    remote = time.perf_counter() - start
+    for process in workers[1:]:
+        process.wait(timeout=10)
+    workers[0].wait()
+
+    print(f"single process       {local:>7.2f} s")
+    print(f"coordinator + tcp    {remote:>7.2f} s  ({coordinator.requeued} units re-queued)")
+
+    mismatched = [
+        f"{job.task.system_key} {job.task.decks}d"
+        for job, want, got in zip(jobs, expected, outcome["results"])
+        if not (np.array_equal(want.counts, got.counts) and want.shoes == got.shoes)
+    ]
+    if mismatched:
+        print(f"results differ from the single-process run for {', '.join(mismatched)}")
+        sys.exit(1)
+    print("every grid point matches the single-process run")
+
+
+if __name__ == "__main__":
+    main()
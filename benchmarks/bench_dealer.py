@@ -0,0 +1,75 @@
+"""Time dealer outcome lookups while a six-deck shoe is dealt out.
+
+Run from the repository root:
+
+    python benchmarks/bench_dealer.py
+
+Each card of a shuffled shoe is recorded in a ``CountingState``; after every
+card the dealer distribution is looked up for all ten upcards (the first
+lookup for a new composition) and then again (the warm path the UI hits on
+every redraw). Reports latency percentiles, cache hit rate and cache size.
+"""
+
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.dealer import DealerEngine, remove_card, shoe_from_composition  # noqa: E402
+from blackjack_counter.state import RANKS, SUITS, CountingState  # noqa: E402
+from blackjack_counter.systems import HI_LO  # noqa: E402
+
+DECKS = 6
+SEED = 20240601
+PENETRATION = 0.9
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+    return statistics.median(ordered), p99, ordered[-1]
+
+
+def main() -> None:
+    cards = [rank for rank in RANKS for _ in range(SUITS * DECKS)]
+    random.Random(SEED).shuffle(cards)
+    dealt = int(len(cards) * PENETRATION)
+
+    state = CountingState(DECKS, system=HI_LO)
+    engine = DealerEngine()
+    first, warm = [], []
+    first_hits = first_misses = 0
+    for rank in cards[:dealt]:
+        state.record_card(rank)
+        shoe = shoe_from_composition(state.composition)
+        upcards = [(slot, remove_card(shoe, slot)) for slot in range(len(shoe)) if shoe[slot]]
+
+        hits, misses = engine.hits, engine.misses
+        for slot, rest in upcards:
+            start = time.perf_counter()
+            engine.outcomes(rest, slot)
+            first.append(time.perf_counter() - start)
+        first_hits += engine.hits - hits
+        first_misses += engine.misses - misses
+
+        for slot, rest in upcards:
+            start = time.perf_counter()
+            engine.outcomes(rest, slot)
+            warm.append(time.perf_counter() - start)
+
+    print(f"{dealt} cards of a {DECKS}-deck shoe, all upcards after each card")
+    for label, samples in (("new composition", first), ("warm lookup", warm)):
+        median, p99, worst = _percentiles(samples)
+        print(
+            f"{label:<16} median {median * 1e6:>8.1f} us  p99 {p99 * 1e6:>8.1f} us  max {worst * 1e6:>8.1f} us"
+        )
+    node_rate = first_hits / (first_hits + first_misses)
+    print(f"recursion nodes reused from earlier cards: {node_rate:.1%}")
+    print(f"overall cache hit rate {engine.hit_rate:.1%}, {engine.size:,} entries, {engine.evictions:,} evictions")
+
+
+if __name__ == "__main__":
+    main()
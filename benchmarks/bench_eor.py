@@ -0,0 +1,56 @@
+"""Time the effect-of-removal computation and bulk tag-table scoring.
+
+Run from the repository root:
+
+    python benchmarks/bench_eor.py
+
+Computes the single-deck EORs once, then scores the registered systems
+plus a batch of random candidate tag tables in one call and reports the
+best candidates by betting correlation.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.eor import compute_eor, score_tags, tag_matrix  # noqa: E402
+from blackjack_counter.state import RANKS  # noqa: E402
+from blackjack_counter.systems import RANK_INDEX, registered_systems  # noqa: E402
+
+CANDIDATES = 100_000
+SEED = 20240601
+
+
+def main() -> None:
+    start = time.perf_counter()
+    eor = compute_eor()
+    print(f"EORs for {len(eor.decisions)} index plays in {time.perf_counter() - start:.2f} s")
+
+    # Random level-2 systems, with 10/J/Q/K forced to share a tag.
+    rng = np.random.default_rng(SEED)
+    candidates = rng.integers(-2, 3, size=(CANDIDATES, len(RANKS))).astype(np.float64)
+    tens = [RANK_INDEX[rank] for rank in ("J", "Q", "K")]
+    candidates[:, tens] = candidates[:, [RANK_INDEX["10"]]]
+    systems = registered_systems()
+    tags = np.vstack([tag_matrix(systems), candidates])
+
+    start = time.perf_counter()
+    scores = score_tags(tags, eor)
+    elapsed = time.perf_counter() - start
+    print(f"scored {len(tags)} tag tables in {elapsed * 1000:.1f} ms")
+
+    best = np.argsort(-scores["betting"][len(systems):])[:3] + len(systems)
+    for index in best:
+        values = ",".join(f"{value:g}" for value in tags[index])
+        print(
+            f"BC {scores['betting'][index]:.3f} PE {scores['playing'][index]:.3f} "
+            f"IC {scores['insurance'][index]:.3f}  [{values}]"
+        )
+
+
+if __name__ == "__main__":
+    main()
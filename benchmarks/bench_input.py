@@ -0,0 +1,138 @@
+"""Check that key entry keeps up with fast typing.
+
+Run from the repository root:
+
+    python benchmarks/bench_input.py
+
+The first part needs no display: it times a burst of entries applied one
+at a time (a ``record`` plus the reads a redraw makes, per key) against
+the same burst applied with ``CountingState.record_many`` and one set of
+reads, as the frames now do.
+
+With a display it then opens the app on a Hi-Lo shoe and feeds it key
+presses through ``event_generate`` at ``RATE`` keys per second, then as
+one gapless burst, timing each key from the moment it is sent until the
+redraw that shows it. Exits with status 1 if a key is lost, recorded out
+of order, or the 95th-percentile latency exceeds one key interval.
+"""
+
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.state import CountingState  # noqa: E402
+from blackjack_counter.systems import HI_LO  # noqa: E402
+
+RATE = 60
+KEYS = 300
+BURST = 200
+KEY_CYCLE = (("l", "Low"), ("h", "Hi"), ("n", "Neutral"))
+HEADLESS_BURSTS = 2_000
+
+
+def _reads(state: CountingState) -> None:
+    state.running_count
+    state.true_count
+    state.cards_seen
+    state.composition
+    state.can_undo
+    state.can_redo
+
+
+def headless() -> None:
+    entries = [("Low", 1.0), ("Hi", -1.0), ("Neutral", 0.0)] * 4
+
+    state = CountingState(decks=6.0, system=HI_LO)
+    start = time.perf_counter()
+    for _ in range(HEADLESS_BURSTS):
+        for label, value in entries:
+            state.record(label, value)
+            _reads(state)
+        state.reset()
+    per_key = time.perf_counter() - start
+
+    state = CountingState(decks=6.0, system=HI_LO)
+    start = time.perf_counter()
+    for _ in range(HEADLESS_BURSTS):
+        state.record_many(entries)
+        _reads(state)
+        state.reset()
+    batched = time.perf_counter() - start
+
+    count = HEADLESS_BURSTS * len(entries)
+    print(f"state work, one redraw per key:   {per_key / count * 1e6:6.2f} us/key")
+    print(f"state work, one redraw per burst: {batched / count * 1e6:6.2f} us/key")
+
+
+def with_display() -> bool:
+    from blackjack_counter.app import CountingApp
+
+    try:
+        app = CountingApp()
+    except tk.TclError as error:
+        print(f"skipping the live test: {error}")
+        return True
+    app.start_mode("HiLoFrame")
+    frame = app.frames["HiLoFrame"]
+    app.update()
+    frame.focus_force()
+
+    expected: List[str] = []
+    sent: List[float] = []
+    latencies: List[float] = []
+    redraws = 0
+    original_show = frame._show_counts
+
+    def timed_show() -> None:
+        nonlocal redraws
+        original_show()
+        redraws += 1
+        now = time.perf_counter()
+        seen = len(latencies)
+        latencies.extend(now - stamp for stamp in sent[seen:frame.state.position])
+
+    frame._show_counts = timed_show  # type: ignore[method-assign]
+
+    def send(index: int) -> None:
+        keysym, label = KEY_CYCLE[index % len(KEY_CYCLE)]
+        expected.append(label)
+        sent.append(time.perf_counter())
+        frame.event_generate("<KeyPress>", keysym=keysym, when="tail")
+
+    interval_ms = 1000 // RATE
+    for index in range(KEYS):
+        app.after(index * interval_ms, send, index)
+    app.after(KEYS * interval_ms + 200, lambda: [send(KEYS + index) for index in range(BURST)])
+    app.after(KEYS * interval_ms + 1500, app.quit)
+    redraws_before_burst = 0
+
+    def mark() -> None:
+        nonlocal redraws_before_burst
+        redraws_before_burst = redraws
+
+    app.after(KEYS * interval_ms + 150, mark)
+    app.mainloop()
+
+    recorded = [entry.label for entry in frame.state.history]
+    app.destroy()
+    ordered = recorded == expected
+    paced = sorted(latencies[:KEYS]) or [float("inf")]
+    p95 = paced[int(0.95 * (len(paced) - 1))]
+    print(f"{len(recorded)}/{len(expected)} keys recorded, in order: {ordered}")
+    print(f"{RATE} keys/s: median {paced[len(paced) // 2] * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+    print(f"burst of {BURST} keys drawn in {redraws - redraws_before_burst} redraw(s)")
+    return ordered and p95 <= 1.0 / RATE
+
+
+def main() -> None:
+    headless()
+    if not with_display():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
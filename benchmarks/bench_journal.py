@@ -0,0 +1,123 @@
+"""Time session-journal replay and the cost of journaling each key press.
+
+Run from the repository root:
+
+    python benchmarks/bench_journal.py
+
+Writes a journal of ``ENTRIES`` entries (recorded in bursts, with undos,
+redos and slider seeks in between) through ``SessionJournal``, then times
+``replay`` plus ``CountingState.load`` and checks the rebuilt shoe matches
+the one that was journaled.
+
+The per-press cost is measured like real typing: ``PRESSES`` single
+``record`` calls spaced ``PRESS_GAP`` apart, each timed on its own, with a
+journal subscribed and with a no-op listener in its place.
+
+Exits with status 1 if replay takes longer than ``REPLAY_BUDGET`` seconds,
+the shoe differs, or journaling adds more than ``PRESS_BUDGET_US`` to the
+median press.
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.journal import SessionJournal, replay  # noqa: E402
+from blackjack_counter.state import RANKS, CountingState  # noqa: E402
+from blackjack_counter.systems import WONG_HALVES  # noqa: E402
+
+ENTRIES = 1_000_000
+BURST = 500
+PRESSES = 2_000
+PRESS_GAP = 0.0005
+REPLAY_BUDGET = 1.0
+PRESS_BUDGET_US = 2.0
+
+
+def write_journal(directory: Path) -> CountingState:
+    state = CountingState(decks=6.0, system=WONG_HALVES)
+    journal = SessionJournal.create(WONG_HALVES.key, 6.0, directory)
+    state.subscribe(journal.append)
+    burst = [(RANKS[index % len(RANKS)], None) for index in range(BURST)]
+    start = time.perf_counter()
+    while state.position < ENTRIES:
+        state.record_many(burst)
+        state.undo()
+        state.undo()
+        state.redo()
+        state.seek(state.position - 3)
+        state.seek(state.position + 1)
+    journal.close()
+    elapsed = time.perf_counter() - start
+    size = journal.path.stat().st_size
+    print(f"journaled {state.position:,} entries in {elapsed:.2f} s ({size / 1e6:.1f} MB)")
+    state.journal_path = journal.path  # type: ignore[attr-defined]
+    return state
+
+
+def time_replay(state: CountingState) -> bool:
+    path = state.journal_path  # type: ignore[attr-defined]
+    start = time.perf_counter()
+    shoe = replay(path)
+    replayed = time.perf_counter() - start
+    restored = CountingState(decks=shoe.decks, system=WONG_HALVES)
+    shoe.restore(restored)
+    total = time.perf_counter() - start
+
+    same = (
+        bytes(restored._codes) == bytes(state._codes)
+        and restored._halves == state._halves
+        and restored.position == state.position
+        and restored.running_count == state.running_count
+        and restored.composition == state.composition
+    )
+    print(f"replay {shoe.records:,} records: {replayed * 1000:.0f} ms, plus load: {total * 1000:.0f} ms "
+          f"(budget {REPLAY_BUDGET * 1000:.0f} ms)")
+    print(f"rebuilt shoe matches: {same}")
+    return same and total <= REPLAY_BUDGET
+
+
+def _press_times(state: CountingState) -> List[float]:
+    times = []
+    for index in range(PRESSES):
+        label = RANKS[index % len(RANKS)]
+        start = time.perf_counter()
+        state.record_card(label)
+        times.append(time.perf_counter() - start)
+        time.sleep(PRESS_GAP)
+    return times
+
+
+def time_presses(directory: Path) -> bool:
+    plain = CountingState(decks=6.0, system=WONG_HALVES)
+    plain.subscribe(lambda event: None)
+    baseline = statistics.median(_press_times(plain))
+
+    journaled = CountingState(decks=6.0, system=WONG_HALVES)
+    journal = SessionJournal.create(WONG_HALVES.key, 6.0, directory)
+    journaled.subscribe(journal.append)
+    with_journal = statistics.median(_press_times(journaled))
+    journal.close()
+
+    overhead = (with_journal - baseline) * 1e6
+    print(f"median press: {baseline * 1e6:.2f} us without a journal, {with_journal * 1e6:.2f} us with "
+          f"({overhead:+.2f} us, budget {PRESS_BUDGET_US:.1f} us)")
+    return overhead <= PRESS_BUDGET_US
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        state = write_journal(Path(directory))
+        ok = time_replay(state)
+        ok = time_presses(Path(directory)) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare history memory use before and after the compact storage.
+
+Run from the repository root:
+
+    python benchmarks/bench_memory.py
+
+The "before" column rebuilds the original layout (a list of dataclass
+entries, each holding a ``str`` label and a ``float`` value) so both layouts
+can be measured side by side with ``tracemalloc``.
+"""
+
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.state import CountingState  # noqa: E402
+
+ENTRIES = 1_000_000
+WONG_CYCLE = (("2", 0.5), ("5", 1.5), ("9", -0.5), ("K", -1.0), ("8", 0.0))
+
+
+@dataclass
+class LegacyCountEntry:
+    """The per-entry dataclass the history used to hold."""
+    label: str
+    value: float
+
+
+def _build_legacy() -> List[LegacyCountEntry]:
+    history: List[LegacyCountEntry] = []
+    for index in range(ENTRIES):
+        label, value = WONG_CYCLE[index % len(WONG_CYCLE)]
+        history.append(LegacyCountEntry(label, value))
+    return history
+
+
+def _build_compact() -> CountingState:
+    state = CountingState(decks=ENTRIES / 52.0)
+    for index in range(ENTRIES):
+        label, value = WONG_CYCLE[index % len(WONG_CYCLE)]
+        state.record(label, value)
+    return state
+
+
+def _measure(builder: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = builder()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    before = _measure(_build_legacy)
+    after = _measure(_build_compact)
+    print(f"{ENTRIES:,} entries")
+    print(f"  before (list of dataclasses): {before / 1e6:8.1f} MB  ({before / ENTRIES:5.1f} B/entry)")
+    print(f"  after  (compact arrays):      {after / 1e6:8.1f} MB  ({after / ENTRIES:5.1f} B/entry)")
+    print(f"  reduction: {before / max(after, 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure how the process-pool shoe simulation scales with worker count.
+
+Run from the repository root (needs NumPy):
+
+    python benchmarks/bench_parallel.py
+
+Every run uses the same seed and work units, so besides timing each worker
+count the script checks that all runs produce bit-identical tables.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from blackjack_counter.parallel import ParallelRunner  # noqa: E402
+from blackjack_counter.simulation import TrueCountTask  # noqa: E402
+
+SEED = 20240601
+UNIT_SHOES = 10_000
+
+
+def _worker_counts(cores: int):
+    count = 1
+    while count < cores:
+        yield count
+        count *= 2
+    yield cores
+
+
+def main() -> None:
+    cores = os.cpu_count() or 1
+    units = max(8, cores * 4)
+    task = TrueCountTask("hilo", shoes_per_unit=UNIT_SHOES)
+    print(f"{units} units x {UNIT_SHOES:,} shoes on {cores} core(s)")
+    print(f"{'workers':>7}  {'seconds':>8}  {'speedup':>7}  {'efficiency':>10}")
+
+    reference = None
+    baseline = None
+    for workers in _worker_counts(cores):
+        runner = ParallelRunner(task, units, SEED, workers=workers)
+        start = time.perf_counter()
+        table = runner.run()
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference, baseline = table.counts, elapsed
+        elif not np.array_equal(reference, table.counts):
+            print(f"results with {workers} workers differ from the 1-worker run")
+            sys.exit(1)
+
+        speedup = baseline / elapsed
+        print(f"{workers:>7}  {elapsed:>8.2f}  {speedup:>6.2f}x  {speedup / workers:>9.0%}")
+
+    print("all worker counts produced identical tables")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Count layout passes during a scripted window resize.
+
+Run from the repository root:
+
+    python benchmarks/bench_resize.py
+
+Opens the app on a Hi-Lo shoe and drags the window from full size down to
+the smallest scale and back in ``STEPS`` geometry changes, ``STEP_MS``
+apart (like a mouse drag), then waits for the resize to settle. Counts the
+layout passes, font rescales, font ``configure`` calls and panel
+measurements (layout cache misses) made, and the
+time spent in them. Needs a display; without one it re-runs itself under
+``xvfb-run`` when available and is skipped otherwise.
+
+Exits with status 1 if the drag caused more than one layout pass per
+settle, or the fonts did not end at full size.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tkinter as tk
+import tkinter.font as tkfont
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.app import LAYOUT_SETTLE_MS, CountingApp  # noqa: E402
+
+STEPS = 120
+STEP_MS = 8
+SMALLEST = (700, 200)
+
+
+def run() -> bool:
+    try:
+        app = CountingApp()
+    except tk.TclError as error:
+        print(f"skipping: {error}")
+        return True
+    app.start_mode("HiLoFrame")
+    # Let the startup layout pass run before counting.
+    app.after(LAYOUT_SETTLE_MS * 3, app.quit)
+    app.mainloop()
+
+    counts = {"layout": 0, "rescale": 0, "font": 0, "measured": 0}
+    spent = 0.0
+    original_layout = app._layout_pass
+    original_rescale = app._apply_font_scale
+    original_font_configure = tkfont.Font.configure
+    original_apply = app.layout.apply
+
+    def layout_pass() -> None:
+        nonlocal spent
+        counts["layout"] += 1
+        start = time.perf_counter()
+        original_layout()
+        app.update_idletasks()
+        spent += time.perf_counter() - start
+
+    def apply_font_scale(scale: float) -> None:
+        counts["rescale"] += 1
+        original_rescale(scale)
+
+    def apply_layout(bucket):
+        measured = original_apply(bucket)
+        counts["measured"] += measured
+        return measured
+
+    def font_configure(font, *args, **kwargs):
+        if kwargs:
+            counts["font"] += 1
+        return original_font_configure(font, *args, **kwargs)
+
+    app._layout_pass = layout_pass  # type: ignore[method-assign]
+    app._apply_font_scale = apply_font_scale  # type: ignore[method-assign]
+    app.layout.apply = apply_layout  # type: ignore[method-assign]
+    tkfont.Font.configure = font_configure  # type: ignore[method-assign]
+
+    full_width, full_height = app._base_window_size
+    half = STEPS // 2
+    sizes = []
+    for index in range(STEPS + 1):
+        fraction = abs(index - half) / half
+        width = round(SMALLEST[0] + (full_width - SMALLEST[0]) * fraction)
+        height = round(SMALLEST[1] + (full_height - SMALLEST[1]) * fraction)
+        sizes.append((width, height))
+    # Pause halfway so the small size settles once.
+    for index, (width, height) in enumerate(sizes):
+        delay = index * STEP_MS + (LAYOUT_SETTLE_MS * 3 if index > half else 0)
+        app.after(delay, app.geometry, f"{width}x{height}")
+    app.after(len(sizes) * STEP_MS + LAYOUT_SETTLE_MS * 6, app.quit)
+    app.mainloop()
+
+    ended_full = all(
+        font.cget("size") == spec[1] for font, spec in zip(app._fonts.values(), app._base_fonts.values())
+    )
+    app.destroy()
+    tkfont.Font.configure = original_font_configure  # type: ignore[method-assign]
+
+    settles = 2
+    print(f"{len(sizes)} geometry changes, {settles} settles")
+    print(f"layout passes: {counts['layout']}, font rescales: {counts['rescale']}, font configures: {counts['font']}")
+    print(f"panel widths measured: {counts['measured']} (the rest came from the layout cache)")
+    print(f"time in layout passes: {spent * 1000:.1f} ms")
+    print(f"fonts back at full size: {ended_full}")
+    return counts["layout"] <= settles and ended_full
+
+
+def main() -> None:
+    if not os.environ.get("DISPLAY") and not os.environ.get("BENCH_RESIZE_CHILD"):
+        xvfb = shutil.which("xvfb-run")
+        if xvfb is None:
+            print("skipped (no display and no xvfb-run)")
+            return
+        env = dict(os.environ, BENCH_RESIZE_CHILD="1")
+        sys.exit(subprocess.run([xvfb, "-a", sys.executable, __file__], env=env).returncode)
+    if not run():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
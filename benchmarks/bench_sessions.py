@@ -0,0 +1,122 @@
+"""Time the columnar session export and the streaming analytics.
+
+Run from the repository root (needs NumPy):
+
+    python benchmarks/bench_sessions.py
+
+Writes ``SESSIONS`` synthetic session journals (a few shoes each, with
+undos and corrections at ``ERROR_RATE``), exports them to column files,
+then aggregates them with one worker and with ``WORKERS``. Also compares
+the peak memory of aggregating a tenth of the files against all of them.
+
+Exits with status 1 if the parallel and serial totals differ, the
+corrections found do not match the ones written, or aggregating all files
+needs more than ``MEMORY_GROWTH`` times the memory of a tenth of them.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from blackjack_counter.journal import HEADER, MAGIC, OP_RECORD, OP_RESET, OP_UNDO  # noqa: E402
+from blackjack_counter.sessions import JOURNAL_RECORD, export, summarize  # noqa: E402
+from blackjack_counter.systems import HI_LO  # noqa: E402
+
+SESSIONS = 2_000
+SHOES_PER_SESSION = 3
+CARDS_PER_SHOE = 234
+ERROR_RATE = 0.02
+WORKERS = min(8, os.cpu_count() or 1)
+MEMORY_GROWTH = 1.5
+SEED = 7
+
+
+def write_journals(directory: Path, rng: np.random.Generator) -> int:
+    """Synthetic Hi-Lo journals; returns how many corrections they contain."""
+
+    table = np.array(HI_LO.table, dtype=np.int8)
+    corrections = 0
+    for session in range(SESSIONS):
+        rows = []
+        elapsed = 0
+        for _ in range(SHOES_PER_SESSION):
+            ranks = rng.permutation(np.repeat(np.arange(13), 24))[:CARDS_PER_SHOE]
+            gaps = rng.integers(400, 4_000, size=CARDS_PER_SHOE)
+            mistakes = rng.random(CARDS_PER_SHOE) < ERROR_RATE
+            for position, (rank, gap, mistake) in enumerate(zip(ranks, gaps, mistakes)):
+                elapsed += int(gap)
+                if mistake:
+                    # A wrong key, taken back and entered again.
+                    wrong = (rank + 1) % 13
+                    rows.append((OP_RECORD, wrong, table[wrong], 0, elapsed))
+                    rows.append((OP_UNDO, 0, 0, 0, position))
+                    corrections += 1
+                rows.append((OP_RECORD, rank, table[rank], 0, elapsed))
+            rows.append((OP_RESET, 0, 0, 0, 0))
+        records = np.array(rows, dtype=JOURNAL_RECORD)
+        with open(directory / f"session-{session:06d}.bjj", "wb") as handle:
+            handle.write(HEADER.pack(MAGIC, HI_LO.key.encode("ascii"), 6.0, 1.7e9 + session * 3600))
+            handle.write(records.tobytes())
+    return corrections
+
+
+def peak_memory(paths) -> int:
+    tracemalloc.start()
+    summarize(paths, workers=1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    rng = np.random.default_rng(SEED)
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        journals = root / "journals"
+        journals.mkdir()
+        start = time.perf_counter()
+        corrections = write_journals(journals, rng)
+        print(f"wrote {SESSIONS:,} journals in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        paths, _ = export(sorted(journals.glob("*.bjj")), root / "columns")
+        elapsed = time.perf_counter() - start
+        size = sum(path.stat().st_size for path in paths)
+        print(f"export: {len(paths):,} files in {elapsed:.2f} s ({len(paths) / elapsed:,.0f} files/s, {size / 1e6:.1f} MB)")
+
+        start = time.perf_counter()
+        serial = summarize(paths, workers=1)
+        serial_time = time.perf_counter() - start
+        start = time.perf_counter()
+        parallel = summarize(paths, workers=WORKERS)
+        parallel_time = time.perf_counter() - start
+        print(f"stats, 1 worker:  {serial_time:.2f} s ({len(paths) / serial_time:,.0f} files/s)")
+        print(f"stats, {WORKERS} worker(s): {parallel_time:.2f} s ({len(paths) / parallel_time:,.0f} files/s)")
+
+        totals = serial[HI_LO.key]
+        other = parallel[HI_LO.key]
+        same = (
+            np.array_equal(totals.cards, other.cards)
+            and np.array_equal(totals.dwell_ms, other.dwell_ms)
+            and totals.rewrites == other.rewrites
+        )
+        print(f"parallel totals match serial: {same}")
+        print(f"corrections found: {totals.rewrites:,} of {corrections:,} written ({totals.error_rate:.2%} of entries)")
+
+        small = peak_memory(paths[: len(paths) // 10])
+        large = peak_memory(paths)
+        print(f"peak memory: {small / 1e6:.2f} MB for {len(paths) // 10:,} files, {large / 1e6:.2f} MB for {len(paths):,}")
+
+    if not same or totals.rewrites != corrections or large > MEMORY_GROWTH * small:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Time vectorized shuffle generation and the count-information score.
+
+Run from the repository root:
+
+    python benchmarks/bench_shuffles.py
+
+Shuffles a batch of 6-deck shoes with whole-stack and handful riffles,
+then scores the full procedure grid from ``shuffles.procedure_grid``.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.shuffles import evaluate, procedure_grid, riffle, strip  # noqa: E402
+
+DECKS = 6
+ROWS = 20_000
+GRID_TRIALS = 200
+SEED = 20240601
+
+
+def main() -> None:
+    rng = np.random.default_rng(SEED)
+    stacks = np.tile(np.arange(DECKS * 52, dtype=np.int32), (ROWS, 1))
+    for label, step in (
+        ("whole-stack riffle", lambda rows: riffle(rows, rng)),
+        ("52-card handful riffle", lambda rows: riffle(rows, rng, 52)),
+        ("8-packet strip", lambda rows: strip(rows, rng, np.full(len(rows), 8.0))),
+    ):
+        start = time.perf_counter()
+        step(stacks)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24}{ROWS / elapsed:>12,.0f} shoes/s")
+
+    models = procedure_grid(DECKS)
+    start = time.perf_counter()
+    evaluate(models, DECKS, trials=GRID_TRIALS, seed=SEED)
+    elapsed = time.perf_counter() - start
+    print(f"scored {len(models)} procedures x {GRID_TRIALS} trials in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
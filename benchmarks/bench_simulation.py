@@ -0,0 +1,46 @@
+"""Measure single-core throughput of the NumPy shoe simulator.
+
+Run from the repository root (needs NumPy):
+
+    python benchmarks/bench_simulation.py
+
+The target is at least 1,000,000 six-deck shoes per minute on one core.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from blackjack_counter.simulation import ShoeSimulator  # noqa: E402
+from blackjack_counter.systems import HI_LO, WONG_HALVES  # noqa: E402
+
+SHOES = 200_000
+TARGET_PER_MINUTE = 1_000_000
+
+
+def main() -> None:
+    failed = False
+    for system in (HI_LO, WONG_HALVES):
+        simulator = ShoeSimulator(system, decks=6)
+        rng = np.random.default_rng(2024)
+        simulator.run(simulator.batch_size, rng)  # warm-up
+
+        start = time.perf_counter()
+        table = simulator.run(SHOES, rng)
+        elapsed = time.perf_counter() - start
+
+        per_minute = table.shoes / elapsed * 60
+        status = "ok" if per_minute >= TARGET_PER_MINUTE else "BELOW TARGET"
+        failed |= per_minute < TARGET_PER_MINUTE
+        print(f"{system.name:<12} {table.shoes:,} shoes in {elapsed:.2f}s  ->  {per_minute:,.0f} shoes/min  [{status}]")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Time application startup against a budget.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py
+
+Each measurement runs in a fresh interpreter:
+
+* import time of ``blackjack_counter.app`` (median of ``RUNS``), plus a
+  check that the counting frames and the strategy engine are not imported
+  until a counting screen is opened,
+* time from interpreter start to the first ``<Expose>`` of the window,
+  using the current display or ``xvfb-run`` when there is none (skipped
+  if neither is available).
+
+Exits with status 1 when a budget is exceeded or a deferred module is
+imported at startup.
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 5
+IMPORT_BUDGET = 0.15
+PAINT_BUDGET = 1.0
+DEFERRED = ("blackjack_counter.frames.base", "blackjack_counter.strategy", "blackjack_counter.dealer", "numpy")
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import blackjack_counter.app
+print(time.perf_counter() - start)
+print(",".join(name for name in {deferred!r} if name in sys.modules))
+"""
+
+PAINT_SCRIPT = """
+import time
+start = time.perf_counter()
+from blackjack_counter.app import CountingApp
+
+app = CountingApp()
+
+def painted(event):
+    print(time.perf_counter() - start, flush=True)
+    app.unbind("<Expose>")
+    app.after_idle(app.destroy)
+
+app.bind("<Expose>", painted)
+app.after(10_000, app.destroy)
+app.mainloop()
+"""
+
+
+def _run(command: List[str]) -> Optional[List[str]]:
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit {result.returncode}")
+        return None
+    return result.stdout.splitlines()
+
+
+def measure_import() -> bool:
+    times = []
+    loaded = ""
+    for _ in range(RUNS):
+        lines = _run([sys.executable, "-c", IMPORT_SCRIPT.format(deferred=DEFERRED)])
+        if lines is None:
+            return False
+        times.append(float(lines[0]))
+        loaded = lines[1] if len(lines) > 1 else ""
+    median = statistics.median(times)
+    print(f"import blackjack_counter.app: {median * 1000:.1f} ms (budget {IMPORT_BUDGET * 1000:.0f} ms)")
+    if loaded:
+        print(f"imported at startup but should be deferred: {loaded}")
+    return median <= IMPORT_BUDGET and not loaded
+
+
+def measure_paint() -> bool:
+    command = [sys.executable, "-c", PAINT_SCRIPT]
+    if not os.environ.get("DISPLAY"):
+        xvfb = shutil.which("xvfb-run")
+        if xvfb is None:
+            print("time to first paint: skipped (no display and no xvfb-run)")
+            return True
+        command = [xvfb, "-a"] + command
+    times = []
+    for _ in range(RUNS):
+        lines = _run(command)
+        if not lines:
+            return False
+        times.append(float(lines[0]))
+    median = statistics.median(times)
+    print(f"time to first paint: {median * 1000:.1f} ms (budget {PAINT_BUDGET * 1000:.0f} ms)")
+    return median <= PAINT_BUDGET
+
+
+def main() -> None:
+    ok = measure_import()
+    ok = measure_paint() and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
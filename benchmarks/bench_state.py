@@ -0,0 +1,64 @@
+"""Measure the per-press cost of CountingState as the history grows.
+
+Run from the repository root:
+
+    python benchmarks/bench_state.py
+
+Each row fills a fresh shoe to the given size, then times the work a single
+key press triggers: one ``record`` plus the reads ``BaseModeFrame.refresh``
+makes. The cost should stay flat from the first row to the last.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.state import CountingState  # noqa: E402
+
+SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+PRESSES = 2_000
+WONG_CYCLE = (("2", 0.5), ("5", 1.5), ("9", -0.5), ("K", -1.0), ("8", 0.0))
+
+
+def _fill(state: CountingState, size: int) -> None:
+    for index in range(size):
+        label, value = WONG_CYCLE[index % len(WONG_CYCLE)]
+        state.record(label, value)
+
+
+def _time_presses(state: CountingState) -> float:
+    """Return the mean seconds for one record/refresh-read/undo/redo cycle."""
+
+    start = time.perf_counter()
+    for index in range(PRESSES):
+        label, value = WONG_CYCLE[index % len(WONG_CYCLE)]
+        state.record(label, value)
+        state.running_count
+        state.true_count
+        state.cards_seen
+        state.undo()
+        state.redo()
+    return (time.perf_counter() - start) / PRESSES
+
+
+def main() -> None:
+    print(f"{'entries':>10}  {'us/press':>9}")
+    baseline = None
+    for size in SIZES:
+        state = CountingState(decks=max(6.0, size / 52.0))
+        _fill(state, size)
+        per_press = _time_presses(state)
+        baseline = baseline or per_press
+        print(f"{size:>10}  {per_press * 1e6:>9.2f}  ({per_press / baseline:.2f}x)")
+
+    # Half-unit storage keeps long Wong Halves sessions exact.
+    state = CountingState()
+    _fill(state, 1_000_000)
+    expected = sum(value for _, value in WONG_CYCLE) * (1_000_000 // len(WONG_CYCLE))
+    print(f"running count after 1M Wong entries: {state.running_count} (expected {expected})")
+
+
+if __name__ == "__main__":
+    main()
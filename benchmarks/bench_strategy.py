@@ -0,0 +1,62 @@
+"""Time a full strategy-table rebuild after every card of a six-deck shoe.
+
+Run from the repository root:
+
+    python benchmarks/bench_strategy.py
+
+Each card of a shuffled shoe is recorded in a ``CountingState`` and the
+whole chart (hard, soft and pair hands against every upcard) is rebuilt
+for the new composition. Exits with status 1 if the median rebuild takes
+longer than the 100 ms budget.
+"""
+
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.dealer import shoe_from_composition  # noqa: E402
+from blackjack_counter.state import RANKS, SUITS, CountingState  # noqa: E402
+from blackjack_counter.strategy import Rules, StrategyEngine  # noqa: E402
+from blackjack_counter.systems import WONG_HALVES  # noqa: E402
+
+DECKS = 6
+SEED = 20240601
+PENETRATION = 0.85
+BUDGET = 0.100
+
+
+def main() -> None:
+    cards = [rank for rank in RANKS for _ in range(SUITS * DECKS)]
+    random.Random(SEED).shuffle(cards)
+    dealt = int(len(cards) * PENETRATION)
+
+    for rules in (Rules(), Rules(hits_soft_17=True, surrender=True, resplit_aces=True)):
+        state = CountingState(DECKS, system=WONG_HALVES)
+        engine = StrategyEngine(rules)
+        timings = []
+        for rank in cards[:dealt]:
+            state.record_card(rank)
+            shoe = shoe_from_composition(state.composition)
+            start = time.perf_counter()
+            engine.table(shoe)
+            timings.append(time.perf_counter() - start)
+
+        timings.sort()
+        median = statistics.median(timings)
+        p99 = timings[min(len(timings) - 1, int(0.99 * len(timings)))]
+        name = "H17, LS, RSA" if rules.hits_soft_17 else "S17, DAS"
+        print(
+            f"{name:<13} {dealt} rebuilds: median {median * 1000:6.1f} ms  "
+            f"p99 {p99 * 1000:6.1f} ms  max {timings[-1] * 1000:6.1f} ms"
+        )
+        if median > BUDGET:
+            print(f"median rebuild is over the {BUDGET * 1000:.0f} ms budget")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Track full-table round throughput against the 10M rounds/minute budget.
+
+Run from the repository root:
+
+    python benchmarks/bench_table.py
+
+Plays batches of six-deck shoes at a five-seat table on one core with the
+default rules and with H17, surrender and 6:5 blackjacks, then reports
+rounds and seat-hands per minute for the best of a few repeats. Exits with
+status 1 if either falls below the budget.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from blackjack_counter.table_sim import TableTask, strategy_arrays  # noqa: E402
+
+SEED = 20240601
+SHOES = 16_384
+REPEATS = 3
+BUDGET = 10_000_000
+
+
+def main() -> None:
+    failed = False
+    for name, task in (
+        ("S17, DAS, 3:2", TableTask(shoes_per_unit=SHOES)),
+        ("H17, LS, 6:5", TableTask(hits_soft_17=True, surrender=True, blackjack_payout=1.2, shoes_per_unit=SHOES)),
+    ):
+        strategy_arrays(task.decks, task.rules)
+        best = 0.0
+        for repeat in range(REPEATS):
+            start = time.perf_counter()
+            sums = task.run_unit(np.random.default_rng([SEED, repeat]))
+            elapsed = time.perf_counter() - start
+            best = max(best, sums.rounds / elapsed * 60)
+        print(
+            f"{name:<14} {best / 1e6:6.1f}M rounds/min  {best * task.seats / 1e6:6.1f}M hands/min  "
+            f"edge {sums.edge():+.3%}"
+        )
+        failed |= best < BUDGET
+    if failed:
+        print(f"throughput is under the {BUDGET / 1e6:.0f}M rounds/min budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 ﻿"""Application bootstrap and top-level window management."""
 
 import tkinter as tk
+import tkinter.font as tkfont
+from functools import partial
 from tkinter import ttk
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from pathlib import Path
-import sys
 
-from blackjack_counter.frames.hilo import HiLoFrame
+from blackjack_counter.assets import find_asset
 from blackjack_counter.frames.menu import ModeSelection, StartMenu
-from blackjack_counter.frames.wong import WongHalvesFrame
+from blackjack_counter.journal import JournalError, SessionJournal, latest_session, replay
+from blackjack_counter.layout import LayoutCache, size_bucket
 from blackjack_counter.state import CountingState
+from blackjack_counter.systems import HI_LO, WONG_HALVES, CountingSystem, registered_systems
+
+# Systems with a hand-built layout (by frame name); every other registered
+# system gets a RankCountFrame.
+DEDICATED_FRAMES = {HI_LO.key: "HiLoFrame", WONG_HALVES.key: "WongHalvesFrame"}
+
+# Resizes are handled once the window has stopped changing for this long.
+LAYOUT_SETTLE_MS = 80
 
 
 class CountingApp(tk.Tk):
@@ -23,9 +33,20 @@ class CountingApp(tk.Tk):
         self.minsize(620, 160)
         self._base_window_size = (1231, 294)
         self._current_font_scale = 1.0
+        self._layout_after: Optional[str] = None
+        # (label, container, padding) whose wraplength follows the container width.
+        self._wrapped_labels: List[Tuple[ttk.Label, tk.Widget, int]] = []
+        # Panel widths measured once per frame and window-size bucket.
+        self.layout = LayoutCache()
+
+        # Journal of the shoe being counted, so it survives a crash.
+        self._journal: Optional[SessionJournal] = None
+        self._unsubscribe_journal: Optional[Callable[[], None]] = None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self._icon_image: Optional[tk.PhotoImage] = None
-        self._apply_icon()
+        # Decoding the icon can wait until the first screen is drawn.
+        self.after_idle(self._apply_icon)
         self._init_style()
         self._configure_responsive_fonts()
 
@@ -33,18 +54,55 @@ class CountingApp(tk.Tk):
         container.pack(fill="both", expand=True)
         container.grid_rowconfigure(0, weight=1)
         container.grid_columnconfigure(0, weight=1)
+        self._container = container
 
+        # Frames are built the first time they are shown; until then only their factory exists.
         self.frames: Dict[str, ttk.Frame] = {}
+        self._factories: Dict[str, Callable[[], ttk.Frame]] = {
+            "StartMenu": lambda: StartMenu(container, self),
+            "ModeSelection": lambda: ModeSelection(container, self),
+        }
         self._current_frame: Optional[ttk.Frame] = None
-        for frame_cls in (StartMenu, ModeSelection, HiLoFrame, WongHalvesFrame):
-            frame = frame_cls(container, self)
-            self.frames[frame_cls.__name__] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        # Maps each registered system key to the name of the frame that counts it.
+        self._system_frames: Dict[str, str] = {}
+        for system in registered_systems():
+            name = DEDICATED_FRAMES.get(system.key, system.key)
+            self._factories[name] = partial(self._build_system_frame, system)
+            self._system_frames[system.key] = name
 
+        # One binding for every shortcut; the shown frame's keymap decides what a key does.
+        self.bind("<KeyPress>", self._dispatch_key)
         self.show_frame("StartMenu")
 
+    def frame(self, name: str) -> ttk.Frame:
+        """The frame called ``name``, built on first use."""
+
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = self._factories[name]()
+            self.frames[name] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
+        return frame
+
+    def _build_system_frame(self, system: CountingSystem) -> ttk.Frame:
+        # The counting frames (and the strategy engine behind them) are
+        # imported here so startup only loads the menus.
+        name = DEDICATED_FRAMES.get(system.key)
+        if name == "HiLoFrame":
+            from blackjack_counter.frames.hilo import HiLoFrame
+
+            return HiLoFrame(self._container, self)
+        if name == "WongHalvesFrame":
+            from blackjack_counter.frames.wong import WongHalvesFrame
+
+            return WongHalvesFrame(self._container, self)
+        from blackjack_counter.frames.ranks import RankCountFrame
+
+        return RankCountFrame(self._container, self, system=system)
+
     def _init_style(self) -> None:
         style = ttk.Style(self)
+        self._style = style
         self._base_fonts = {
             "Headline.TLabel": ("Segoe UI", 24, "bold"),
             "Subheadline.TLabel": ("Segoe UI", 16),
@@ -58,8 +116,13 @@ class CountingApp(tk.Tk):
             "Card.TButton": (6, 4),
         }
 
-        for style_name, font_spec in self._base_fonts.items():
-            style.configure(style_name, font=font_spec)
+        # One named font per style: rescaling is one configure per font, and
+        # Tk updates every widget using it in a single relayout.
+        self._fonts: Dict[str, tkfont.Font] = {}
+        for style_name, (family, size, *extras) in self._base_fonts.items():
+            font = tkfont.Font(self, family=family, size=size, weight="bold" if "bold" in extras else "normal")
+            self._fonts[style_name] = font
+            style.configure(style_name, font=font)
 
         for style_name, padding in self._base_paddings.items():
             style.configure(style_name, padding=padding)
@@ -68,35 +131,71 @@ class CountingApp(tk.Tk):
         self.bind("<Configure>", self._on_main_configure, add="+")
 
     def _on_main_configure(self, event: tk.Event) -> None:
-        if event.widget is not self:
-            return
+        if event.widget is self:
+            self.schedule_layout()
+
+    def schedule_layout(self) -> None:
+        """Run one layout pass once resizing has settled."""
+
+        if self._layout_after is not None:
+            self.after_cancel(self._layout_after)
+        self._layout_after = self.after(LAYOUT_SETTLE_MS, self._layout_pass)
+
+    def track_wraplength(self, label: ttk.Label, container: tk.Widget, padding: int = 18) -> None:
+        """Keep ``label`` wrapping at the width of ``container``, updated in the layout pass."""
 
-        width = max(1, event.width)
-        height = max(1, event.height)
+        self._wrapped_labels.append((label, container, padding))
+        container.bind("<Configure>", lambda _event: self.schedule_layout(), add="+")
+        self.schedule_layout()
+
+    def track_column_minsize(self, owner: str, key: str, manager: tk.Misc, column: int, source: tk.Widget) -> None:
+        """Keep a grid column at least as wide as ``source``, using cached widths."""
+
+        self.layout.track_column(owner, key, manager, column, source)
+        source.bind("<Configure>", lambda _event: self.schedule_layout(), add="+")
+        self.schedule_layout()
+
+    def _layout_pass(self) -> None:
+        """Rescale the fonts, rewrap labels and size columns for the current window size."""
+
+        self._layout_after = None
+        width = max(1, self.winfo_width())
+        height = max(1, self.winfo_height())
         base_width, base_height = self._base_window_size
         scale = min(width / base_width, height / base_height)
         scale = max(0.7, min(1.0, scale))
-        if abs(scale - self._current_font_scale) < 0.02:
-            return
+        if abs(scale - self._current_font_scale) >= 0.02:
+            self._current_font_scale = scale
+            self._apply_font_scale(scale)
+            # Measure against the rescaled fonts, once for the whole pass.
+            self.update_idletasks()
 
-        self._current_font_scale = scale
-        self._apply_font_scale(scale)
+        self.layout.apply(size_bucket(width, height))
+
+        for label, container, padding in self._wrapped_labels:
+            if not label.winfo_exists():
+                continue
+            width = max(60, container.winfo_width() - padding)
+            if int(label.cget("wraplength") or 0) != width:
+                label.configure(wraplength=width)
 
     def _apply_font_scale(self, scale: float) -> None:
-        style = ttk.Style(self)
         for style_name, font_spec in self._base_fonts.items():
-            family = font_spec[0]
-            size = font_spec[1]
-            extras = font_spec[2:]
-            new_size = max(8, round(size * scale))
-            style.configure(style_name, font=(family, new_size, *extras))
+            new_size = max(8, round(font_spec[1] * scale))
+            font = self._fonts[style_name]
+            if font.cget("size") != new_size:
+                font.configure(size=new_size)
 
         for style_name, padding in self._base_paddings.items():
             scaled_padding = tuple(max(2, round(value * scale)) for value in padding)
-            style.configure(style_name, padding=scaled_padding)
+            self._style.configure(style_name, padding=scaled_padding)
+
+    def _dispatch_key(self, event: tk.Event) -> Optional[str]:
+        handle_key = getattr(self._current_frame, "handle_key", None)
+        return handle_key(event) if handle_key is not None else None
 
     def show_frame(self, name: str) -> None:
-        frame = self.frames[name]
+        frame = self.frame(name)
 
         if self._current_frame is not None and hasattr(self._current_frame, "on_hide"):
             self._current_frame.on_hide()  # type: ignore[call-arg]
@@ -109,15 +208,98 @@ class CountingApp(tk.Tk):
         self._current_frame = frame
 
     def start_mode(self, frame_name: str, decks: float = 6.0) -> None:
-        frame = self.frames[frame_name]
+        frame = self.frame(frame_name)
         if hasattr(frame, "set_state"):
-            frame.set_state(CountingState(decks=decks))  # type: ignore[attr-defined]
+            state = frame.new_state(decks)  # type: ignore[attr-defined]
+            frame.set_state(state)  # type: ignore[attr-defined]
+            if state.system is not None:
+                try:
+                    journal: Optional[SessionJournal] = SessionJournal.create(state.system.key, decks)
+                except (JournalError, OSError):
+                    # Counting still works without a journal; the shoe just is not crash-safe.
+                    journal = None
+                self._journal_state(state, journal)
         self.show_frame(frame_name)
 
+    def last_session(self) -> Optional[Path]:
+        """Journal of the most recent shoe with entries, if there is one."""
+
+        return latest_session()
+
+    def resume_last_session(self) -> bool:
+        """Rebuild the most recent shoe from its journal and keep counting it.
+
+        Returns False, leaving the shoe being counted and its journal as they
+        were, if there is no journal to resume or it cannot be restored.
+        """
+
+        if self._journal is not None:
+            # The shoe being counted may be the latest one; get its queued changes on disk first.
+            self._journal.flush()
+        path = latest_session()
+        if path is None:
+            return False
+        try:
+            shoe = replay(path)
+        except (JournalError, OSError):
+            return False
+        frame_name = self._system_frames.get(shoe.system_key)
+        if frame_name is None:
+            return False
+        journal = self._journal
+        if journal is None or journal.path != path:
+            try:
+                journal = SessionJournal.resume(path, shoe)
+            except (JournalError, OSError):
+                return False
+        frame = self.frame(frame_name)
+        state = frame.new_state(shoe.decks)  # type: ignore[attr-defined]
+        shoe.restore(state)
+        frame.set_state(state)  # type: ignore[attr-defined]
+        self._journal_state(state, journal)
+        self.show_frame(frame_name)
+        return True
+
+    def _journal_state(self, state: CountingState, journal: Optional[SessionJournal]) -> None:
+        """Journal ``state``'s changes to ``journal`` instead of the previous shoe's."""
+
+        if journal is not self._journal:
+            self._close_journal()
+        elif self._unsubscribe_journal is not None:
+            # Same file, new state: only the subscription moves.
+            self._unsubscribe_journal()
+            self._unsubscribe_journal = None
+        self._journal = journal
+        if journal is not None:
+            self._unsubscribe_journal = state.subscribe(journal.append)
+
+    def _close_journal(self) -> None:
+        if self._unsubscribe_journal is not None:
+            self._unsubscribe_journal()
+            self._unsubscribe_journal = None
+        journal, self._journal = self._journal, None
+        if journal is None:
+            return
+        journal.close()
+        try:
+            if journal.path.stat().st_size <= journal.header_size:
+                journal.path.unlink()
+        except OSError:
+            pass
+
+    def _on_close(self) -> None:
+        self._close_journal()
+        self.destroy()
+
+    def start_system(self, system_key: str, decks: float = 6.0) -> None:
+        """Open a fresh shoe for the registered counting system ``system_key``."""
+
+        self.start_mode(self._system_frames[system_key], decks)
+
     def _apply_icon(self) -> None:
         """Attach the table icon to the window when available."""
 
-        icon_path = self._find_asset('blackjack_by_freepik.png')
+        icon_path = find_asset('blackjack_by_freepik.png')
         if icon_path is None:
             return
         try:
@@ -126,17 +308,3 @@ class CountingApp(tk.Tk):
             return
         self._icon_image = icon
         self.iconphoto(True, icon)
-
-    def _find_asset(self, filename: str) -> Optional[Path]:
-        """Resolve asset path both in dev and PyInstaller bundles."""
-
-        candidates = []
-        if hasattr(sys, '_MEIPASS'):
-            candidates.append(Path(sys._MEIPASS) / 'assets' / filename)
-        candidates.append(Path(__file__).resolve().parent.parent / 'assets' / filename)
-        for candidate in candidates:
-            if candidate.exists():
-                return candidate
-        return None
-
-
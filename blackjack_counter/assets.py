@@ -0,0 +1,18 @@
+"""Locate files shipped under ``assets/``."""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+
+def find_asset(filename: str) -> Optional[Path]:
+    """Resolve a file under ``assets/`` both in dev and PyInstaller bundles."""
+
+    candidates = []
+    if hasattr(sys, "_MEIPASS"):
+        candidates.append(Path(sys._MEIPASS) / "assets" / filename)
+    candidates.append(Path(__file__).resolve().parent.parent / "assets" / filename)
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return None
@@ -0,0 +1,389 @@
+"""Bet-ramp optimizer with a batched risk-of-ruin simulator.
+
+The betting model is built per counting system, deck count and penetration:
+
+* true-count frequencies come from dealing shoes as in ``simulation``,
+* the edge in each true-count bucket is the mean linear EOR estimate of
+  the remaining shoe (``eor``): the base edge for the full shoe plus the
+  single-deck EORs of the cards already dealt, divided by the decks left,
+* the per-hand variance is a constant (1.3 by default).
+
+Candidate ramps (spread, slope and pivot, see ``bet_ramps.Ramp``) are
+scored for win rate and variance with two matrix products. The best ones
+are then checked against the risk-of-ruin limit with batched bankroll
+paths, and the highest win rate that passes is kept. Bets are in units of
+the table minimum, so the bankroll is too. Hands are drawn independently
+from the true-count distribution, which ignores how counts drift within a
+shoe.
+
+``python -m blackjack_counter.bet_optimizer --write`` regenerates
+``assets/ramps.json``, which the frames read through ``bet_ramps``.
+"""
+
+import argparse
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from blackjack_counter.bet_ramps import RAMPS_FILE, Ramp
+from blackjack_counter.dealer import full_shoe
+from blackjack_counter.eor import EffectsOfRemoval, compute_eor, round_ev
+from blackjack_counter.parallel import new_seed
+from blackjack_counter.simulation import (
+    DEFAULT_BATCH_SIZE,
+    TC_MAX,
+    TC_MIN,
+    cut_positions,
+    deal_shoes,
+    decks_left_after,
+    true_count_buckets,
+)
+from blackjack_counter.strategy import Rules, StrategyEngine
+from blackjack_counter.systems import CountingSystem, get_system, registered_systems
+
+HAND_VARIANCE = 1.3
+DEFAULT_BANKROLL = 2000.0
+DEFAULT_ROR = 0.05
+DEFAULT_ROUNDS = 200_000
+DEFAULT_PATHS = 1_000
+DEFAULT_SHOES = 20_000
+BLOCK_ROUNDS = 50
+STEP_CHUNK = 100
+# Only ramps within this factor of the limit by the closed-form estimate
+# are worth simulating.
+SCREEN_FACTOR = 1.25
+SIMULATION_BATCH = 32
+
+SPREADS: Tuple[int, ...] = tuple(range(1, 21))
+SLOPES: Tuple[float, ...] = (0.5, 1.0, 1.5, 2.0, 3.0, 4.0)
+# Unbalanced counts (KO, Red 7) sit below zero at a neutral shoe.
+PIVOTS: Tuple[float, ...] = (-4.0, -3.0, -2.0, -1.0, 0.0, 1.0, 2.0)
+GENERATED_DECKS: Dict[int, float] = {1: 0.65, 2: 0.7, 6: 0.75, 8: 0.75}
+
+
+@dataclass
+class BettingModel:
+    """Per-bucket frequency, edge and variance for one system and shoe."""
+
+    system_key: str
+    decks: int
+    penetration: float
+    true_counts: np.ndarray
+    frequencies: np.ndarray
+    edges: np.ndarray
+    variances: np.ndarray
+
+    def format(self) -> str:
+        lines = ["TC".rjust(5) + "freq".rjust(9) + "edge".rjust(9)]
+        for true_count, frequency, edge in zip(self.true_counts, self.frequencies, self.edges):
+            if frequency >= 0.0005:
+                lines.append(f"{true_count:>+5d}{frequency:>9.2%}{edge:>+9.2%}")
+        return "\n".join(lines)
+
+
+@dataclass
+class RampChoice:
+    ramp: Ramp
+    units: np.ndarray
+    win_rate: float
+    sd: float
+    rounds: int
+    lifetime_ror: float
+    simulated_ror: float
+
+    def format(self) -> str:
+        return (
+            f"{self.ramp.describe()}: {self.win_rate:+.4f} units/round, SD {self.sd:.2f}, "
+            f"RoR {self.simulated_ror:.2%} over {self.rounds:,} rounds ({self.lifetime_ror:.2%} lifetime)"
+        )
+
+
+def betting_model(
+    system: CountingSystem,
+    decks: int,
+    penetration: float,
+    base_edge: float,
+    eor: EffectsOfRemoval,
+    *,
+    shoes: int = DEFAULT_SHOES,
+    rng: Optional[np.random.Generator] = None,
+    hand_variance: float = HAND_VARIANCE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> BettingModel:
+    """Deal ``shoes`` shoes and average the estimated edge per true-count bucket."""
+
+    rng = rng if rng is not None else np.random.default_rng()
+    buckets_total = TC_MAX - TC_MIN + 1
+    deal_to = cut_positions(decks, (penetration,))[0]
+    # Centred so a full deck moves the edge by nothing.
+    effects = np.asarray(eor.overall) - np.mean(eor.overall)
+    divisor = decks_left_after(decks)[:deal_to]
+    counts = np.zeros(buckets_total, dtype=np.int64)
+    edge_sums = np.zeros(buckets_total)
+    remaining = shoes
+    while remaining > 0:
+        batch = min(batch_size, remaining)
+        dealt = deal_shoes(rng, decks, batch)[:, :deal_to]
+        buckets = true_count_buckets(dealt, system, decks).ravel()
+        shifts = (np.cumsum(effects[dealt], axis=1) / divisor).ravel()
+        counts += np.bincount(buckets, minlength=buckets_total)
+        edge_sums += np.bincount(buckets, weights=shifts, minlength=buckets_total)
+        remaining -= batch
+
+    frequencies = counts / counts.sum()
+    edges = base_edge + np.divide(edge_sums, counts, out=np.zeros(buckets_total), where=counts > 0)
+    return BettingModel(
+        system.key,
+        decks,
+        penetration,
+        np.arange(TC_MIN, TC_MAX + 1),
+        frequencies,
+        edges,
+        np.full(buckets_total, hand_variance),
+    )
+
+
+def candidate_ramps(
+    spreads: Sequence[int] = SPREADS, slopes: Sequence[float] = SLOPES, pivots: Sequence[float] = PIVOTS
+) -> List[Ramp]:
+    return [Ramp(spread, slope, pivot) for spread in spreads for slope in slopes for pivot in pivots]
+
+
+def ramp_units(ramps: Sequence[Ramp], true_counts: np.ndarray) -> np.ndarray:
+    """Units bet per bucket, one row per ramp; matches ``Ramp.units``."""
+
+    spread = np.array([ramp.spread for ramp in ramps], dtype=np.float64)[:, None]
+    slope = np.array([ramp.slope for ramp in ramps])[:, None]
+    pivot = np.array([ramp.pivot for ramp in ramps])[:, None]
+    raw = np.floor(1.0 + slope * (true_counts[None, :] - pivot) + 0.5)
+    return np.clip(raw, 1.0, spread)
+
+
+def _normal_cdf(values: np.ndarray) -> np.ndarray:
+    return np.vectorize(lambda value: 0.5 * math.erfc(-value / math.sqrt(2.0)), otypes=[float])(values)
+
+
+def closed_form_ror(
+    win_rate: np.ndarray, variance: np.ndarray, bankroll: float, rounds: Optional[int] = None
+) -> np.ndarray:
+    """Risk of ruin for a Brownian bankroll, over ``rounds`` rounds or a lifetime."""
+
+    win_rate = np.asarray(win_rate, dtype=np.float64)
+    variance = np.maximum(np.asarray(variance, dtype=np.float64), 1e-12)
+    with np.errstate(over="ignore"):
+        lifetime = np.where(win_rate > 0, np.exp(-2.0 * np.maximum(win_rate, 0.0) * bankroll / variance), 1.0)
+        if rounds is None:
+            return lifetime
+        spread = np.sqrt(variance * rounds)
+        drift = win_rate * rounds
+        finite = _normal_cdf((-bankroll - drift) / spread) + np.exp(
+            -2.0 * win_rate * bankroll / variance
+        ) * _normal_cdf((-bankroll + drift) / spread)
+    return np.clip(np.nan_to_num(finite, nan=1.0, posinf=1.0), 0.0, 1.0)
+
+
+def simulate_ror(
+    units: np.ndarray,
+    model: BettingModel,
+    bankroll: float,
+    *,
+    rounds: int = DEFAULT_ROUNDS,
+    paths: int = DEFAULT_PATHS,
+    seed: int = 0,
+) -> np.ndarray:
+    """Share of ``paths`` bankrolls each ramp loses within ``rounds`` rounds.
+
+    ``units`` holds one ramp per row (see ``ramp_units``). Paths advance
+    ``BLOCK_ROUNDS`` rounds at a time: the true counts of a block are one
+    multinomial draw, and with normal hand results the block total given
+    those counts is normal, so a single matrix product moves every path of
+    every ramp. Ruin inside a block is caught with the Brownian-bridge
+    crossing probability. All ramps share the same draws, so they compare
+    on common random numbers.
+    """
+
+    units = np.atleast_2d(units)
+    rng = np.random.default_rng(seed)
+    means = (units * model.edges).T.astype(np.float32)
+    variances = (units ** 2 * model.variances).T.astype(np.float32)
+    bank = np.full((paths, len(units)), bankroll, dtype=np.float32)
+    broke = np.zeros((paths, len(units)), dtype=bool)
+    steps = -(-rounds // BLOCK_ROUNDS)
+    for start in range(0, steps, STEP_CHUNK):
+        chunk = min(STEP_CHUNK, steps - start)
+        counts = rng.multinomial(BLOCK_ROUNDS, model.frequencies, size=(paths, chunk)).astype(np.float32)
+        block_variance = counts @ variances
+        totals = counts @ means
+        totals += np.sqrt(block_variance) * rng.standard_normal((paths, chunk, 1), dtype=np.float32)
+
+        path = np.cumsum(totals, axis=1)
+        path += bank[:, None, :]
+        before = np.concatenate([bank[:, None, :], path[:, :-1]], axis=1)
+        crossing = np.exp(
+            -2.0 * np.maximum(before, 0.0) * np.maximum(path, 0.0) / np.maximum(block_variance, 1e-6)
+        )
+        crossed = rng.random((paths, chunk, 1), dtype=np.float32) < crossing
+        broke |= ((path <= 0.0) | crossed).any(axis=1)
+        bank = path[:, -1]
+    return broke.mean(axis=0)
+
+
+def optimize_ramp(
+    model: BettingModel,
+    bankroll: float = DEFAULT_BANKROLL,
+    ror_limit: float = DEFAULT_ROR,
+    *,
+    ramps: Optional[Sequence[Ramp]] = None,
+    rounds: int = DEFAULT_ROUNDS,
+    paths: int = DEFAULT_PATHS,
+    seed: int = 0,
+) -> Optional[RampChoice]:
+    """Highest-win-rate ramp whose simulated risk of ruin is within ``ror_limit``."""
+
+    ramps = list(ramps) if ramps is not None else candidate_ramps()
+    units = ramp_units(ramps, model.true_counts)
+    # Ramps that bet identically in every bucket need scoring only once.
+    _, first = np.unique(units, axis=0, return_index=True)
+    first = np.sort(first)
+    units = units[first]
+    ramps = [ramps[index] for index in first]
+
+    win_rates = units @ (model.frequencies * model.edges)
+    variances = (units ** 2) @ (model.frequencies * model.variances)
+    lifetime = closed_form_ror(win_rates, variances, bankroll)
+    estimate = closed_form_ror(win_rates, variances, bankroll, rounds)
+
+    order = np.argsort(-win_rates, kind="stable")
+    order = order[(win_rates[order] > 0) & (estimate[order] <= ror_limit * SCREEN_FACTOR)]
+    # Simulate the best-paying ramps a batch at a time until one is safe.
+    for start in range(0, order.size, SIMULATION_BATCH):
+        batch = order[start:start + SIMULATION_BATCH]
+        simulated = simulate_ror(units[batch], model, bankroll, rounds=rounds, paths=paths, seed=seed)
+        for index, ror in zip(batch, simulated):
+            if ror <= ror_limit:
+                return RampChoice(
+                    ramps[index],
+                    units[index],
+                    float(win_rates[index]),
+                    float(np.sqrt(variances[index])),
+                    rounds,
+                    float(lifetime[index]),
+                    float(ror),
+                )
+    return None
+
+
+def base_edge(decks: int, rules: Rules) -> float:
+    """Off-the-top player edge for ``decks`` decks, from the exact EV engine."""
+
+    return round_ev(StrategyEngine(rules), full_shoe(decks))[0]
+
+
+def default_output() -> Path:
+    return Path(__file__).resolve().parent.parent / "assets" / RAMPS_FILE
+
+
+def write_ramps(path: Path, choices: Dict[str, Dict[int, RampChoice]], generated: Dict[str, object]) -> None:
+    """Save the chosen ramps as JSON for ``bet_ramps.load_ramp_tables``."""
+
+    payload = {
+        "version": 1,
+        "generated": generated,
+        "systems": {
+            system_key: {
+                str(decks): {
+                    "spread": choice.ramp.spread,
+                    "slope": choice.ramp.slope,
+                    "pivot": choice.ramp.pivot,
+                    "win_rate": round(choice.win_rate, 5),
+                    "ror": round(choice.simulated_ror, 4),
+                }
+                for decks, choice in by_decks.items()
+            }
+            for system_key, by_decks in choices.items()
+        },
+    }
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(json.dumps(payload, indent=1) + "\n", encoding="utf-8")
+    temporary.replace(path)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--system",
+        action="append",
+        dest="systems",
+        choices=[system.key for system in registered_systems()],
+        help="system to optimize; repeat for several (default: hilo, or all with --write)",
+    )
+    parser.add_argument("--decks", type=int, default=6, help="decks per shoe (default: 6)")
+    parser.add_argument("--penetration", type=float, default=0.75, help="fraction dealt (default: 0.75)")
+    parser.add_argument("--bankroll", type=float, default=DEFAULT_BANKROLL, help="bankroll in minimum bets")
+    parser.add_argument("--max-spread", type=int, default=12, help="largest bet in minimum bets (default: 12)")
+    parser.add_argument("--ror", type=float, default=DEFAULT_ROR, help="risk-of-ruin limit (default: 0.05)")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="rounds per bankroll path")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS, help="bankroll paths per ramp")
+    parser.add_argument("--shoes", type=int, default=DEFAULT_SHOES, help="shoes for the true-count model")
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help=f"optimize every system for {', '.join(map(str, GENERATED_DECKS))} decks and write the lookup table",
+    )
+    parser.add_argument("--out", type=Path, default=default_output(), help="JSON file for --write")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    seed = args.seed if args.seed is not None else new_seed()
+    rules = Rules(hits_soft_17=args.h17)
+    eor = compute_eor(1, rules)
+    if args.write:
+        systems = args.systems or [system.key for system in registered_systems()]
+        setups = dict(GENERATED_DECKS)
+    else:
+        systems = args.systems or ["hilo"]
+        setups = {args.decks: args.penetration}
+
+    ramps = candidate_ramps(spreads=range(1, args.max_spread + 1))
+    choices: Dict[str, Dict[int, RampChoice]] = {}
+    for decks, penetration in setups.items():
+        edge = base_edge(decks, rules)
+        for system_key in systems:
+            rng = np.random.default_rng([seed, decks])
+            model = betting_model(get_system(system_key), decks, penetration, edge, eor, shoes=args.shoes, rng=rng)
+            choice = optimize_ramp(
+                model, args.bankroll, args.ror, ramps=ramps, rounds=args.rounds, paths=args.paths, seed=seed
+            )
+            label = f"{system_key}, {decks} deck{'s' if decks > 1 else ''} at {penetration:.0%}"
+            if choice is None:
+                print(f"{label}: no ramp wins within a {args.ror:.0%} risk of ruin")
+                continue
+            print(f"{label}: {choice.format()}")
+            if not args.write:
+                print(model.format())
+            choices.setdefault(system_key, {})[decks] = choice
+
+    if args.write:
+        generated = {
+            "penetrations": {str(decks): penetration for decks, penetration in setups.items()},
+            "bankroll": args.bankroll,
+            "max_spread": args.max_spread,
+            "ror": args.ror,
+            "rounds": args.rounds,
+            "hits_soft_17": args.h17,
+            "seed": seed,
+        }
+        write_ramps(args.out, choices, generated)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Bet ramps (bet size by true count) and their precomputed lookup table.
+
+A ramp bets one unit (the table minimum) until the true count passes its
+pivot, then adds ``slope`` units per true count up to ``spread`` units.
+The ramps the frames show are chosen per counting system and deck count by
+``python -m blackjack_counter.bet_optimizer`` and shipped as
+``assets/ramps.json``; like ``deviations``, this module is pure Python so
+the UI only ever does a dict lookup.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from blackjack_counter.assets import find_asset
+from blackjack_counter.deviations import TC_MAX, TC_MIN
+
+RAMPS_FILE = "ramps.json"
+
+
+@dataclass(frozen=True)
+class Ramp:
+    """Linear ramp from one unit to ``spread`` units, in whole units."""
+
+    spread: int
+    slope: float
+    pivot: float
+
+    def units(self, true_count: float) -> int:
+        raw = 1.0 + self.slope * (true_count - self.pivot)
+        return int(min(self.spread, max(1, math.floor(raw + 0.5))))
+
+    def describe(self) -> str:
+        return f"1-{self.spread} spread, +{self.slope:g} per TC above {self.pivot:+g}"
+
+
+class RampTable:
+    """One ramp, pre-evaluated for every whole true count."""
+
+    def __init__(self, ramp: Ramp) -> None:
+        self.ramp = ramp
+        self._by_bucket: Dict[int, int] = {
+            bucket: ramp.units(bucket) for bucket in range(TC_MIN, TC_MAX + 1)
+        }
+
+    def units(self, true_count: float) -> int:
+        bucket = min(TC_MAX, max(TC_MIN, math.floor(true_count)))
+        return self._by_bucket[bucket]
+
+
+_RAMPS: Optional[Dict[str, Dict[int, RampTable]]] = None
+
+
+def _parse_ramps(data: Mapping) -> Dict[str, Dict[int, RampTable]]:
+    tables: Dict[str, Dict[int, RampTable]] = {}
+    for system_key, by_decks in data.get("systems", {}).items():
+        for decks, entry in by_decks.items():
+            ramp = Ramp(int(entry["spread"]), float(entry["slope"]), float(entry["pivot"]))
+            tables.setdefault(system_key, {})[int(decks)] = RampTable(ramp)
+    return tables
+
+
+def load_ramp_tables(path: Optional[Path] = None) -> Dict[str, Dict[int, RampTable]]:
+    """Read ``assets/ramps.json`` once; missing or unreadable files give no ramps."""
+
+    global _RAMPS
+    if path is None and _RAMPS is not None:
+        return _RAMPS
+    source = path or find_asset(RAMPS_FILE)
+    tables: Dict[str, Dict[int, RampTable]] = {}
+    if source is not None:
+        try:
+            with open(source, encoding="utf-8") as handle:
+                tables = _parse_ramps(json.load(handle))
+        except (OSError, ValueError, KeyError, TypeError):
+            tables = {}
+    if path is None:
+        _RAMPS = tables
+    return tables
+
+
+def ramp_table(system_key: str, decks: float) -> Optional[RampTable]:
+    """The ramp for ``system_key`` at the generated deck count nearest ``decks``."""
+
+    by_decks = load_ramp_tables().get(system_key)
+    if not by_decks:
+        return None
+    nearest = min(by_decks, key=lambda generated: (abs(generated - decks), generated))
+    return by_decks[nearest]
+
+
+def format_bet(units: int) -> str:
+    return f"Bet {units} unit" if units == 1 else f"Bet {units} units"
@@ -0,0 +1,184 @@
+"""Periodic, atomic checkpoints for long simulation runs.
+
+A checkpoint is a single ``.npz`` file holding:
+
+* the run description (task fields, seed, unit count) as JSON, used to
+  refuse resuming with different settings,
+* a bitmap of the work units already merged, and
+* the merged accumulator arrays.
+
+Each unit draws from its own ``SeedSequence(seed, spawn_key=(i,))``
+substream (see ``parallel``), so the seed plus the set of finished units is
+the complete RNG state of the run: a resumed run deals exactly the shoes the
+interrupted one had left and ends with the same totals.
+
+Files are written to a temporary sibling, flushed, then moved into place
+with ``os.replace``, so a crash mid-write leaves the previous checkpoint
+intact. Writes are spaced so their total cost, including the final write
+at the end of the run, stays under ``overhead_budget`` of the run time.
+"""
+
+import dataclasses
+import io
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple, Union
+
+import numpy as np
+
+FORMAT_VERSION = 1
+DEFAULT_INTERVAL = 30.0
+DEFAULT_OVERHEAD_BUDGET = 0.01
+# Assumed cost of one fsync'd write until a real one has been timed; fsync
+# on a busy disk often takes tens of milliseconds.
+DEFAULT_WRITE_ESTIMATE = 0.05
+# Writes are planned against this share of the budget; fsync times vary a
+# lot, so the rest absorbs writes slower than the estimate.
+BUDGET_HEADROOM = 0.5
+
+
+class CheckpointMismatch(ValueError):
+    """The checkpoint on disk belongs to a run with different settings."""
+
+
+def describe_run(task: Any, seed: int, units: int) -> Dict[str, Any]:
+    """JSON-friendly description that identifies a run."""
+
+    return {
+        "version": FORMAT_VERSION,
+        "task_type": type(task).__qualname__,
+        "task": dataclasses.asdict(task),
+        "seed": str(seed),
+        "units": units,
+    }
+
+
+def _normalise(description: Dict[str, Any]) -> str:
+    return json.dumps(description, sort_keys=True)
+
+
+def save(path: Union[str, Path], description: Dict[str, Any], completed: Set[int], accumulator: Any) -> None:
+    """Atomically write a checkpoint to ``path``."""
+
+    path = Path(path)
+    units = description["units"]
+    done = np.zeros(units, dtype=bool)
+    if completed:
+        done[np.fromiter(completed, dtype=np.int64, count=len(completed))] = True
+
+    arrays = {f"acc_{name}": value for name, value in accumulator.arrays().items()}
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        description=np.frombuffer(_normalise(description).encode("utf-8"), dtype=np.uint8),
+        completed=np.packbits(done),
+        **arrays,
+    )
+
+    temporary = path.with_name(f".{path.name}.tmp")
+    with open(temporary, "wb") as handle:
+        handle.write(buffer.getbuffer())
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+def load(
+    path: Union[str, Path], description: Dict[str, Any], accumulator: Any
+) -> Set[int]:
+    """Restore ``accumulator`` from ``path`` and return the finished unit indexes.
+
+    Raises ``CheckpointMismatch`` if the file was written for another run.
+    """
+
+    with np.load(Path(path)) as data:
+        stored = bytes(data["description"]).decode("utf-8")
+        if stored != _normalise(description):
+            raise CheckpointMismatch(f"{path} was written for a different run: {stored}")
+        done = np.unpackbits(data["completed"], count=description["units"]).astype(bool)
+        accumulator.load_arrays(
+            {name[len("acc_"):]: data[name] for name in data.files if name.startswith("acc_")}
+        )
+    return set(np.flatnonzero(done).tolist())
+
+
+class Checkpointer:
+    """Track finished units and write checkpoints on a self-limiting schedule.
+
+    Pass ``on_unit`` to ``ParallelRunner`` and the accumulator returned by
+    ``resume`` as the runner's ``initial`` value; the runner merges into
+    that object, so it always holds the totals for ``completed``.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        task: Any,
+        seed: int,
+        units: int,
+        *,
+        interval: float = DEFAULT_INTERVAL,
+        overhead_budget: float = DEFAULT_OVERHEAD_BUDGET,
+        write_estimate: float = DEFAULT_WRITE_ESTIMATE,
+    ) -> None:
+        self.path = Path(path)
+        self.description = describe_run(task, seed, units)
+        self.interval = interval
+        self.overhead_budget = overhead_budget
+        self.accumulator = task.empty()
+        self.completed: Set[int] = set()
+        self.write_seconds = 0.0
+        self.writes = 0
+        self._write_estimate = write_estimate
+        self._started = time.perf_counter()
+        self._last_write = self._started
+        self._dirty = False
+
+    def resume(self) -> Tuple[Any, Set[int]]:
+        """Load any existing checkpoint; returns the accumulator and finished units."""
+
+        if self.path.exists():
+            self.completed = load(self.path, self.description, self.accumulator)
+        return self.accumulator, set(self.completed)
+
+    def on_unit(self, index: int, result: Any) -> None:
+        """Runner callback: note the unit and write if one is due."""
+
+        self.completed.add(index)
+        self._dirty = True
+        if self._due():
+            self.write()
+
+    def write(self) -> None:
+        """Write the current totals now, if anything changed since the last write."""
+
+        if not self._dirty:
+            return
+        start = time.perf_counter()
+        save(self.path, self.description, self.completed, self.accumulator)
+        finished = time.perf_counter()
+        self.write_seconds += finished - start
+        self._write_estimate = max(self._write_estimate, finished - start)
+        self.writes += 1
+        self._last_write = finished
+        self._dirty = False
+
+    @property
+    def overhead(self) -> float:
+        """Fraction of the elapsed time spent writing checkpoints."""
+
+        elapsed = time.perf_counter() - self._started
+        return self.write_seconds / elapsed if elapsed > 0 else 0.0
+
+    def _due(self) -> bool:
+        now = time.perf_counter()
+        if now - self._last_write < self.interval:
+            return False
+        # Write only if this write and the final one in ``write()`` would
+        # still fit the planned share of the budget for the time elapsed so
+        # far. The estimate is the slowest write seen, seeded before the
+        # first one is timed.
+        planned = self.write_seconds + 2 * self._write_estimate
+        return planned <= BUDGET_HEADROOM * self.overhead_budget * (now - self._started)
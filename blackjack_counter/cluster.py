@@ -0,0 +1,606 @@
+"""Spread simulation sweeps over several machines with a TCP coordinator.
+
+The coordinator owns a list of jobs (a task, a seed and a number of work
+units, exactly as ``parallel.ParallelRunner`` would run them) and leases
+short ranges of unit indexes to whichever worker asks next. Workers run
+each unit with the same ``parallel.unit_rng`` substream a local run would
+use and stream every unit's accumulator back as soon as it is done, so the
+merged tables match a single-process run with the same seed bit for bit.
+
+If a worker disconnects or goes quiet for longer than ``timeout``, the
+units of its lease that never came back are queued again. Results are
+keyed by ``(job, unit)`` and merged at most once.
+
+Messages are length-prefixed JSON; accumulators travel as their
+``arrays()`` (see ``checkpoint``), base64-encoded. Tasks are rebuilt on
+the worker from their dataclass fields, so only types registered with
+``register_task`` can be sent and nothing is unpickled off the network.
+
+Two kinds of sweep are built in: true-count frequency tables
+(``simulation.TrueCountTask``) per counting system, deck count and
+penetration, and with ``--table`` full rounds (``table_sim.TableTask``)
+over a grid of table rules, deck counts and penetrations, each bucketed by
+every chosen system.
+
+Try it on one machine with::
+
+    python -m blackjack_counter.cluster coordinator --port 5555 --system hilo --system wong_halves --spawn 3
+    python -m blackjack_counter.cluster coordinator --seed 1 --table --soft17 stand --soft17 hit --payout 1.5 --payout 1.2 --spawn 3
+
+or start ``python -m blackjack_counter.cluster worker --host HOST --port 5555``
+on other machines.
+"""
+
+import argparse
+import base64
+import dataclasses
+import itertools
+import json
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Type
+
+import numpy as np
+
+from blackjack_counter.parallel import unit_rng
+from blackjack_counter.simulation import (
+    DEFAULT_PENETRATIONS,
+    DEFAULT_UNIT_SHOES,
+    TrueCountTask,
+    print_progress,
+    units_for,
+)
+from blackjack_counter.systems import get_system, registered_systems
+from blackjack_counter.table_sim import DEFAULT_SYSTEMS as TABLE_SYSTEMS
+from blackjack_counter.table_sim import DEFAULT_UNIT_SHOES as TABLE_UNIT_SHOES
+from blackjack_counter.table_sim import TableTask
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 5555
+DEFAULT_LEASE_UNITS = 2
+DEFAULT_TIMEOUT = 120.0
+# Largest message accepted, so a confused peer cannot make us allocate
+# arbitrarily large buffers.
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+WAIT_SECONDS = 0.5
+
+_HEADER = struct.Struct("!I")
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ProtocolError(Exception):
+    """A peer sent something that does not follow the protocol."""
+
+
+@dataclasses.dataclass
+class Job:
+    """One task of a sweep: ``units`` work units of ``task`` seeded with ``seed``."""
+
+    task: Any
+    seed: int
+    units: int
+
+
+# --------------------------------------------------------------------------
+# Wire format
+
+
+_TASK_TYPES: Dict[str, Type[Any]] = {}
+
+
+def register_task(cls: Type[Any]) -> Type[Any]:
+    """Allow dataclass tasks of type ``cls`` to be sent to workers."""
+
+    _TASK_TYPES[cls.__name__] = cls
+    return cls
+
+
+register_task(TrueCountTask)
+register_task(TableTask)
+
+
+def encode_task(task: Any) -> Dict[str, Any]:
+    name = type(task).__name__
+    if _TASK_TYPES.get(name) is not type(task):
+        raise TypeError(f"{name} is not registered with register_task")
+    return {"type": name, "fields": dataclasses.asdict(task)}
+
+
+def decode_task(payload: Mapping[str, Any]) -> Any:
+    try:
+        cls = _TASK_TYPES[payload["type"]]
+    except KeyError:
+        raise ProtocolError(f"unknown task type {payload.get('type')!r}") from None
+    # JSON turns tuples into lists; the task dataclasses are frozen and
+    # hashable, so turn them back.
+    fields = {
+        name: tuple(value) if isinstance(value, list) else value
+        for name, value in payload["fields"].items()
+    }
+    return cls(**fields)
+
+
+def encode_arrays(arrays: Mapping[str, np.ndarray]) -> Dict[str, Any]:
+    encoded = {}
+    for name, value in arrays.items():
+        value = np.asarray(value)
+        encoded[name] = {
+            "dtype": value.dtype.str,
+            "shape": list(value.shape),
+            "data": base64.b64encode(value.tobytes()).decode("ascii"),
+        }
+    return encoded
+
+
+def decode_arrays(payload: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    arrays = {}
+    for name, value in payload.items():
+        data = base64.b64decode(value["data"])
+        arrays[name] = np.frombuffer(data, dtype=np.dtype(value["dtype"])).reshape(tuple(value["shape"]))
+    return arrays
+
+
+def send_message(sock: socket.socket, message: Mapping[str, Any]) -> None:
+    data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    if size > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"message of {size} bytes is too large")
+    try:
+        message = json.loads(_recv_exactly(sock, size).decode("utf-8"))
+    except ValueError as error:
+        raise ProtocolError(f"malformed message: {error}") from None
+    if not isinstance(message, dict) or "type" not in message:
+        raise ProtocolError("message has no type")
+    return message
+
+
+# --------------------------------------------------------------------------
+# Coordinator
+
+
+class Coordinator:
+    """Lease work units of ``jobs`` to TCP workers and merge what comes back."""
+
+    def __init__(
+        self,
+        jobs: Sequence[Job],
+        *,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        lease_units: int = DEFAULT_LEASE_UNITS,
+        timeout: float = DEFAULT_TIMEOUT,
+        progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        self.jobs = list(jobs)
+        self.lease_units = max(1, lease_units)
+        self.timeout = timeout
+        self.progress = progress
+        self.results = [job.task.empty() for job in self.jobs]
+        self.requeued = 0
+        self._encoded = [encode_task(job.task) for job in self.jobs]
+        self._pending: Deque[Tuple[int, int, int]] = deque(
+            (job_index, start, min(start + self.lease_units, job.units))
+            for job_index, job in enumerate(self.jobs)
+            for start in range(0, job.units, self.lease_units)
+        )
+        self._done: Set[Tuple[int, int]] = set()
+        self._total = sum(job.units for job in self.jobs)
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if not self._total:
+            self._finished.set()
+
+        self._listener = socket.create_server((host, port))
+        self._listener.settimeout(0.25)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host and port workers should connect to (useful with ``port=0``)."""
+
+        return self._listener.getsockname()[:2]
+
+    @property
+    def completed(self) -> int:
+        with self._lock:
+            return len(self._done)
+
+    def serve(self) -> List[Any]:
+        """Accept workers until every unit is merged; returns one result per job."""
+
+        threads = []
+        try:
+            while not self._finished.is_set():
+                try:
+                    conn, _ = self._listener.accept()
+                except socket.timeout:
+                    continue
+                thread = threading.Thread(target=self._serve_worker, args=(conn,), daemon=True)
+                thread.start()
+                threads.append(thread)
+        finally:
+            self._listener.close()
+        # Give connected workers the chance to hear that the sweep is over.
+        for thread in threads:
+            thread.join(timeout=1.0)
+        return self.results
+
+    def _next_lease(self) -> Optional[Tuple[int, int, int]]:
+        with self._lock:
+            while self._pending:
+                job_index, start, stop = self._pending.popleft()
+                # Skip units that were already merged from another lease.
+                while start < stop and (job_index, start) in self._done:
+                    start += 1
+                if start < stop:
+                    return job_index, start, stop
+            return None
+
+    def _serve_worker(self, conn: socket.socket) -> None:
+        lease: Optional[Tuple[int, int, int]] = None
+        next_index = 0
+        peer = "{}:{}".format(*conn.getpeername()[:2])
+        conn.settimeout(self.timeout)
+        try:
+            hello = recv_message(conn)
+            if hello["type"] != "hello" or hello.get("version") != PROTOCOL_VERSION:
+                raise ProtocolError(f"unexpected greeting {hello!r}")
+            while True:
+                message = recv_message(conn)
+                if message["type"] != "ready":
+                    raise ProtocolError(f"expected ready, got {message['type']!r}")
+                if self._finished.is_set():
+                    send_message(conn, {"type": "done"})
+                    return
+                lease = self._next_lease()
+                if lease is None:
+                    # Everything is leased out; check back in case a worker dies.
+                    send_message(conn, {"type": "wait", "seconds": WAIT_SECONDS})
+                    continue
+
+                job_index, start, stop = lease
+                job = self.jobs[job_index]
+                send_message(conn, {
+                    "type": "work",
+                    "job": job_index,
+                    "task": self._encoded[job_index],
+                    "seed": job.seed,
+                    "start": start,
+                    "stop": stop,
+                })
+                next_index = start
+                while next_index < stop:
+                    message = recv_message(conn)
+                    if (
+                        message["type"] != "result"
+                        or message.get("job") != job_index
+                        or message.get("unit") != next_index
+                    ):
+                        raise ProtocolError(f"expected result for unit {next_index} of job {job_index}")
+                    result = job.task.empty()
+                    result.load_arrays(decode_arrays(message["arrays"]))
+                    self._merge(job_index, next_index, result)
+                    next_index += 1
+                lease = None
+        except (OSError, ProtocolError, KeyError, TypeError, ValueError) as error:
+            if lease is not None:
+                print(f"lost worker {peer}: {error or type(error).__name__}", file=sys.stderr)
+        finally:
+            conn.close()
+            if lease is not None:
+                job_index, _, stop = lease
+                with self._lock:
+                    self._pending.appendleft((job_index, next_index, stop))
+                    self.requeued += stop - next_index
+
+    def _merge(self, job_index: int, unit: int, result: Any) -> None:
+        with self._lock:
+            key = (job_index, unit)
+            if key in self._done:
+                return
+            self.results[job_index].merge(result)
+            self._done.add(key)
+            done = len(self._done)
+        if self.progress is not None:
+            self.progress(done, self._total)
+        if done == self._total:
+            self._finished.set()
+
+
+# --------------------------------------------------------------------------
+# Worker
+
+
+def _connect(host: str, port: int, retry_for: float) -> socket.socket:
+    deadline = time.monotonic() + retry_for
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+
+
+def run_worker(host: str, port: int = DEFAULT_PORT, *, retry_for: float = 10.0) -> int:
+    """Run leased units until the coordinator says the sweep is done.
+
+    Returns how many units this worker completed.
+    """
+
+    tasks: Dict[int, Any] = {}
+    completed = 0
+    with _connect(host, port, retry_for) as sock:
+        send_message(sock, {"type": "hello", "version": PROTOCOL_VERSION})
+        while True:
+            send_message(sock, {"type": "ready"})
+            message = recv_message(sock)
+            kind = message["type"]
+            if kind == "done":
+                return completed
+            if kind == "wait":
+                time.sleep(float(message.get("seconds", WAIT_SECONDS)))
+                continue
+            if kind != "work":
+                raise ProtocolError(f"unexpected message {kind!r}")
+
+            job_index = message["job"]
+            if job_index not in tasks:
+                tasks[job_index] = decode_task(message["task"])
+            task = tasks[job_index]
+            seed = int(message["seed"])
+            for unit in range(message["start"], message["stop"]):
+                result = task.run_unit(unit_rng(seed, unit))
+                send_message(sock, {
+                    "type": "result",
+                    "job": job_index,
+                    "unit": unit,
+                    "arrays": encode_arrays(result.arrays()),
+                })
+                completed += 1
+
+
+def spawn_local_workers(count: int, host: str, port: int) -> List[subprocess.Popen]:
+    """Start ``count`` worker processes on this machine."""
+
+    command = [sys.executable, "-m", "blackjack_counter.cluster", "worker", "--host", host, "--port", str(port)]
+    return [subprocess.Popen(command) for _ in range(count)]
+
+
+# --------------------------------------------------------------------------
+# Command line
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="hand out a sweep and merge the results")
+    coordinator.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    coordinator.add_argument(
+        "--system",
+        action="append",
+        dest="systems",
+        choices=[system.key for system in registered_systems()],
+        help="counting system to sweep; repeat for several (default: hilo, or hilo and wong_halves with --table)",
+    )
+    coordinator.add_argument(
+        "--decks", type=int, action="append", help="decks per shoe; repeat for several (default: 6)"
+    )
+    coordinator.add_argument(
+        "--penetration",
+        type=float,
+        action="append",
+        dest="penetrations",
+        help="fraction of the shoe dealt before the cut card; repeat for several",
+    )
+    coordinator.add_argument(
+        "--table",
+        action="store_true",
+        help="play full rounds over a grid of table rules instead of counting true-count frequencies",
+    )
+    rules = coordinator.add_argument_group("table rules (with --table; repeat an option to add grid points)")
+    rules.add_argument("--payout", type=float, action="append", dest="payouts", help="blackjack pays (default: 1.5)")
+    rules.add_argument(
+        "--soft17", choices=["stand", "hit"], action="append", help="dealer on soft 17 (default: stand)"
+    )
+    rules.add_argument("--das", choices=["yes", "no"], action="append", help="double after split (default: yes)")
+    rules.add_argument(
+        "--surrender", choices=["no", "late"], action="append", help="surrender offered (default: no)"
+    )
+    rules.add_argument("--seats", type=int, default=None, help="players at the table (default: 5)")
+    coordinator.add_argument("--shoes", type=int, default=100_000, help="shoes per grid point (default: 100000)")
+    coordinator.add_argument(
+        "--unit-shoes",
+        type=int,
+        default=None,
+        help=f"shoes per work unit (default: {DEFAULT_UNIT_SHOES}, or {TABLE_UNIT_SHOES} with --table)",
+    )
+    coordinator.add_argument("--seed", type=int, required=True, help="seed shared by every grid point")
+    coordinator.add_argument("--lease", type=int, default=DEFAULT_LEASE_UNITS, help="units handed out at a time")
+    coordinator.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="seconds a worker may stay silent before its units are re-queued",
+    )
+    coordinator.add_argument("--spawn", type=int, default=0, help="also start this many local workers")
+
+    worker = commands.add_parser("worker", help="run units for a coordinator")
+    worker.add_argument("--host", default="127.0.0.1", help="coordinator address (default: 127.0.0.1)")
+    worker.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"coordinator port (default: {DEFAULT_PORT})")
+    return parser
+
+
+def sweep_jobs(
+    systems: Sequence[str],
+    decks: Sequence[int],
+    penetrations: Sequence[float],
+    shoes: int,
+    unit_shoes: int,
+    seed: int,
+) -> List[Job]:
+    """One true-count job per (system, decks) grid point, all with the same seed."""
+
+    units = units_for(shoes, unit_shoes)
+    return [
+        Job(TrueCountTask(system, deck_count, tuple(penetrations), unit_shoes), seed, units)
+        for system in systems
+        for deck_count in decks
+    ]
+
+
+def rule_grid(
+    payouts: Sequence[float],
+    soft17: Sequence[str],
+    das: Sequence[str],
+    surrender: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """``TableTask`` rule fields for every combination of the given options."""
+
+    return [
+        {
+            "blackjack_payout": payout,
+            "hits_soft_17": dealer == "hit",
+            "double_after_split": double == "yes",
+            "surrender": late == "late",
+        }
+        for payout, dealer, double, late in itertools.product(payouts, soft17, das, surrender)
+    ]
+
+
+def table_sweep_jobs(
+    systems: Sequence[str],
+    decks: Sequence[int],
+    penetrations: Sequence[float],
+    rules: Sequence[Mapping[str, Any]],
+    shoes: int,
+    unit_shoes: int,
+    seed: int,
+    **table: Any,
+) -> List[Job]:
+    """One full-table job per (rules, decks, penetration) grid point, all with the same seed.
+
+    Each job buckets its rounds by every system in ``systems``; ``table``
+    sets further ``TableTask`` fields (e.g. ``seats``) for every job.
+    """
+
+    units = units_for(shoes, unit_shoes)
+    return [
+        Job(
+            TableTask(
+                decks=deck_count,
+                penetration=penetration,
+                systems=tuple(systems),
+                shoes_per_unit=unit_shoes,
+                **rule_fields,
+                **table,
+            ),
+            seed,
+            units,
+        )
+        for rule_fields in rules
+        for deck_count in decks
+        for penetration in penetrations
+    ]
+
+
+def describe_job(job: Job) -> str:
+    """Heading for a job's results."""
+
+    task = job.task
+    if isinstance(task, TableTask):
+        rules = [
+            f"BJ pays {task.blackjack_payout:g}",
+            "H17" if task.hits_soft_17 else "S17",
+            "DAS" if task.double_after_split else "no DAS",
+        ]
+        if task.surrender:
+            rules.append("LS")
+        return f"{task.decks} decks, {task.penetration:.0%} penetration, {', '.join(rules)}, seed {job.seed}"
+    return f"{task.decks} decks, {get_system(task.system_key).name}, seed {job.seed}"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command == "worker":
+        completed = run_worker(args.host, args.port)
+        print(f"worker finished after {completed} units", file=sys.stderr)
+        return
+
+    if args.table:
+        table = {"seats": args.seats} if args.seats is not None else {}
+        jobs = table_sweep_jobs(
+            args.systems or list(TABLE_SYSTEMS),
+            args.decks or [6],
+            args.penetrations or [TableTask.penetration],
+            rule_grid(
+                args.payouts or [TableTask.blackjack_payout],
+                args.soft17 or ["stand"],
+                args.das or ["yes"],
+                args.surrender or ["no"],
+            ),
+            args.shoes,
+            args.unit_shoes or TABLE_UNIT_SHOES,
+            args.seed,
+            **table,
+        )
+    else:
+        jobs = sweep_jobs(
+            args.systems or ["hilo"],
+            args.decks or [6],
+            args.penetrations or DEFAULT_PENETRATIONS,
+            args.shoes,
+            args.unit_shoes or DEFAULT_UNIT_SHOES,
+            args.seed,
+        )
+    coordinator = Coordinator(
+        jobs,
+        host=args.host,
+        port=args.port,
+        lease_units=args.lease,
+        timeout=args.timeout,
+        progress=print_progress,
+    )
+    host, port = coordinator.address
+    print(f"coordinator listening on {host}:{port}", file=sys.stderr)
+    workers = spawn_local_workers(args.spawn, host, port)
+    try:
+        results = coordinator.serve()
+    finally:
+        for process in workers:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    if coordinator.requeued:
+        print(f"re-queued {coordinator.requeued} units from lost workers", file=sys.stderr)
+
+    for job, result in zip(jobs, results):
+        print(f"\n{result.shoes:,} shoes, {describe_job(job)}")
+        print(result.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Exact dealer outcome probabilities for the cards left in the shoe.
+
+A shoe is a 10-slot tuple of card counts for the values 2 through 9, ten
+and ace (the same order ``systems._tags`` uses). ``shoe_from_composition``
+collapses ``CountingState.composition`` to that form.
+
+The dealer's final total is found by recursing over every card the dealer
+could draw, removing each one from the shoe as it goes, so the result is
+exact for the given composition rather than an infinite-deck estimate.
+Intermediate results are memoized in an LRU cache keyed on the shoe and
+the dealer's hand; ``max_entries`` caps its size and the least recently
+used entries are evicted first. Pure Python, so the GUI can use it without
+NumPy.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from blackjack_counter.state import RANKS
+
+Shoe = Tuple[int, ...]
+Outcomes = Tuple[float, ...]
+
+# Card values by shoe slot; aces count 1 here and are promoted to 11 when
+# that does not bust the hand.
+CARD_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 1)
+CARD_NAMES = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "A")
+TEN = 8
+ACE = 9
+# Shoe slot for each entry of state.RANKS.
+RANK_SLOTS = tuple(min(index, TEN) if rank != "A" else ACE for index, rank in enumerate(RANKS))
+
+OUTCOMES = ("bust", "17", "18", "19", "20", "21", "blackjack")
+BUST = 0
+BLACKJACK = 6
+DEFAULT_MAX_ENTRIES = 200_000
+
+_TERMINAL: Dict[int, Outcomes] = {
+    total: tuple(1.0 if index == total - 16 else 0.0 for index in range(len(OUTCOMES)))
+    for total in range(17, 22)
+}
+_BUST_OUTCOME: Outcomes = tuple(1.0 if index == BUST else 0.0 for index in range(len(OUTCOMES)))
+_BLACKJACK_OUTCOME: Outcomes = tuple(1.0 if index == BLACKJACK else 0.0 for index in range(len(OUTCOMES)))
+
+
+def shoe_from_composition(composition: Sequence[float]) -> Shoe:
+    """Collapse 13 per-rank counts (``state.RANKS`` order) to a 10-slot shoe.
+
+    Fractional counts from Hi-Lo class presses are rounded to whole cards.
+    """
+
+    slots = [0.0] * len(CARD_VALUES)
+    for rank_index, cards in enumerate(composition):
+        slots[RANK_SLOTS[rank_index]] += cards
+    return tuple(max(0, int(round(cards))) for cards in slots)
+
+
+def full_shoe(decks: int) -> Shoe:
+    """A shoe of ``decks`` complete decks."""
+
+    per_value = 4 * decks
+    return (per_value,) * 8 + (4 * per_value, per_value)
+
+
+def remove_card(shoe: Shoe, slot: int) -> Shoe:
+    """``shoe`` with one card from ``slot`` taken out."""
+
+    if shoe[slot] <= 0:
+        raise ValueError(f"no {CARD_NAMES[slot]} left in the shoe")
+    return shoe[:slot] + (shoe[slot] - 1,) + shoe[slot + 1:]
+
+
+def hand_total(hard: int, has_ace: bool) -> Tuple[int, bool]:
+    """Best total for a hand and whether it is soft."""
+
+    if has_ace and hard + 10 <= 21:
+        return hard + 10, True
+    return hard, False
+
+
+class DealerEngine:
+    """Dealer outcome distributions with a bounded LRU memo.
+
+    ``hits_soft_17`` selects H17 (dealer hits soft 17) over S17.
+    """
+
+    def __init__(self, hits_soft_17: bool = False, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.hits_soft_17 = hits_soft_17
+        self.max_entries = max(1, max_entries)
+        self._cache: "OrderedDict[Tuple[Shoe, int, bool, bool], Outcomes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def outcomes(self, shoe: Shoe, upcard: int, *, peeked: bool = False) -> Outcomes:
+        """Chance of each entry in ``OUTCOMES`` for a dealer showing ``upcard``.
+
+        ``shoe`` holds the cards left after the upcard was dealt. With
+        ``peeked`` the result is conditioned on the dealer not having
+        blackjack, as when play continues after a hole-card check.
+        """
+
+        result = self._dealer(shoe, CARD_VALUES[upcard], upcard == ACE, True)
+        if not peeked or result[BLACKJACK] == 0.0:
+            return result
+        remaining = 1.0 - result[BLACKJACK]
+        if remaining <= 0.0:
+            return result
+        return tuple(0.0 if index == BLACKJACK else p / remaining for index, p in enumerate(result))
+
+    def all_upcards(self, shoe: Shoe, *, peeked: bool = False) -> Dict[int, Optional[Outcomes]]:
+        """Outcomes for every upcard still in ``shoe`` (``None`` for exhausted ones)."""
+
+        return {
+            slot: self.outcomes(remove_card(shoe, slot), slot, peeked=peeked) if shoe[slot] else None
+            for slot in range(len(CARD_VALUES))
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _dealer(self, shoe: Shoe, hard: int, has_ace: bool, first: bool) -> Outcomes:
+        key = (shoe, hard, has_ace, first)
+        cache = self._cache
+        cached = cache.get(key)
+        if cached is not None:
+            cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        total = sum(shoe)
+        if total == 0:
+            # Nothing left to draw; score the hand as it stands.
+            result = self._settle(hard, has_ace)
+        else:
+            accumulated = [0.0] * len(OUTCOMES)
+            for slot, count in enumerate(shoe):
+                if not count:
+                    continue
+                value = CARD_VALUES[slot]
+                next_hard = hard + value
+                next_ace = has_ace or slot == ACE
+                best, soft = hand_total(next_hard, next_ace)
+                if first and best == 21:
+                    sub = _BLACKJACK_OUTCOME
+                elif best > 21:
+                    sub = _BUST_OUTCOME
+                elif best > 17 or (best == 17 and not (soft and self.hits_soft_17)):
+                    sub = _TERMINAL[best]
+                else:
+                    sub = self._dealer(shoe[:slot] + (count - 1,) + shoe[slot + 1:], next_hard, next_ace, False)
+                weight = count / total
+                for index, p in enumerate(sub):
+                    if p:
+                        accumulated[index] += weight * p
+            result = tuple(accumulated)
+
+        cache[key] = result
+        if len(cache) > self.max_entries:
+            cache.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    @staticmethod
+    def _settle(hard: int, has_ace: bool) -> Outcomes:
+        best, _ = hand_total(hard, has_ace)
+        if best > 21:
+            return _BUST_OUTCOME
+        # A dealer short of 17 with an empty shoe never happens in play;
+        # count it with the 17s so the distribution still sums to one.
+        return _TERMINAL[max(17, best)]
@@ -0,0 +1,425 @@
+"""Generate index-play tables by simulation.
+
+For every deviation in ``deviations.DEVIATIONS`` the player's cards and the
+dealer upcard are taken out of the pack, the rest is shuffled in NumPy
+batches, and each shoe is cut at several random depths. At each depth the
+true count is read for every registered counting system from the cards
+already seen (plus the hand on the table), and both the basic play and
+the deviation are played out on the same remaining cards. Their EV
+difference, in half-units of the bet, is summed per true-count bucket.
+
+The index for a system is where a weighted straight-line fit of that
+difference crosses zero, rounded to a whole true count. Hands after the
+decision are finished with a simple basic-strategy stand-in (stand on 12+
+against 2-6, hit to 17 otherwise, hit soft hands to 18); the dealer peeks
+for blackjack and stands on soft 17 unless ``--h17`` is given.
+
+Sums are integers, so work units merge exactly through
+``parallel.ParallelRunner``. Run
+``python -m blackjack_counter.deviation_sim --help``; the default output
+is ``assets/deviations.json``, which the frames load at startup.
+"""
+
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from blackjack_counter.deviations import (
+    DEVIATIONS,
+    DEVIATIONS_BY_KEY,
+    DEVIATIONS_FILE,
+    DOUBLE,
+    HIT,
+    INSURE,
+    SPLIT,
+    SURRENDER,
+    TC_MAX,
+    TC_MIN,
+    Deviation,
+)
+from blackjack_counter.parallel import ParallelRunner, new_seed
+from blackjack_counter.simulation import MIN_DECKS_DIVISOR, print_progress, shoe_ranks, units_for
+from blackjack_counter.state import CARDS_PER_DECK, RANKS
+from blackjack_counter.systems import get_system, registered_systems
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_UNIT_SHOES = 4096
+DEFAULT_DEPTHS_PER_SHOE = 8
+DEFAULT_MAX_PENETRATION = 0.8
+# Buckets with fewer samples than this are left out of the fit.
+MIN_BUCKET_SAMPLES = 200
+FIT_WINDOW = 4
+
+_RANK_INDEX = {rank: index for index, rank in enumerate(RANKS)}
+# Blackjack value per rank index; aces count 1 and are promoted when safe.
+_VALUES = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1], dtype=np.int16)
+_ACE = _RANK_INDEX["A"]
+
+
+def _best(hard: np.ndarray, ace: np.ndarray) -> np.ndarray:
+    return hard + 10 * (ace & (hard <= 11))
+
+
+def _is_soft(hard: np.ndarray, ace: np.ndarray) -> np.ndarray:
+    return ace & (hard <= 11)
+
+
+class _Table:
+    """Cards left in one batch of shoes with a per-row read position."""
+
+    def __init__(self, shoes: np.ndarray, cursor: np.ndarray) -> None:
+        self.shoes = shoes
+        self.rows = np.arange(shoes.shape[0])
+        self.cursor = cursor.copy()
+
+    def draw(self, mask: np.ndarray) -> np.ndarray:
+        """Next card for the rows in ``mask`` (rank indexes; other rows get 0)."""
+
+        cards = np.zeros(len(self.rows), dtype=np.int8)
+        rows = self.rows[mask]
+        cards[rows] = self.shoes[rows, self.cursor[rows]]
+        self.cursor[rows] += 1
+        return cards
+
+    def take(self, hard: np.ndarray, ace: np.ndarray, mask: np.ndarray) -> None:
+        cards = self.draw(mask)
+        hard += np.where(mask, _VALUES[cards], 0)
+        ace |= mask & (cards == _ACE)
+
+    def finish_player(self, hard: np.ndarray, ace: np.ndarray, upcard: int) -> None:
+        """Play out hands with the stand-in basic strategy."""
+
+        stiff_upcard = 2 <= _VALUES[upcard] <= 6
+        hard_target = 12 if stiff_upcard else 17
+        while True:
+            best = _best(hard, ace)
+            soft = _is_soft(hard, ace)
+            hitting = np.where(soft, best < 18, best < hard_target)
+            if not hitting.any():
+                return
+            self.take(hard, ace, hitting)
+
+    def finish_dealer(self, hard: np.ndarray, ace: np.ndarray, hits_soft_17: bool) -> None:
+        while True:
+            best = _best(hard, ace)
+            hitting = best < 17
+            if hits_soft_17:
+                hitting |= (best == 17) & _is_soft(hard, ace)
+            if not hitting.any():
+                return
+            self.take(hard, ace, hitting)
+
+
+def _settle(player: np.ndarray, dealer: np.ndarray) -> np.ndarray:
+    """Result per unit bet: player and dealer are final best totals."""
+
+    result = np.sign(player - dealer).astype(np.int16)
+    result[dealer > 21] = 1
+    result[player > 21] = -1
+    return result
+
+
+@dataclass(frozen=True)
+class DeviationTask:
+    """Picklable work-unit description for ``parallel.ParallelRunner``."""
+
+    decks: int = 6
+    systems: Tuple[str, ...] = ()
+    deviations: Tuple[str, ...] = ()
+    shoes_per_unit: int = DEFAULT_UNIT_SHOES
+    batch_size: int = DEFAULT_BATCH_SIZE
+    depths_per_shoe: int = DEFAULT_DEPTHS_PER_SHOE
+    max_penetration: float = DEFAULT_MAX_PENETRATION
+    hits_soft_17: bool = False
+
+    def system_keys(self) -> Tuple[str, ...]:
+        return self.systems or tuple(system.key for system in registered_systems())
+
+    def deviation_keys(self) -> Tuple[str, ...]:
+        return self.deviations or tuple(deviation.key for deviation in DEVIATIONS)
+
+    def empty(self) -> "DeviationSums":
+        return DeviationSums.empty(self.system_keys(), self.deviation_keys())
+
+    def run_unit(self, rng: np.random.Generator) -> "DeviationSums":
+        sums = self.empty()
+        systems = [get_system(key) for key in sums.systems]
+        tables = np.array([system.table for system in systems], dtype=np.int16)
+        initial = np.array(
+            [round(system.initial_running_count(self.decks) * 2) for system in systems], dtype=np.int32
+        )
+        for slot, key in enumerate(sums.deviations):
+            remaining = self.shoes_per_unit
+            while remaining > 0:
+                batch = min(self.batch_size, remaining)
+                self._run_batch(rng, DEVIATIONS_BY_KEY[key], batch, tables, initial, sums, slot)
+                remaining -= batch
+        sums.shoes += self.shoes_per_unit
+        return sums
+
+    def _run_batch(
+        self,
+        rng: np.random.Generator,
+        deviation: Deviation,
+        shoes: int,
+        tables: np.ndarray,
+        initial: np.ndarray,
+        sums: "DeviationSums",
+        slot: int,
+    ) -> None:
+        fixed = [_RANK_INDEX[rank] for rank in deviation.player] + [_RANK_INDEX[deviation.upcard]]
+        pack = shoe_ranks(self.decks)
+        for rank in fixed:
+            pack = np.delete(pack, np.flatnonzero(pack == rank)[0])
+        cards = len(pack)
+
+        dealt = np.tile(pack, (shoes, 1))
+        rng.permuted(dealt, axis=1, out=dealt)
+        # Several decision points per shuffled shoe.
+        depth = rng.integers(0, int(self.max_penetration * cards) + 1, size=(shoes, self.depths_per_shoe))
+        rows = np.repeat(np.arange(shoes), self.depths_per_shoe)
+        depth = depth.ravel()
+
+        # Running count of the seen cards for every system at once.
+        prefix = np.zeros((len(tables), shoes, cards + 1), dtype=np.int32)
+        np.cumsum(tables[:, dealt], axis=2, out=prefix[:, :, 1:])
+        halves = prefix[:, rows, depth] + (initial + tables[:, fixed].sum(axis=1))[:, None]
+        decks_left = np.maximum((cards - depth) / CARDS_PER_DECK, MIN_DECKS_DIVISOR)
+        buckets = np.clip(np.floor(halves / (2 * decks_left)), TC_MIN, TC_MAX).astype(np.intp) - TC_MIN
+
+        diff, keep = self._ev_difference(deviation, dealt[rows], depth)
+        width = TC_MAX - TC_MIN + 1
+        offsets = (np.arange(len(tables)) * width)[:, None]
+        flat = (buckets + offsets)[:, keep].ravel()
+        weights = np.broadcast_to(diff[keep], (len(tables), int(keep.sum()))).ravel()
+        sums.diff_halves[:, slot] += np.rint(
+            np.bincount(flat, weights=weights, minlength=len(tables) * width)
+        ).astype(np.int64).reshape(len(tables), width)
+        sums.samples[:, slot] += np.bincount(flat, minlength=len(tables) * width).reshape(len(tables), width)
+
+    def _ev_difference(self, deviation: Deviation, shoes: np.ndarray, depth: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """EV(deviation) - EV(basic) in half-units per row, and the rows to keep."""
+
+        upcard = _RANK_INDEX[deviation.upcard]
+        rows = np.arange(len(depth))
+        hole = shoes[rows, depth]
+        hole_ten = _VALUES[hole] == 10
+        if INSURE in (deviation.basic, deviation.play):
+            # An insurance bet of half the wager pays 2:1: +1 unit or -0.5.
+            insurance = np.where(hole_ten, 2, -1).astype(np.int16)
+            sign = 1 if deviation.play == INSURE else -1
+            return sign * insurance, np.ones(len(depth), dtype=bool)
+
+        up_value = int(_VALUES[upcard])
+        dealer_blackjack = (hole_ten & (upcard == _ACE)) | ((hole == _ACE) & (up_value == 10))
+        keep = ~dealer_blackjack
+        evs = {}
+        for action in (deviation.basic, deviation.play):
+            evs[action] = self._play(action, deviation, shoes, depth, hole, upcard)
+        return evs[deviation.play] - evs[deviation.basic], keep
+
+    def _play(
+        self,
+        action: str,
+        deviation: Deviation,
+        shoes: np.ndarray,
+        depth: np.ndarray,
+        hole: np.ndarray,
+        upcard: int,
+    ) -> np.ndarray:
+        """Half-unit result per row of playing ``action`` first."""
+
+        count = len(depth)
+        if action == SURRENDER:
+            return np.full(count, -1, dtype=np.int16)
+
+        table = _Table(shoes, depth + 1)
+        player_ranks = [_RANK_INDEX[rank] for rank in deviation.player]
+        everyone = np.ones(count, dtype=bool)
+
+        def new_hand(ranks: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+            hard = np.full(count, int(_VALUES[ranks].sum()), dtype=np.int16)
+            ace = np.full(count, _ACE in ranks, dtype=bool)
+            return hard, ace
+
+        if action == SPLIT:
+            hands = [new_hand(player_ranks[:1]), new_hand(player_ranks[1:])]
+            for hard, ace in hands:
+                table.take(hard, ace, everyone)
+                table.finish_player(hard, ace, upcard)
+            stakes = [1, 1]
+        else:
+            hard, ace = new_hand(player_ranks)
+            if action in (HIT, DOUBLE):
+                table.take(hard, ace, everyone)
+            if action == HIT:
+                table.finish_player(hard, ace, upcard)
+            hands = [(hard, ace)]
+            stakes = [2 if action == DOUBLE else 1]
+
+        dealer_hard = np.full(count, int(_VALUES[upcard]), dtype=np.int16) + _VALUES[hole]
+        dealer_ace = (hole == _ACE) | (upcard == _ACE)
+        table.finish_dealer(dealer_hard, dealer_ace, self.hits_soft_17)
+        dealer = _best(dealer_hard, dealer_ace)
+
+        total = np.zeros(count, dtype=np.int16)
+        for (hard, ace), stake in zip(hands, stakes):
+            total += 2 * stake * _settle(_best(hard, ace), dealer)
+        return total
+
+
+@dataclass
+class DeviationSums:
+    """EV-difference sums and sample counts per system, deviation and TC bucket."""
+
+    systems: Tuple[str, ...]
+    deviations: Tuple[str, ...]
+    diff_halves: np.ndarray
+    samples: np.ndarray
+    shoes: int = 0
+
+    @classmethod
+    def empty(cls, systems: Sequence[str], deviations: Sequence[str]) -> "DeviationSums":
+        shape = (len(systems), len(deviations), TC_MAX - TC_MIN + 1)
+        return cls(tuple(systems), tuple(deviations), np.zeros(shape, np.int64), np.zeros(shape, np.int64))
+
+    def merge(self, other: "DeviationSums") -> None:
+        if (self.systems, self.deviations) != (other.systems, other.deviations):
+            raise ValueError("Cannot merge deviation sums for different setups")
+        self.diff_halves += other.diff_halves
+        self.samples += other.samples
+        self.shoes += other.shoes
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "diff_halves": self.diff_halves,
+            "samples": self.samples,
+            "shoes": np.array(self.shoes, dtype=np.int64),
+        }
+
+    def load_arrays(self, arrays: Mapping[str, np.ndarray]) -> None:
+        self.diff_halves[...] = arrays["diff_halves"]
+        self.samples[...] = arrays["samples"]
+        self.shoes = int(arrays["shoes"])
+
+    def mean_difference(self) -> np.ndarray:
+        """Average EV(deviation) - EV(basic) per bucket, in units of the bet (NaN if unseen)."""
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.diff_halves / (2.0 * self.samples)
+
+    def crossing(self, system: int, deviation: int) -> Optional[float]:
+        """True count where the fitted EV difference crosses zero."""
+
+        counts = self.samples[system, deviation].astype(np.float64)
+        means = self.mean_difference()[system, deviation]
+        centres = np.arange(TC_MIN, TC_MAX + 1) + 0.5
+        usable = counts >= MIN_BUCKET_SAMPLES
+        root = None
+        for _ in range(2):
+            if usable.sum() < 2:
+                return root
+            slope, intercept = np.polyfit(centres[usable], means[usable], 1, w=np.sqrt(counts[usable]))
+            if slope == 0:
+                return root
+            root = -intercept / slope
+            # Refit on the buckets around the crossing, where the line fits best.
+            usable &= np.abs(centres - root) <= FIT_WINDOW + 0.5
+        return root
+
+    def indexes(self) -> Dict[str, Dict[str, int]]:
+        """Whole-number index per system and deviation, clamped to the TC range."""
+
+        tables: Dict[str, Dict[str, int]] = {}
+        for system_slot, system_key in enumerate(self.systems):
+            indexes = {}
+            for slot, key in enumerate(self.deviations):
+                deviation = DEVIATIONS_BY_KEY[key]
+                root = self.crossing(system_slot, slot)
+                if root is None or not np.isfinite(root):
+                    # Never right inside the simulated range.
+                    index = TC_MAX + 1 if deviation.above else TC_MIN - 1
+                else:
+                    index = int(np.clip(round(root), TC_MIN - 1, TC_MAX + 1))
+                indexes[key] = index
+            tables[system_key] = indexes
+        return tables
+
+
+def write_tables(path: Path, sums: DeviationSums, task: DeviationTask, seed: int) -> None:
+    """Save the generated indexes as JSON for ``deviations.load_index_tables``."""
+
+    payload = {
+        "version": 1,
+        "generated": {
+            "decks": task.decks,
+            "shoes": sums.shoes,
+            "depths_per_shoe": task.depths_per_shoe,
+            "max_penetration": task.max_penetration,
+            "hits_soft_17": task.hits_soft_17,
+            "seed": seed,
+        },
+        "systems": sums.indexes(),
+    }
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(json.dumps(payload, indent=1) + "\n", encoding="utf-8")
+    temporary.replace(path)
+
+
+def format_indexes(tables: Mapping[str, Mapping[str, int]]) -> str:
+    systems = list(tables)
+    lines = ["play".ljust(12) + "".join(key.rjust(12) for key in systems)]
+    for deviation in DEVIATIONS:
+        if not all(deviation.key in tables[key] for key in systems):
+            continue
+        lines.append(deviation.key.ljust(12) + "".join(f"{tables[key][deviation.key]:>+12d}" for key in systems))
+    return "\n".join(lines)
+
+
+def default_output() -> Path:
+    return Path(__file__).resolve().parent.parent / "assets" / DEVIATIONS_FILE
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=6, help="decks per shoe (default: 6)")
+    parser.add_argument(
+        "--system",
+        action="append",
+        dest="systems",
+        choices=[system.key for system in registered_systems()],
+        help="system to generate; repeat for several (default: all registered)",
+    )
+    parser.add_argument("--shoes", type=int, default=200_000, help="shoes per deviation (default: 200000)")
+    parser.add_argument("--unit-shoes", type=int, default=DEFAULT_UNIT_SHOES, help="shoes per work unit")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument("--out", type=Path, default=default_output(), help="JSON file to write")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    seed = args.seed if args.seed is not None else new_seed()
+    task = DeviationTask(
+        decks=args.decks,
+        systems=tuple(args.systems or ()),
+        shoes_per_unit=args.unit_shoes,
+        hits_soft_17=args.h17,
+    )
+    runner = ParallelRunner(
+        task, units_for(args.shoes, args.unit_shoes), seed, workers=args.workers, progress=print_progress
+    )
+    sums = runner.run()
+    write_tables(args.out, sums, task, seed)
+    print(f"{sums.shoes:,} shoes per play, seed {seed}; wrote {args.out}")
+    print(format_indexes(sums.indexes()))
+
+
+if __name__ == "__main__":
+    main()
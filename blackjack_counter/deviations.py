@@ -0,0 +1,156 @@
+"""Index plays (count-based strategy deviations) and their lookup tables.
+
+``DEVIATIONS`` lists the Illustrious 18 and the Fab 4 surrenders. Each one
+names the basic-strategy play, the play that takes over once the count
+passes its index, and which side of the index that is. The indexes
+themselves are generated per counting system by
+``python -m blackjack_counter.deviation_sim`` and shipped as
+``assets/deviations.json``.
+
+``IndexTable`` turns one system's indexes into a dict keyed by whole true
+count, so the frames can find the plays in effect with one lookup per
+refresh. This module is pure Python; only the generator needs NumPy.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from blackjack_counter.assets import find_asset
+
+DEVIATIONS_FILE = "deviations.json"
+# True counts are bucketed with floor(), so bucket k holds k <= TC < k + 1;
+# anything beyond the range lands in the outermost bucket. Every table and
+# simulator keyed by true count uses this range.
+TC_MIN = -10
+TC_MAX = 10
+
+STAND = "stand"
+HIT = "hit"
+DOUBLE = "double"
+SPLIT = "split"
+SURRENDER = "surrender"
+INSURE = "insure"
+NO_INSURANCE = "no insurance"
+
+
+@dataclass(frozen=True)
+class Deviation:
+    """One index play.
+
+    ``above`` is ``True`` when ``play`` replaces ``basic`` at true counts at
+    or above the index, ``False`` when it applies below it (the usual
+    notation: "13v2 at -1" stands at -1 and hits below).
+    """
+
+    key: str
+    player: Tuple[str, ...]
+    upcard: str
+    basic: str
+    play: str
+    above: bool = True
+
+    @property
+    def label(self) -> str:
+        if self.play == INSURE:
+            return "Take insurance"
+        # Keys may carry a rule suffix ("15v10 LS"); the hand is enough here.
+        return f"{self.key.split()[0]} {self.play.title()}"
+
+    def applies(self, true_count: float, index: float) -> bool:
+        """Whether ``play`` is right at ``true_count`` for this index."""
+
+        return true_count >= index if self.above else true_count < index
+
+
+DEVIATIONS: Tuple[Deviation, ...] = (
+    # Illustrious 18
+    Deviation("Insurance", ("10", "7"), "A", NO_INSURANCE, INSURE),
+    Deviation("16v10", ("10", "6"), "10", HIT, STAND),
+    Deviation("15v10", ("10", "5"), "10", HIT, STAND),
+    Deviation("10,10v5", ("10", "10"), "5", STAND, SPLIT),
+    Deviation("10,10v6", ("10", "10"), "6", STAND, SPLIT),
+    Deviation("10v10", ("6", "4"), "10", HIT, DOUBLE),
+    Deviation("12v3", ("10", "2"), "3", HIT, STAND),
+    Deviation("12v2", ("10", "2"), "2", HIT, STAND),
+    Deviation("11vA", ("6", "5"), "A", HIT, DOUBLE),
+    Deviation("9v2", ("5", "4"), "2", HIT, DOUBLE),
+    Deviation("10vA", ("6", "4"), "A", HIT, DOUBLE),
+    Deviation("9v7", ("5", "4"), "7", HIT, DOUBLE),
+    Deviation("16v9", ("10", "6"), "9", HIT, STAND),
+    Deviation("13v2", ("10", "3"), "2", STAND, HIT, above=False),
+    Deviation("12v4", ("10", "2"), "4", STAND, HIT, above=False),
+    Deviation("12v5", ("10", "2"), "5", STAND, HIT, above=False),
+    Deviation("12v6", ("10", "2"), "6", STAND, HIT, above=False),
+    Deviation("13v3", ("10", "3"), "3", STAND, HIT, above=False),
+    # Fab 4 surrenders
+    Deviation("14v10", ("10", "4"), "10", HIT, SURRENDER),
+    Deviation("15v10 LS", ("10", "5"), "10", HIT, SURRENDER),
+    Deviation("15v9", ("10", "5"), "9", HIT, SURRENDER),
+    Deviation("15vA", ("10", "5"), "A", HIT, SURRENDER),
+)
+DEVIATIONS_BY_KEY: Dict[str, Deviation] = {deviation.key: deviation for deviation in DEVIATIONS}
+
+
+class IndexTable:
+    """Index plays for one system, pre-sorted by whole true count."""
+
+    def __init__(self, system_key: str, indexes: Mapping[str, float]) -> None:
+        self.system_key = system_key
+        self.indexes = {key: float(value) for key, value in indexes.items() if key in DEVIATIONS_BY_KEY}
+        deviations = [DEVIATIONS_BY_KEY[key] for key in self.indexes]
+        # Bucket b holds true counts in [b, b + 1); with whole-number
+        # indexes ``Deviation.applies`` gives the same answer for every
+        # count in a bucket, so checking its floor is enough.
+        self._by_bucket: Dict[int, Tuple[Deviation, ...]] = {
+            bucket: tuple(
+                deviation for deviation in deviations if deviation.applies(bucket, self.indexes[deviation.key])
+            )
+            for bucket in range(TC_MIN, TC_MAX + 1)
+        }
+
+    def active(self, true_count: float) -> Tuple[Deviation, ...]:
+        """Deviations in effect at ``true_count``."""
+
+        bucket = min(TC_MAX, max(TC_MIN, math.floor(true_count)))
+        return self._by_bucket[bucket]
+
+    def index_of(self, key: str) -> Optional[float]:
+        return self.indexes.get(key)
+
+
+_TABLES: Optional[Dict[str, IndexTable]] = None
+
+
+def load_index_tables(path: Optional[Path] = None) -> Dict[str, IndexTable]:
+    """Read ``assets/deviations.json`` once; missing or unreadable files give no tables."""
+
+    global _TABLES
+    if path is None and _TABLES is not None:
+        return _TABLES
+    source = path or find_asset(DEVIATIONS_FILE)
+    tables: Dict[str, IndexTable] = {}
+    if source is not None:
+        try:
+            with open(source, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            data = {}
+        for system_key, indexes in data.get("systems", {}).items():
+            tables[system_key] = IndexTable(system_key, indexes)
+    if path is None:
+        _TABLES = tables
+    return tables
+
+
+def index_table(system_key: str) -> Optional[IndexTable]:
+    """The index table for ``system_key``, if one was generated."""
+
+    return load_index_tables().get(system_key)
+
+
+def format_active(deviations: Iterable[Deviation]) -> str:
+    labels = [deviation.label for deviation in deviations]
+    return ", ".join(labels) if labels else "Basic strategy"
@@ -0,0 +1,264 @@
+"""Effects of removal and counting-system scores.
+
+The effect of removal (EOR) of a rank is how much the player's expectation
+changes when one card of that rank is taken out of the shoe. Here it is
+worked out exactly from ``strategy.StrategyEngine``: every starting hand
+against every upcard is weighted by its dealing probability, with each
+hand played the way the full shoe's strategy plays it, so the numbers are
+basic-strategy EORs.
+
+The same is done for the index plays in ``deviations.DEVIATIONS`` (the EOR
+of the EV gap between the deviation and the basic play) and for the
+insurance bet. A tag table is then scored against all of them in one
+matrix product:
+
+* betting correlation - correlation of the tags with the overall EORs,
+* insurance correlation - correlation with the insurance EORs,
+* playing efficiency - the frequency-weighted correlation with the
+  index-play EORs, signed by the side of the index the deviation is on,
+  so a play the tags point the wrong way for lowers the score.
+
+Computing the EORs takes a few seconds; scoring is vectorized, so
+thousands of candidate tag tables score in milliseconds. Run
+``python -m blackjack_counter.eor --help``.
+"""
+
+import argparse
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from blackjack_counter.dealer import ACE, BLACKJACK, CARD_VALUES, RANK_SLOTS, TEN, Shoe, full_shoe, remove_card
+from blackjack_counter.deviations import DEVIATIONS, INSURE, Deviation
+from blackjack_counter.state import RANKS
+from blackjack_counter.strategy import Rules, StrategyEngine
+from blackjack_counter.systems import RANK_INDEX, CountingSystem, _tags, registered_systems
+
+BLACKJACK_PAYOUT = 1.5
+_SLOTS = len(CARD_VALUES)
+
+
+@dataclass
+class EffectsOfRemoval:
+    """EORs per rank (``state.RANKS`` order), in units of the initial bet."""
+
+    decks: int
+    rules: Rules
+    base_ev: float
+    overall: np.ndarray
+    insurance: np.ndarray
+    decisions: Tuple[Deviation, ...]
+    decision_eors: np.ndarray
+    decision_weights: np.ndarray
+
+    def format(self) -> str:
+        header = "".join(rank.rjust(8) for rank in RANKS)
+        lines = [f"{self.decks}-deck player edge {self.base_ev:+.4%}", "EOR (%)   " + header]
+        lines.append("overall   " + "".join(f"{value * 100:>+8.3f}" for value in self.overall))
+        lines.append("insurance " + "".join(f"{value * 100:>+8.3f}" for value in self.insurance))
+        return "\n".join(lines)
+
+
+def _expand(per_slot: Sequence[float]) -> np.ndarray:
+    """13-rank vector from per-slot values (10, J, Q and K share a slot)."""
+
+    return np.array([per_slot[slot] for slot in RANK_SLOTS], dtype=np.float64)
+
+
+def _starting_hands(shoe: Shoe) -> Iterable[Tuple[float, int, int, int, Shoe]]:
+    """(probability, upcard, first, second, shoe left) for every deal from ``shoe``."""
+
+    total = sum(shoe)
+    for upcard in range(_SLOTS):
+        if not shoe[upcard]:
+            continue
+        after_up = remove_card(shoe, upcard)
+        p_up = shoe[upcard] / total
+        for first in range(_SLOTS):
+            if not after_up[first]:
+                continue
+            after_first = remove_card(after_up, first)
+            p_first = after_up[first] / (total - 1)
+            for second in range(first, _SLOTS):
+                if not after_first[second]:
+                    continue
+                p_second = after_first[second] / (total - 2)
+                orders = 1 if first == second else 2
+                yield p_up * p_first * p_second * orders, upcard, first, second, remove_card(after_first, second)
+
+
+def round_ev(
+    engine: StrategyEngine,
+    shoe: Shoe,
+    strategy: Optional[Dict[Tuple[int, int, int], str]] = None,
+) -> Tuple[float, Dict[Tuple[int, int, int], str]]:
+    """Player expectation for one round dealt from ``shoe``.
+
+    Hands are played with ``strategy`` (keyed by upcard and the two player
+    cards) where given, otherwise optimally for this shoe; the strategy
+    actually used is returned so it can be reused on nearby shoes.
+    """
+
+    used: Dict[Tuple[int, int, int], str] = {}
+    ev = 0.0
+    for probability, upcard, first, second, rest in _starting_hands(shoe):
+        dealer_blackjack = engine.dealer.outcomes(rest, upcard)[BLACKJACK]
+        if (first, second) == (TEN, ACE):
+            ev += probability * BLACKJACK_PAYOUT * (1.0 - dealer_blackjack)
+            continue
+        advice = engine.advise(rest, [first, second], upcard)
+        key = (upcard, first, second)
+        action = strategy.get(key, advice.best) if strategy else advice.best
+        used[key] = action
+        ev += probability * (-dealer_blackjack + (1.0 - dealer_blackjack) * advice.evs[action])
+    return ev, used
+
+
+def _insurance_ev(shoe: Shoe) -> float:
+    """EV of a full insurance bet (half the wager) with an ace up and ``shoe`` left."""
+
+    return 0.5 * (3.0 * shoe[TEN] / sum(shoe) - 1.0)
+
+
+def _decision_gap(engine: StrategyEngine, shoe: Shoe, deviation: Deviation) -> Optional[float]:
+    """EV(deviation) - EV(basic play) for the deviation's hand dealt from ``shoe``."""
+
+    cards = [RANK_SLOTS[RANK_INDEX[rank]] for rank in deviation.player]
+    upcard = RANK_SLOTS[RANK_INDEX[deviation.upcard]]
+    rest = shoe
+    for slot in cards + [upcard]:
+        if not rest[slot]:
+            return None
+        rest = remove_card(rest, slot)
+    evs = engine.advise(rest, cards, upcard).evs
+    if deviation.play not in evs or deviation.basic not in evs:
+        return None
+    return evs[deviation.play] - evs[deviation.basic]
+
+
+def _deal_probability(shoe: Shoe, deviation: Deviation) -> float:
+    probability = 1.0
+    total = sum(shoe)
+    for rank in deviation.player + (deviation.upcard,):
+        slot = RANK_SLOTS[RANK_INDEX[rank]]
+        probability *= shoe[slot] / total
+        shoe = remove_card(shoe, slot)
+        total -= 1
+    return probability
+
+
+def compute_eor(decks: int = 1, rules: Rules = Rules(), deviations: Sequence[Deviation] = DEVIATIONS) -> EffectsOfRemoval:
+    """Exact basic-strategy EORs for a ``decks``-deck shoe under ``rules``."""
+
+    engine = StrategyEngine(rules)
+    # Index plays include surrender, so price it even when the game lacks it.
+    decision_engine = StrategyEngine(replace(rules, surrender=True), dealer=engine.dealer)
+    shoe = full_shoe(decks)
+    base_ev, basic = round_ev(engine, shoe)
+    decisions = tuple(deviation for deviation in deviations if deviation.play != INSURE)
+    base_gaps = [_decision_gap(decision_engine, shoe, deviation) for deviation in decisions]
+
+    overall: List[float] = []
+    insurance: List[float] = []
+    gaps: List[List[float]] = []
+    for slot in range(_SLOTS):
+        removed = remove_card(shoe, slot)
+        ev, _ = round_ev(engine, removed, basic)
+        overall.append(ev - base_ev)
+        insurance.append(_insurance_ev(remove_card(removed, ACE)) - _insurance_ev(remove_card(shoe, ACE)))
+        row = []
+        for deviation, base_gap in zip(decisions, base_gaps):
+            gap = _decision_gap(decision_engine, removed, deviation)
+            row.append(0.0 if gap is None or base_gap is None else gap - base_gap)
+        gaps.append(row)
+
+    decision_eors = np.array([_expand(column) for column in zip(*gaps)]).reshape(len(decisions), len(RANKS))
+    weights = np.array([_deal_probability(shoe, deviation) for deviation in decisions])
+    return EffectsOfRemoval(
+        decks=decks,
+        rules=rules,
+        base_ev=base_ev,
+        overall=_expand(overall),
+        insurance=_expand(insurance),
+        decisions=decisions,
+        decision_eors=decision_eors,
+        decision_weights=weights / weights.sum() if weights.sum() else weights,
+    )
+
+
+def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    centred = matrix - matrix.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centred, axis=1, keepdims=True)
+    return np.divide(centred, norms, out=np.zeros_like(centred), where=norms > 0)
+
+
+def score_tags(tags: np.ndarray, eor: EffectsOfRemoval) -> Dict[str, np.ndarray]:
+    """Score tag tables (one row of 13 tags per system) against ``eor``.
+
+    Returns arrays of betting correlation, playing efficiency and insurance
+    correlation, one entry per row of ``tags``.
+    """
+
+    tags = np.atleast_2d(np.asarray(tags, dtype=np.float64))
+    # A positive tag means the card is good for the player when it is gone,
+    # so it should line up with a positive EOR.
+    targets = np.vstack([eor.overall, eor.insurance, eor.decision_eors])
+    correlations = _normalise_rows(tags) @ _normalise_rows(targets).T
+
+    direction = np.array([1.0 if deviation.above else -1.0 for deviation in eor.decisions])
+    aligned = correlations[:, 2:] * direction
+    return {
+        "betting": correlations[:, 0],
+        "playing": aligned @ eor.decision_weights,
+        "insurance": correlations[:, 1],
+    }
+
+
+def tag_matrix(systems: Sequence[CountingSystem]) -> np.ndarray:
+    return np.array([[system.tag(rank) for rank in RANKS] for system in systems])
+
+
+def _parse_tags(text: str) -> List[float]:
+    values = [float(value) for value in text.split(",")]
+    if len(values) == 10:
+        return [_tags(values)[rank] for rank in RANKS]
+    if len(values) == len(RANKS):
+        return values
+    raise argparse.ArgumentTypeError("give 10 tags (2-9, ten, ace) or 13 (2 through A)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=1, help="decks the EORs are computed for (default: 1)")
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument(
+        "--tags",
+        type=_parse_tags,
+        action="append",
+        default=[],
+        help="extra tag table to score, e.g. 1,1,1,1,1,0,0,0,-1,-1; repeat for several",
+    )
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    eor = compute_eor(args.decks, Rules(hits_soft_17=args.h17))
+    print(eor.format())
+
+    systems = registered_systems()
+    names = [system.name for system in systems] + [f"custom {index + 1}" for index in range(len(args.tags))]
+    tags = np.vstack([tag_matrix(systems)] + [np.array(args.tags)] if args.tags else [tag_matrix(systems)])
+    scores = score_tags(tags, eor)
+    print()
+    print(f"{'system':<12}{'BC':>8}{'PE':>8}{'IC':>8}")
+    for index, name in enumerate(names):
+        print(
+            f"{name:<12}{scores['betting'][index]:>8.3f}{scores['playing'][index]:>8.3f}"
+            f"{scores['insurance'][index]:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,39 +2,109 @@
 
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 
+from blackjack_counter.dealer import CARD_NAMES, remove_card, shoe_from_composition
+from blackjack_counter.bet_ramps import RampTable, format_bet, load_ramp_tables, ramp_table
+from blackjack_counter.deviations import format_active, index_table
 from blackjack_counter.formatting import format_increment
-from blackjack_counter.state import CountingState
+from blackjack_counter.frames.history import HistoryStrip
+from blackjack_counter.state import CapabilityChanged, CountingState, StateEvent
+from blackjack_counter.strategy import StrategyEngine, hand_cards, hand_choices
+from blackjack_counter.systems import CountingSystem
 
 if TYPE_CHECKING:  # pragma: no cover - only for type checkers
     from blackjack_counter.app import CountingApp
 
+# Bit of ``event.state`` set while Control is held.
+CONTROL_MASK = 0x0004
+
+# (keysym, control held) -> action; Shift shows up in the keysym itself ("z" vs "Z").
+KeyChord = Tuple[str, bool]
+KeyMap = Dict[KeyChord, Callable[[], None]]
+
+# The best-play hint is worked out once card entry has paused for this long.
+PLAY_HINT_SETTLE_MS = 120
+
+
+def letter_chords(*keys: str, control: bool = False) -> Tuple[KeyChord, ...]:
+    """Chords for ``keys``, matching letters typed with or without Shift/Caps Lock."""
+
+    chords = []
+    for key in keys:
+        chords.append((key, control))
+        if key.isalpha() and key.upper() != key:
+            chords.append((key.upper(), control))
+    return tuple(chords)
+
 
 class BaseModeFrame(ttk.Frame):
     """Base layout that provides shared controls and data binding."""
 
-    def __init__(self, master: ttk.Frame, controller: "CountingApp", **kwargs) -> None:
+    def __init__(
+        self,
+        master: ttk.Frame,
+        controller: "CountingApp",
+        system: Optional[CountingSystem] = None,
+        **kwargs,
+    ) -> None:
         super().__init__(master, padding=12, **kwargs)
         self.controller = controller
+        self.system = system
         self.state: Optional[CountingState] = None
 
-        self.history_var = tk.StringVar(value="-")
+        self.history_strip: Optional[HistoryStrip] = None
+        self.history_scale: Optional[ttk.Scale] = None
+        self._history_scale_end = 0
+        self._syncing_history_scale = False
         self.running_var = tk.StringVar(value="0")
         self.true_var = tk.StringVar(value="0.00")
         self.cards_var = tk.StringVar(value="Cards seen: 0")
+        self.play_var = tk.StringVar(value="-")
+        self.deviation_var = tk.StringVar(value="")
+        self.index_table = index_table(system.key) if system is not None else None
+        self.bet_var = tk.StringVar(value="")
+        self.ramp_table: Optional[RampTable] = None
+
+        self.strategy = StrategyEngine()
+        self._hand_choices = hand_choices()
+        self.hand_combo: Optional[ttk.Combobox] = None
+        self.upcard_combo: Optional[ttk.Combobox] = None
+        self._play_hint_after: Optional[str] = None
 
         self.reset_button: Optional[ttk.Button] = None
         self.menu_button: Optional[ttk.Button] = None
         self.undo_button: Optional[ttk.Button] = None
         self.redo_button: Optional[ttk.Button] = None
+        self._control_states: Optional[Tuple[bool, bool]] = None
+        # Last text written to each StringVar (by Tcl name), so unchanged values are skipped.
+        self._shown_text: Dict[str, str] = {}
+        self._unsubscribe: Optional[Callable[[], None]] = None
 
-        self._shortcut_bindings: List[Tuple[str, str]] = []
+        # Entries typed since the last redraw, applied together once Tk is idle.
+        self._pending_input: List[Tuple[str, Optional[float]]] = []
+        self._flush_after: Optional[str] = None
+
+        # Swapped in and out by on_show/on_hide; the app's key dispatcher reads it.
+        self.keymap: KeyMap = {}
+
+    def new_state(self, decks: float) -> CountingState:
+        """Create a fresh shoe scored by this frame's counting system."""
+
+        return CountingState(decks=decks, system=self.system)
 
     def set_state(self, state: CountingState) -> None:
         """Attach a new counting state and refresh the visuals."""
 
+        self._pending_input.clear()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
         self.state = state
+        self._unsubscribe = state.subscribe(self._on_state_change)
+        if self.system is not None:
+            self.ramp_table = ramp_table(self.system.key, state.decks_total)
+        if self.history_strip is not None:
+            self.history_strip.clear()
         self.refresh()
 
     def refresh(self) -> None:
@@ -43,22 +113,50 @@ class BaseModeFrame(ttk.Frame):
         if not self.state:
             return
 
-        history_text = "  ".join(
-            f"{entry.label}({format_increment(entry.value)})" for entry in self.state.history
-        )
-        self.history_var.set(history_text if history_text else "-")
+        self._show_counts()
+        self._sync_control_states()
 
-        self.running_var.set(format_increment(self.state.running_count))
-        self.true_var.set(f"{self.state.true_count:+.2f}")
-        self.cards_var.set(f"Cards seen: {self.state.cards_seen}")
+    def _on_state_change(self, event: StateEvent) -> None:
+        """Update only the widgets a state change affects."""
 
-        self._sync_control_states()
+        if isinstance(event, CapabilityChanged):
+            self._sync_control_states()
+        else:
+            self._show_counts()
+
+    def _show_counts(self) -> None:
+        """Show the counts, history and hints for the current position."""
+
+        if self.history_strip is not None:
+            self.history_strip.sync(self.state.history)
+        self._sync_history_scale()
+
+        true_count = self.state.true_count
+        self._set_text(self.running_var, format_increment(self.state.running_count))
+        self._set_text(self.true_var, f"{true_count:+.2f}")
+        self._set_text(self.cards_var, f"Cards seen: {self.state.cards_seen}")
+        self._schedule_play_hint()
+        if self.index_table is not None:
+            self._set_text(self.deviation_var, format_active(self.index_table.active(true_count)))
+        if self.ramp_table is not None:
+            self._set_text(self.bet_var, format_bet(self.ramp_table.units(true_count)))
+
+    def _set_text(self, var: tk.StringVar, text: str) -> None:
+        """Set ``var`` unless it already shows ``text``."""
+
+        name = str(var)
+        if self._shown_text.get(name) != text:
+            self._shown_text[name] = text
+            var.set(text)
 
     def _sync_control_states(self) -> None:
         """Enable or disable undo/redo buttons based on availability."""
 
         undo_enabled = bool(self.state and self.state.can_undo)
         redo_enabled = bool(self.state and self.state.can_redo)
+        if (undo_enabled, redo_enabled) == self._control_states:
+            return
+        self._control_states = (undo_enabled, redo_enabled)
 
         if self.undo_button is not None:
             self.undo_button.configure(state="normal" if undo_enabled else "disabled")
@@ -66,134 +164,231 @@ class BaseModeFrame(ttk.Frame):
         if self.redo_button is not None:
             self.redo_button.configure(state="normal" if redo_enabled else "disabled")
 
-    def _bind_wraplength(self, label: ttk.Label, container: tk.Widget, padding: int = 18) -> None:
-        """Keep label text wrapping in sync with the container width."""
+    def _build_history_strip(self, container: tk.Widget) -> HistoryStrip:
+        """Create the "Previously Counted" strip inside ``container``."""
+
+        strip = HistoryStrip(container)
+        strip.pack(fill="both", expand=True)
+        self.history_strip = strip
+        return strip
+
+    def _build_history_scale(self, container: tk.Widget) -> ttk.Scale:
+        """Create the slider that scrubs back and forth through the shoe."""
+
+        scale = ttk.Scale(container, orient="horizontal", from_=0, to=0, command=self._on_history_scale)
+        scale.pack(fill="x", pady=(6, 0))
+        self.history_scale = scale
+        self._history_scale_end = 0
+        return scale
+
+    def _build_bet_hint(self, container: tk.Widget) -> Optional[ttk.Label]:
+        """Add the bet the precomputed ramp calls for at the current true count."""
+
+        if self.system is None or self.system.key not in load_ramp_tables():
+            return None
+        label = ttk.Label(container, textvariable=self.bet_var, style="Caption.TLabel", anchor="center")
+        label.pack(fill="x")
+        return label
+
+    def _build_deviation_alert(self, container: tk.Widget) -> Optional[ttk.Label]:
+        """Add the index plays in effect at the current true count under it."""
+
+        if self.index_table is None:
+            return None
+        label = ttk.Label(
+            container,
+            textvariable=self.deviation_var,
+            style="Caption.TLabel",
+            anchor="center",
+            justify="center",
+        )
+        label.pack(fill="x", pady=(6, 0))
+        self._bind_wraplength(label, container)
+        return label
+
+    def _build_play_hint(self, container: tk.Widget) -> ttk.LabelFrame:
+        """Create the "Best Play" box: pick a hand and upcard, read the advice."""
+
+        box = ttk.LabelFrame(container, text="Best Play", padding=8)
+        box.columnconfigure(0, weight=1)
+
+        labels = [label for label, _, _ in self._hand_choices]
+        self.hand_combo = ttk.Combobox(box, values=labels, state="readonly", width=14)
+        self.hand_combo.current(labels.index("Hard 16"))
+        self.hand_combo.grid(row=0, column=0, sticky="ew")
+        self.upcard_combo = ttk.Combobox(box, values=list(CARD_NAMES), state="readonly", width=4)
+        self.upcard_combo.current(CARD_NAMES.index("10"))
+        self.upcard_combo.grid(row=0, column=1, sticky="e", padx=(4, 0))
+        ttk.Label(box, textvariable=self.play_var, style="Caption.TLabel", anchor="center").grid(
+            row=1, column=0, columnspan=2, sticky="ew", pady=(6, 0)
+        )
 
-        def _sync_wrap(event) -> None:
-            usable_width = max(60, event.width - padding)
-            label.configure(wraplength=usable_width)
+        for combo in (self.hand_combo, self.upcard_combo):
+            combo.bind("<<ComboboxSelected>>", lambda _event: self._update_play_hint(), add="+")
+        return box
 
-        container.bind("<Configure>", _sync_wrap, add="+")
-        container.after_idle(lambda: label.configure(wraplength=max(60, container.winfo_width() - padding)))
+    def _schedule_play_hint(self) -> None:
+        """Update the best-play hint once card entry pauses, not on every press."""
 
-    def _freeze_panel_width(
-        self,
-        panel: tk.Widget,
-        *,
-        column_manager: tk.Widget,
-        column_index: int,
-        inner: Optional[tk.Widget] = None,
-    ) -> None:
-        """Keep a panel from growing wider than its initial width."""
+        if self.hand_combo is None:
+            return
+        if self._play_hint_after is not None:
+            self.after_cancel(self._play_hint_after)
+        self._play_hint_after = self.after(PLAY_HINT_SETTLE_MS, self._update_play_hint)
+
+    def _update_play_hint(self) -> None:
+        """Show the best action for the chosen hand against the remaining shoe."""
+
+        if self._play_hint_after is not None:
+            self.after_cancel(self._play_hint_after)
+            self._play_hint_after = None
+        if self.hand_combo is None or self.upcard_combo is None or not self.state:
+            return
+        shoe = shoe_from_composition(self.state.composition)
+        hand = self.hand_combo.current()
+        upcard = self.upcard_combo.current()
+        if hand < 0 or upcard < 0:
+            self._set_text(self.play_var, "-")
+            return
+        _, kind, total = self._hand_choices[hand]
+        # Take the upcard and both of the player's cards out of the shoe before advising.
+        try:
+            for slot in (upcard, *hand_cards(kind, total)):
+                shoe = remove_card(shoe, slot)
+        except ValueError:
+            # One of those cards is used up in this shoe.
+            self._set_text(self.play_var, "-")
+            return
+        if sum(shoe) == 0:
+            self._set_text(self.play_var, "-")
+            return
+        advice = self.strategy.advise_hand(shoe, kind, total, upcard)
+        self._set_text(self.play_var, f"{advice.best.title()} (EV {advice.best_ev:+.3f})")
+
+    def _sync_history_scale(self) -> None:
+        """Match the slider range and handle to the state's position."""
+
+        if self.history_scale is None or not self.state:
+            return
+
+        end = self.state.end
+        if end != self._history_scale_end:
+            self.history_scale.configure(to=end)
+            self._history_scale_end = end
+
+        self._syncing_history_scale = True
+        try:
+            self.history_scale.set(self.state.position)
+        finally:
+            self._syncing_history_scale = False
 
-        if getattr(panel, "_width_locked", False):
+    def _on_history_scale(self, value: str) -> None:
+        """Jump straight to the entry under the slider handle."""
+
+        if self._syncing_history_scale or not self.state:
             return
+        self._apply_pending()
+        self.state.seek(min(self.state.end, max(0, int(round(float(value))))))
+
+    def _bind_wraplength(self, label: ttk.Label, container: tk.Widget, padding: int = 18) -> None:
+        """Keep label text wrapping in sync with the container width."""
+
+        self.controller.track_wraplength(label, container, padding)
+
+    def _track_column_minsize(self, manager: tk.Misc, column: int, source: tk.Widget) -> None:
+        """Let ``manager``'s ``column`` shrink no narrower than ``source``."""
 
-        def _capture_width() -> None:
-            panel.update_idletasks()
-            width = panel.winfo_width()
-            if width <= 1:
-                panel.after(50, _capture_width)
-                return
-
-            column_manager.columnconfigure(column_index, weight=0, minsize=width)
-            try:
-                panel.configure(width=width)
-            except tk.TclError:
-                pass
-            try:
-                panel.grid_propagate(False)
-            except tk.TclError:
-                pass
-            if inner is not None:
-                try:
-                    inner.configure(width=width)
-                except tk.TclError:
-                    pass
-            panel._width_locked = True  # type: ignore[attr-defined]
-
-        panel.after_idle(_capture_width)
+        self.controller.track_column_minsize(self._layout_owner(), f"column:{column}", manager, column, source)
+
+    def _layout_owner(self) -> str:
+        return self.system.key if self.system is not None else type(self).__name__
 
     def _reset_shoe(self) -> None:
         """Clear the shoe back to an empty state."""
 
         if not self.state:
             return
+        self._pending_input.clear()
         self.state.reset()
-        self.refresh()
 
     def _undo_entry(self) -> None:
         """Remove the most recent recorded value."""
 
         if not self.state:
             return
-        removed = self.state.undo()
-        if removed is not None:
-            self.refresh()
+        self._apply_pending()
+        self.state.undo()
 
     def _redo_entry(self) -> None:
         """Reapply the most recently undone value."""
 
         if not self.state:
             return
-        restored = self.state.redo()
-        if restored is not None:
-            self.refresh()
+        self._apply_pending()
+        self.state.redo()
+
+    def _queue_entry(self, label: str, value: Optional[float] = None) -> None:
+        """Queue an entry to record; ``value`` of ``None`` records ``label`` as a card.
+
+        A burst of key presses (fast entry or auto-repeat) is applied as one
+        ``record_many`` call, and so one redraw, once the event loop goes idle.
+        """
+
+        if not self.state:
+            return
+        self._pending_input.append((label, value))
+        if self._flush_after is None:
+            self._flush_after = self.after_idle(self._apply_pending)
+
+    def _apply_pending(self) -> None:
+        """Record the queued entries in order; the state's events redraw."""
+
+        if self._flush_after is not None:
+            self.after_cancel(self._flush_after)
+            self._flush_after = None
+        if not self._pending_input or not self.state:
+            return
+        entries, self._pending_input = self._pending_input, []
+        self.state.record_many(entries)
 
     def _go_menu(self) -> None:
         """Return to the mode-selection screen."""
 
         self.controller.show_frame("ModeSelection")
 
-    def _bind_shortcut(self, sequence: str, callback) -> str:
-        """Register a keyboard shortcut and track it for later cleanup."""
+    def _build_keymap(self) -> KeyMap:
+        """Shortcuts active while the frame is shown; subclasses add their own."""
 
-        funcid = self.controller.bind(sequence, callback, add="+")
-        self._shortcut_bindings.append((sequence, funcid))
+        keymap: KeyMap = {("r", True): self._reset_shoe}
+        for chord in (("less", False), ("comma", False), ("z", True)):
+            keymap[chord] = self._undo_entry
+        for chord in (("greater", False), ("period", False), ("Z", True), ("y", True), ("Y", True)):
+            keymap[chord] = self._redo_entry
+        return keymap
 
-        return funcid
+    def _refresh_keymap(self) -> None:
+        """Rebuild the active shortcuts after a hotkey option changes."""
 
-    def _unbind_shortcut(self, sequence: str, funcid: str) -> None:
-        """Remove a previously registered shortcut if it is active."""
+        if self.keymap:
+            self.keymap = self._build_keymap()
 
-        try:
-            self.controller.unbind(sequence, funcid)
-        finally:
-            try:
-                self._shortcut_bindings.remove((sequence, funcid))
-            except ValueError:
-                pass
+    def handle_key(self, event: tk.Event) -> Optional[str]:
+        """Run the action bound to the pressed key, if any."""
+
+        action = self.keymap.get((event.keysym, bool(event.state & CONTROL_MASK)))
+        if action is None:
+            return None
+        action()
+        return "break"
 
     def on_show(self) -> None:
         """Prepare the frame when it becomes visible."""
 
         self.focus_set()
-        self._shortcut_bindings.clear()
-
-        def _wrap(action):
-            def handler(event):
-                action()
-                return "break"
-
-            return handler
-
-        self._bind_shortcut("<Control-r>", _wrap(self._reset_shoe))
-        for sequence in ("<less>", "<KeyPress-comma>", "<Control-z>"):
-            self._bind_shortcut(sequence, _wrap(self._undo_entry))
-        for sequence in (
-            "<greater>",
-            "<KeyPress-period>",
-            "<Control-Shift-Z>",
-            "<Control-y>",
-            "<Control-Y>",
-        ):
-            self._bind_shortcut(sequence, _wrap(self._redo_entry))
+        self.keymap = self._build_keymap()
 
     def on_hide(self) -> None:
-        """Remove any active bindings before the frame is hidden."""
-
-        for sequence, funcid in self._shortcut_bindings:
-            self.controller.unbind(sequence, funcid)
-        self._shortcut_bindings.clear()
-
+        """Drop the shortcuts before the frame is hidden."""
 
+        self._apply_pending()
+        self.keymap = {}
@@ -4,6 +4,7 @@
 # - Cards ranked 2 through 6 are considered "low" and add +1 to the running count.
 # - Cards ranked 10, face cards, and aces are "high" and subtract 1 from the running count.
 # - The interface mirrors that logic with Low/Hi buttons; each press records the adjustment and refreshes totals.
+# - Neutral cards (7-9) leave the count alone but still leave the shoe, so they get their own input.
 
 
 import tkinter as tk
@@ -11,7 +12,10 @@ from tkinter import ttk
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 
-from blackjack_counter.frames.base import BaseModeFrame
+from blackjack_counter.formatting import format_increment
+from blackjack_counter.frames.base import BaseModeFrame, KeyMap, letter_chords
+from blackjack_counter.state import RANKS
+from blackjack_counter.systems import HI_LO
 
 if TYPE_CHECKING:  # pragma: no cover - only for type checkers
     from blackjack_counter.app import CountingApp
@@ -20,98 +24,100 @@ if TYPE_CHECKING:  # pragma: no cover - only for type checkers
 class HiLoFrame(BaseModeFrame):
     """Four-column layout with high and low buttons for the Hi-Lo system."""
 
-    LOW_CARD_LABELS: Tuple[str, ...] = ("2", "3", "4", "5", "6")
-    HIGH_CARD_LABELS: Tuple[str, ...] = ("10", "J", "Q", "K", "A")
-    RANK_MODE_ENTRIES: Tuple[Tuple[str, str, str], ...] = (
-        ("2", "2", "low"),
-        ("3", "3", "low"),
-        ("4", "4", "low"),
-        ("5", "5", "low"),
-        ("6", "6", "low"),
-        ("7", "7", "neutral"),
-        ("8", "8", "neutral"),
-        ("9", "9", "neutral"),
-        ("0", "10", "hi"),
-        ("q", "J", "hi"),
-        ("w", "Q", "hi"),
-        ("e", "K", "hi"),
-        ("1", "A", "hi"),
+    LOW_CARD_LABELS: Tuple[str, ...] = tuple(rank for rank in RANKS if HI_LO.tag(rank) > 0)
+    HIGH_CARD_LABELS: Tuple[str, ...] = tuple(rank for rank in RANKS if HI_LO.tag(rank) < 0)
+    # (key, rank) pairs; whether a rank counts as low, high or neutral comes from its tag.
+    RANK_MODE_KEYS: Tuple[Tuple[str, str], ...] = (
+        ("2", "2"),
+        ("3", "3"),
+        ("4", "4"),
+        ("5", "5"),
+        ("6", "6"),
+        ("7", "7"),
+        ("8", "8"),
+        ("9", "9"),
+        ("0", "10"),
+        ("q", "J"),
+        ("w", "Q"),
+        ("e", "K"),
+        ("1", "A"),
     )
 
     def __init__(self, master: ttk.Frame, controller: "CountingApp") -> None:
-        super().__init__(master, controller)
+        super().__init__(master, controller, system=HI_LO)
+        self._low_value = HI_LO.tag(self.LOW_CARD_LABELS[0])
+        self._hi_value = HI_LO.tag(self.HIGH_CARD_LABELS[0])
 
-        self._is_active = False
         self._hotkey_window: Optional[tk.Toplevel] = None
         self._rank_mode_var = tk.BooleanVar(master=self, value=False)
-        self._rank_bindings: List[Tuple[str, str]] = []
-        self._rank_mode_active = False
         self._rank_info_label: Optional[ttk.Label] = None
-        # Hotkey definitions live here; tweak sequences/filters below before they get bound.
+        # Hotkey definitions live here; keys are Tk keysyms, matched without Control held.
         self._hotkey_groups = [
             {
                 "name": "letters",
                 "title": "Letters",
                 "low_label": "L",
                 "hi_label": "H",
-                "low_sequences": ("<KeyPress-l>", "<KeyPress-L>"),
-                "hi_sequences": ("<KeyPress-h>", "<KeyPress-H>"),
+                "neutral_label": "N",
+                "low_keys": ("l", "L"),
+                "hi_keys": ("h", "H"),
+                "neutral_keys": ("n", "N"),
             },
             {
                 "name": "adjacent",
                 "title": "A / D",
                 "low_label": "A",
                 "hi_label": "D",
-                "low_sequences": ("<KeyPress-a>", "<KeyPress-A>"),
-                "hi_sequences": ("<KeyPress-d>", "<KeyPress-D>"),
+                "neutral_label": "S",
+                "low_keys": ("a", "A"),
+                "hi_keys": ("d", "D"),
+                "neutral_keys": ("s", "S"),
             },
             {
                 "name": "symbols",
                 "title": "Minus / Plus",
                 "low_label": "-",
                 "hi_label": "+",
-                "low_sequences": ("<KeyPress-minus>", "<minus>", "<KeyPress-KP_Subtract>", "<KP_Subtract>"),
-                "hi_sequences": (
-                    "<KeyPress-plus>",
-                    "<plus>",
-                    "<KeyPress-equal>",
-                    "<equal>",
-                    "<KeyPress-KP_Add>",
-                    "<KP_Add>",
-                ),
-                "hi_expected_keysyms": ("plus", "equal", "KP_Add"),
+                "low_keys": ("minus", "KP_Subtract"),
+                "hi_keys": ("plus", "equal", "KP_Add"),
             },
             {
                 "name": "horizontal_arrows",
                 "title": "Arrow Keys",
                 "low_label": "←",
                 "hi_label": "→",
-                "low_sequences": ("<Left>",),
-                "hi_sequences": ("<Right>",),
+                "low_keys": ("Left",),
+                "hi_keys": ("Right",),
             },
             {
                 "name": "vertical_arrows",
                 "title": "Vertical Arrows",
                 "low_label": "↓",
                 "hi_label": "↑",
-                "low_sequences": ("<Down>",),
-                "hi_sequences": ("<Up>",),
+                "low_keys": ("Down",),
+                "hi_keys": ("Up",),
             },
             {
                 "name": "brackets",
                 "title": "Brackets",
                 "low_label": "[",
                 "hi_label": "]",
-                "low_sequences": ("<KeyPress-bracketleft>", "<bracketleft>"),
-                "hi_sequences": ("<KeyPress-bracketright>", "<bracketright>"),
+                "low_keys": ("bracketleft",),
+                "hi_keys": ("bracketright",),
             },
         ]
         self._hotkey_lookup = {group["name"]: group for group in self._hotkey_groups}
         self._group_enabled: Dict[str, bool] = {
             group_name: True for group_name in self._hotkey_lookup
         }
-        self._group_bindings: Dict[str, List[Tuple[str, str]]] = {
-            group_name: [] for group_name in self._hotkey_lookup
+        # Prebuilt so toggling a group or rank mode only merges dicts.
+        self._group_keymaps: Dict[str, KeyMap] = {
+            group["name"]: self._group_keymap(group) for group in self._hotkey_groups
+        }
+        self._rank_keymap: KeyMap = {
+            chord: self._make_rank_action(card)
+            for key, card in self.RANK_MODE_KEYS
+            for chord in letter_chords(key)
         }
         self._hotkey_vars: Dict[str, tk.BooleanVar] = {
             name: tk.BooleanVar(master=self, value=True) for name in self._hotkey_lookup
@@ -144,22 +150,17 @@ class HiLoFrame(BaseModeFrame):
 
         history_box = ttk.LabelFrame(history_frame, text="Previously Counted", padding=8)
         history_box.grid(row=0, column=0, sticky="nsew")
-        history_label = ttk.Label(
-            history_box,
-            textvariable=self.history_var,
-            style="Caption.TLabel",
-            anchor="w",
-            justify="left",
-        )
-        history_label.pack(fill="x")
-        self._bind_wraplength(history_label, history_box)
+        self._build_history_strip(history_box)
+        self._build_history_scale(history_box)
 
         reference_frame = ttk.Frame(history_frame)
         reference_frame.grid(row=1, column=0, sticky="ew", pady=(8, 0))
         reference_frame.columnconfigure(0, weight=1)
         reference_frame.columnconfigure(1, weight=1)
 
-        low_frame = ttk.LabelFrame(reference_frame, text="Low Cards (+1)", padding=6)
+        low_frame = ttk.LabelFrame(
+            reference_frame, text=f"Low Cards ({format_increment(self._low_value)})", padding=6
+        )
         low_frame.grid(row=0, column=0, sticky="ew", padx=(0, 4))
         ttk.Label(
             low_frame,
@@ -168,7 +169,9 @@ class HiLoFrame(BaseModeFrame):
             justify="center",
         ).pack(fill="x")
 
-        high_frame = ttk.LabelFrame(reference_frame, text="High Cards (-1)", padding=6)
+        high_frame = ttk.LabelFrame(
+            reference_frame, text=f"High Cards ({format_increment(self._hi_value)})", padding=6
+        )
         high_frame.grid(row=0, column=1, sticky="ew", padx=(4, 0))
         ttk.Label(
             high_frame,
@@ -181,34 +184,44 @@ class HiLoFrame(BaseModeFrame):
         button_bar.grid(row=2, column=0, sticky="ew", pady=(8, 0))
         button_bar.columnconfigure(0, weight=1, uniform="history_hi_lo")
         button_bar.columnconfigure(1, weight=1, uniform="history_hi_lo")
+        button_bar.columnconfigure(2, weight=1, uniform="history_hi_lo")
 
         self.low_button = ttk.Button(
             button_bar,
 
-            text="Low (+1)",
+            text=f"Low ({format_increment(self._low_value)})",
 
-            command=lambda: self._record("Low", 1.0),
+            command=lambda: self._record("Low", self._low_value),
         )
         self.low_button.grid(row=0, column=0, sticky="ew", padx=(0, 4))
 
         self.hi_button = ttk.Button(
             button_bar,
 
-            text="Hi (-1)",
+            text=f"Hi ({format_increment(self._hi_value)})",
 
-            command=lambda: self._record("Hi", -1.0),
+            command=lambda: self._record("Hi", self._hi_value),
         )
-        self.hi_button.grid(row=0, column=1, sticky="ew")
+        self.hi_button.grid(row=0, column=2, sticky="ew")
+
+        self.neutral_button = ttk.Button(
+            button_bar,
+            text="Neutral (0)",
+            command=lambda: self._record("Neutral", 0.0),
+        )
+        self.neutral_button.grid(row=0, column=1, sticky="ew", padx=(0, 4))
 
         true_frame = ttk.Frame(self, padding=(6, 0))
         true_frame.grid(row=0, column=2, sticky="nsew")
         true_frame.columnconfigure(0, weight=1)
-        true_frame.bind("<Configure>", self._update_history_column_minsize, add="+")
+        self._track_column_minsize(self, 1, true_frame)
 
         true_box = ttk.LabelFrame(true_frame, text="True Count", padding=8)
         true_box.grid(row=0, column=0, sticky="nsew")
         ttk.Label(true_box, textvariable=self.true_var, style="Value.TLabel", anchor="center").pack(fill="x")
+        self._build_bet_hint(true_box)
         ttk.Label(true_box, textvariable=self.cards_var, style="Caption.TLabel", anchor="center").pack(fill="x", pady=(6, 0))
+        self._build_deviation_alert(true_box)
 
         self.undo_button = ttk.Button(true_frame, text="Undo [< / Ctrl+Z]", command=self._undo_entry)
         self.undo_button.grid(row=1, column=0, sticky="ew", pady=(8, 4))
@@ -225,69 +238,18 @@ class HiLoFrame(BaseModeFrame):
         running_box.grid(row=0, column=0, sticky="new")
         ttk.Label(running_box, textvariable=self.running_var, style="Value.TLabel", anchor="center").pack(fill="x")
 
+        self._build_play_hint(running_frame).grid(row=1, column=0, sticky="new", pady=(8, 0))
+
     def _record(self, label: str, value: float) -> None:
         """Store the Hi-Lo adjustment so the shared state can update counts."""
-        if not self.state:
-            return
-        self.state.record(label, value)
-        self.refresh()
-
-    def _update_history_column_minsize(self, event: tk.Event) -> None:
-        """Keep the history column allowed to shrink down to the true-count width."""
-
-        width = max(1, event.width)
-        self.columnconfigure(1, minsize=width)
+        self._queue_entry(label, value)
 
     def _toggle_rank_mode(self) -> None:
         """Enable or disable rank-based shortcuts based on the checkbox state."""
 
-        enabled = self._rank_mode_var.get()
-        if enabled:
-            if self._is_active:
-                self._bind_rank_keys()
-        else:
-            self._unbind_rank_keys()
+        self._refresh_keymap()
         self._refresh_rank_mode_ui()
 
-    def _bind_rank_keys(self) -> None:
-        """Attach key bindings for each rank-to-action mapping."""
-
-        if self._rank_mode_active:
-            return
-
-        self._rank_bindings = []
-
-        for key, _card, category in self.RANK_MODE_ENTRIES:
-            if category == "low":
-                handler = self._handle_low_key
-            elif category == "hi":
-                handler = self._handle_hi_key
-            else:
-                continue
-
-            sequences = [f"<KeyPress-{key}>"]
-            if key.isalpha():
-                sequences.append(f"<KeyPress-{key.upper()}>")
-
-            for sequence in sequences:
-                funcid = self._bind_shortcut(sequence, handler)
-                self._rank_bindings.append((sequence, funcid))
-
-        self._rank_mode_active = True
-
-    def _unbind_rank_keys(self) -> None:
-        """Remove rank-based key bindings if they are active."""
-
-        if not self._rank_bindings:
-            self._rank_mode_active = False
-            return
-
-        for sequence, funcid in self._rank_bindings:
-            self._unbind_shortcut(sequence, funcid)
-
-        self._rank_bindings = []
-        self._rank_mode_active = False
-
     def _refresh_rank_mode_ui(self) -> None:
         """Update the descriptive text shown in the rank-mode section."""
 
@@ -299,138 +261,65 @@ class HiLoFrame(BaseModeFrame):
             high_entries: List[str] = []
             neutral_entries: List[str] = []
 
-            for key, card, category in self.RANK_MODE_ENTRIES:
+            for key, card in self.RANK_MODE_KEYS:
                 key_display = key.upper() if key.isalpha() else key
                 entry = f"{card} [{key_display}]"
-                if category == "low":
+                tag = HI_LO.tag(card)
+                if tag > 0:
                     low_entries.append(entry)
-                elif category == "hi":
+                elif tag < 0:
                     high_entries.append(entry)
                 else:
                     neutral_entries.append(entry)
 
             lines = [
-                "Low (+1): " + ", ".join(low_entries),
-                "High (-1): " + ", ".join(high_entries),
+                f"Low ({format_increment(self._low_value)}): " + ", ".join(low_entries),
+                f"High ({format_increment(self._hi_value)}): " + ", ".join(high_entries),
             ]
             if neutral_entries:
-                lines.append("Neutral (0): " + ", ".join(neutral_entries) + " (no change)")
+                lines.append("Neutral (0): " + ", ".join(neutral_entries) + " (counted as cards seen)")
             text = "\n".join(lines)
         else:
             text = "Enable rank mode to use card-rank shortcuts (2-A)."
 
         self._rank_info_label.configure(text=text)
 
-    def on_show(self) -> None:
-        super().on_show()
-
-        self._is_active = True
-
-        for name in self._group_bindings:
-            self._group_bindings[name] = []
-
-        self._bind_enabled_hotkeys()
-        if self._rank_mode_var.get():
-            self._bind_rank_keys()
-
     def on_hide(self) -> None:
-        self._unbind_rank_keys()
-        self._is_active = False
-
         if self._hotkey_window is not None and self._hotkey_window.winfo_exists():
-            self._hotkey_window.destroy()
+            self._hotkey_window.withdraw()
 
         super().on_hide()
 
-        for name in self._group_bindings:
-            self._group_bindings[name] = []
-
-    def _handle_low_key(self, event) -> str:
-        self._record("Low", 1.0)
-        return "break"
-
-    def _handle_hi_key(self, event) -> str:
-        self._record("Hi", -1.0)
-        return "break"
-
-    def _bind_enabled_hotkeys(self) -> None:
+    def _build_keymap(self) -> KeyMap:
+        keymap = super()._build_keymap()
         for name, enabled in self._group_enabled.items():
             if enabled:
-                self._bind_hotkey_group(name)
-
-    def _char_filtered_handler(self, handler, *, expected_char: Optional[str], expected_keysyms: Tuple[str, ...]):
-        """Return a handler that only fires when the expected char or keysym is pressed."""
-
-        def _filtered(event):
-            char = getattr(event, "char", "")
-            keysym = getattr(event, "keysym", "")
-            if expected_char is not None and char == expected_char:
-                return handler(event)
-            if expected_keysyms and keysym in expected_keysyms:
-                return handler(event)
-            return None
-
-        return _filtered
-
-    def _bind_hotkey_group(self, name: str) -> None:
-        self._unbind_hotkey_group(name)
-
-        group = self._hotkey_lookup[name]
-        low_expected_char = group.get("low_expected_char")
-        low_expected_keysyms: Tuple[str, ...] = tuple(group.get("low_expected_keysyms", ()))
-        if low_expected_char is None and not low_expected_keysyms:
-            low_handler = self._handle_low_key
-        else:
-            low_handler = self._char_filtered_handler(
-                self._handle_low_key,
-                expected_char=low_expected_char,
-                expected_keysyms=low_expected_keysyms,
-            )
-
-        hi_expected_char = group.get("hi_expected_char")
-        hi_expected_keysyms: Tuple[str, ...] = tuple(group.get("hi_expected_keysyms", ()))
-        if hi_expected_char is None and not hi_expected_keysyms:
-            hi_handler = self._handle_hi_key
-        else:
-            hi_handler = self._char_filtered_handler(
-                self._handle_hi_key,
-                expected_char=hi_expected_char,
-                expected_keysyms=hi_expected_keysyms,
-            )
-
-        bindings: List[Tuple[str, str]] = []
-
-        for seq in group["low_sequences"]:
-            funcid = self._bind_shortcut(seq, low_handler)
-            bindings.append((seq, funcid))
-
-        for seq in group["hi_sequences"]:
-            funcid = self._bind_shortcut(seq, hi_handler)
-            bindings.append((seq, funcid))
-
-        self._group_bindings[name] = bindings
-
-    def _unbind_hotkey_group(self, name: str) -> None:
-        bindings = self._group_bindings.get(name)
-        if not bindings:
-            return
-
-        for sequence, funcid in bindings:
-            self._unbind_shortcut(sequence, funcid)
-
-        self._group_bindings[name] = []
+                keymap.update(self._group_keymaps[name])
+        if self._rank_mode_var.get():
+            keymap.update(self._rank_keymap)
+        return keymap
+
+    def _group_keymap(self, group: Dict) -> KeyMap:
+        keymap: KeyMap = {}
+        for keys, action in (
+            (group["low_keys"], lambda: self._record("Low", self._low_value)),
+            (group["hi_keys"], lambda: self._record("Hi", self._hi_value)),
+            (group.get("neutral_keys", ()), lambda: self._record("Neutral", 0.0)),
+        ):
+            for keysym in keys:
+                keymap[(keysym, False)] = action
+        return keymap
+
+    def _make_rank_action(self, card: str):
+        def action() -> None:
+            # Rank keys record the actual card so the shoe composition stays exact.
+            self._queue_entry(card)
+
+        return action
 
     def _set_hotkey_group_enabled(self, name: str, enabled: bool) -> None:
-        previous = self._group_enabled.get(name, True)
         self._group_enabled[name] = enabled
-
-        if not self._is_active:
-            return
-
-        if enabled and not previous:
-            self._bind_hotkey_group(name)
-        elif not enabled and previous:
-            self._unbind_hotkey_group(name)
+        self._refresh_keymap()
 
     def _toggle_hotkey_group(self, name: str) -> None:
         enabled = self._hotkey_vars[name].get()
@@ -445,12 +334,15 @@ class HiLoFrame(BaseModeFrame):
         """Present a toggleable reference of the Hi-Lo keyboard shortcuts."""
 
         if self._hotkey_window is not None and self._hotkey_window.winfo_exists():
+            # Built once, then withdrawn on close and shown again here.
+            self._hotkey_window.deiconify()
             self._hotkey_window.lift()
             self._hotkey_window.focus_force()
             return
 
         window = tk.Toplevel(self)
         window.title("Hi-Lo Hotkeys")
+        window.protocol("WM_DELETE_WINDOW", window.withdraw)
         window.resizable(False, False)
         window.transient(self.winfo_toplevel())
 
@@ -477,15 +369,16 @@ class HiLoFrame(BaseModeFrame):
             groups_frame.rowconfigure(row, weight=1)
             card = ttk.LabelFrame(groups_frame, text=group["title"], padding=10)
             card.grid(row=row, column=column, padx=6, pady=6, sticky="nsew")
-            card.columnconfigure(0, weight=1)
-            card.columnconfigure(1, weight=1)
+            labels = [f"Low: {group['low_label']}"]
+            if "neutral_label" in group:
+                labels.append(f"Neutral: {group['neutral_label']}")
+            labels.append(f"Hi: {group['hi_label']}")
 
-            ttk.Label(card, text=f"Low: {group['low_label']}", anchor="center").grid(
-                row=0, column=0, sticky="ew"
-            )
-            ttk.Label(card, text=f"Hi: {group['hi_label']}", anchor="center").grid(
-                row=0, column=1, sticky="ew"
-            )
+            for column_index, text in enumerate(labels):
+                card.columnconfigure(column_index, weight=1)
+                ttk.Label(card, text=text, anchor="center").grid(
+                    row=0, column=column_index, sticky="ew"
+                )
 
             check = ttk.Checkbutton(
                 card,
@@ -493,7 +386,7 @@ class HiLoFrame(BaseModeFrame):
                 variable=self._hotkey_vars[group["name"]],
                 command=lambda name=group["name"]: self._toggle_hotkey_group(name),
             )
-            check.grid(row=1, column=0, columnspan=2, pady=(8, 0))
+            check.grid(row=1, column=0, columnspan=len(labels), pady=(8, 0))
 
         rank_frame = ttk.LabelFrame(container, text="Rank Mode", padding=10)
         rank_frame.grid(row=2, column=0, sticky="ew", pady=(0, 12))
@@ -521,7 +414,7 @@ class HiLoFrame(BaseModeFrame):
             anchor="w",
         ).grid(row=0, column=0, sticky="w")
 
-        ttk.Button(container, text="Close", command=window.destroy).grid(
+        ttk.Button(container, text="Close", command=window.withdraw).grid(
             row=4, column=0, sticky="e", pady=(12, 0)
         )
 
@@ -0,0 +1,173 @@
+"""Scrolling history strip shared by the counting frames."""
+
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+from typing import Deque, Sequence
+
+from blackjack_counter.formatting import format_increment
+from blackjack_counter.state import CountEntry
+
+TOKEN_SEPARATOR = "  "
+EMPTY_PLACEHOLDER = "-"
+
+
+def format_token(entry: CountEntry) -> str:
+    """Render a single history entry the way the strip displays it."""
+
+    return f"{entry.label}({format_increment(entry.value)})"
+
+
+class HistoryStrip(ttk.Frame):
+    """Text-backed view that draws only the most recent history tokens.
+
+    The strip mirrors the tail of a history sequence. ``sync`` compares the
+    sequence length with what is already drawn and inserts or deletes just
+    the tokens that changed, so a key press costs the same whether the shoe
+    holds ten entries or a million. At most ``max_tokens`` entries are kept
+    in the widget; the vertical scrollbar scrolls back through those.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        *,
+        max_tokens: int = 240,
+        height: int = 3,
+        style: str = "Caption.TLabel",
+    ) -> None:
+        super().__init__(master)
+        self.max_tokens = max_tokens
+
+        lookup = ttk.Style(self)
+        text_options = {}
+        font = lookup.lookup(style, "font")
+        if font:
+            text_options["font"] = font
+        background = lookup.lookup("TLabelframe", "background") or lookup.lookup("TFrame", "background")
+        if background:
+            text_options["background"] = background
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self._text = tk.Text(
+            self,
+            wrap="word",
+            width=1,
+            height=height,
+            borderwidth=0,
+            highlightthickness=0,
+            padx=0,
+            pady=0,
+            takefocus=0,
+            cursor="arrow",
+            **text_options,
+        )
+        self._text.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._text.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self._text.configure(yscrollcommand=scrollbar.set)
+
+        # Character length of each drawn token, oldest first.
+        self._token_lengths: Deque[int] = deque()
+        # History index of the oldest drawn token.
+        self._first_index = 0
+        self._placeholder = False
+        self._show_placeholder()
+
+    @property
+    def drawn_count(self) -> int:
+        """Number of tokens currently present in the widget."""
+
+        return len(self._token_lengths)
+
+    def clear(self) -> None:
+        """Drop every drawn token and show the empty placeholder."""
+
+        self._edit(lambda: self._text.delete("1.0", "end"))
+        self._token_lengths.clear()
+        self._first_index = 0
+        self._placeholder = False
+        self._show_placeholder()
+
+    def sync(self, history: Sequence[CountEntry]) -> None:
+        """Bring the drawn tokens in line with ``history``.
+
+        Entries are only ever appended to or removed from the end of the
+        history between calls, so the difference in length says exactly
+        which tokens to add or drop.
+        """
+
+        total = len(history)
+        drawn_end = self._first_index + len(self._token_lengths)
+        if total == drawn_end:
+            return
+        if total == 0:
+            self.clear()
+            return
+
+        if total > drawn_end:
+            start = max(drawn_end, total - self.max_tokens)
+            if start > drawn_end:
+                self._drop_all()
+                self._first_index = start
+            self._edit(lambda: self._append(history, start, total))
+        else:
+            removed = drawn_end - total
+            if removed >= len(self._token_lengths):
+                self._drop_all()
+                self._first_index = max(0, total - self.max_tokens)
+                self._edit(lambda: self._append(history, self._first_index, total))
+            else:
+                self._edit(lambda: self._remove_tail(history, removed))
+
+    def _append(self, history: Sequence[CountEntry], start: int, stop: int) -> None:
+        at_bottom = self._text.yview()[1] >= 1.0
+        if self._placeholder:
+            self._text.delete("1.0", "end")
+            self._placeholder = False
+        for index in range(start, stop):
+            token = format_token(history[index]) + TOKEN_SEPARATOR
+            self._text.insert("end-1c", token)
+            self._token_lengths.append(len(token))
+
+        overflow = len(self._token_lengths) - self.max_tokens
+        if overflow > 0:
+            trim = sum(self._token_lengths.popleft() for _ in range(overflow))
+            self._text.delete("1.0", f"1.0 + {trim} chars")
+            self._first_index += overflow
+
+        if at_bottom:
+            self._text.see("end")
+
+    def _remove_tail(self, history: Sequence[CountEntry], count: int) -> None:
+        trim = sum(self._token_lengths.pop() for _ in range(count))
+        self._text.delete(f"end-1c - {trim} chars", "end-1c")
+
+        # Backfill older entries so the scrollback keeps its depth.
+        while self._first_index > 0 and len(self._token_lengths) < self.max_tokens:
+            self._first_index -= 1
+            token = format_token(history[self._first_index]) + TOKEN_SEPARATOR
+            self._text.insert("1.0", token)
+            self._token_lengths.appendleft(len(token))
+
+    def _drop_all(self) -> None:
+        self._edit(lambda: self._text.delete("1.0", "end"))
+        self._token_lengths.clear()
+        self._placeholder = False
+
+    def _show_placeholder(self) -> None:
+        if self._token_lengths or self._placeholder:
+            return
+        self._edit(lambda: self._text.insert("1.0", EMPTY_PLACEHOLDER))
+        self._placeholder = True
+
+    def _edit(self, action) -> None:
+        """Run ``action`` with the read-only text widget temporarily writable."""
+
+        self._text.configure(state="normal")
+        try:
+            action()
+        finally:
+            self._text.configure(state="disabled")
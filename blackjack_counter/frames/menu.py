@@ -1,7 +1,9 @@
 ﻿"""Menu frames that handle app start and system selection."""
 
 from tkinter import ttk
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from blackjack_counter.systems import registered_systems
 
 if TYPE_CHECKING:  # pragma: no cover - only for type checkers
     from blackjack_counter.app import CountingApp
@@ -31,17 +33,37 @@ class StartMenu(ttk.Frame):
 
         self._start_button = ttk.Button(button_container, text="New Game", command=self._open_mode_selection, width=16)
         self._start_button.grid(row=0, column=0, padx=6, pady=6, sticky="ew")
+        self._resume_button = ttk.Button(
+            button_container, text="Resume Last Shoe", command=self._resume_last_shoe, width=16
+        )
+        self._resume_error = ttk.Label(
+            button_container, text="The last shoe could not be restored.", style="Caption.TLabel", anchor="center"
+        )
 
         wrapper_bottom = ttk.Frame(self)
         wrapper_bottom.pack(fill="x", side="bottom")
         ttk.Label(wrapper_bottom, text="Icon by Freepik on Flaticon", style="Caption.TLabel").pack(pady=(12, 0))
 
+    def on_show(self) -> None:
+        self._resume_error.grid_remove()
+        # Offered only while a journal of an earlier shoe is on disk.
+        if self.controller.last_session() is not None:
+            self._resume_button.grid(row=1, column=0, padx=6, pady=6, sticky="ew")
+        else:
+            self._resume_button.grid_remove()
+
     def _open_mode_selection(self) -> None:
         self.controller.show_frame("ModeSelection")
 
+    def _resume_last_shoe(self) -> None:
+        if not self.controller.resume_last_session():
+            self._resume_error.grid(row=2, column=0, padx=6, pady=(0, 6), sticky="ew")
+
 
 class ModeSelection(ttk.Frame):
-    """Let the player choose between the supported counting systems."""
+    """Let the player choose between the registered counting systems."""
+
+    MAX_ROWS = 4
 
     def __init__(self, master: ttk.Frame, controller: "CountingApp") -> None:
         super().__init__(master, padding=40)
@@ -55,26 +77,23 @@ class ModeSelection(ttk.Frame):
         self._button_container = ttk.Frame(wrapper)
         self._button_container.pack(expand=True, fill="both")
 
-        button_defs = (
-            ("Hi-Lo", self._start_hilo),
-            ("Wong Halves", self._start_wong),
-            ("Back", self._go_back),
-        )
+        button_defs = [
+            (system.name, lambda key=system.key: self.controller.start_system(key))
+            for system in registered_systems()
+        ]
+        button_defs.append(("Back", self._go_back))
         self._buttons = []
         for text, command in button_defs:
             button = ttk.Button(self._button_container, text=text, command=command, width=14)
             self._buttons.append(button)
 
         self._buttons_horizontal = False
+        # Grid placements and weights per orientation, worked out once.
+        self._layout_plans: Dict[bool, Tuple[List[Dict[str, Any]], Dict[Tuple[str, int], int]]] = {}
+        self._grid_weights: Dict[Tuple[str, int], int] = {}
         self._apply_button_layout(horizontal=False)
         self.bind("<Configure>", self._on_resize, add="+")
 
-    def _start_hilo(self) -> None:
-        self.controller.start_mode("HiLoFrame")
-
-    def _start_wong(self) -> None:
-        self.controller.start_mode("WongHalvesFrame")
-
     def _go_back(self) -> None:
         self.controller.show_frame("StartMenu")
 
@@ -88,25 +107,43 @@ class ModeSelection(ttk.Frame):
             self._apply_button_layout(horizontal=should_horizontal)
 
     def _apply_button_layout(self, *, horizontal: bool) -> None:
-        container = self._button_container
-
-        # Clear previous layout
-        for btn in self._buttons:
-            btn.grid_forget()
+        """Move the buttons into the cached grid plan for the orientation."""
 
+        container = self._button_container
+        plan = self._layout_plans.get(horizontal)
+        if plan is None:
+            plan = self._layout_plans[horizontal] = self._plan_button_layout(horizontal)
+        placements, weights = plan
+
+        # grid_configure moves an already gridded button in place, so a flip
+        # only touches the cells and weights that differ.
+        for button, options in zip(self._buttons, placements):
+            button.grid_configure(**options)
+        for (axis, index), weight in weights.items():
+            if self._grid_weights.get((axis, index)) != weight:
+                if axis == "column":
+                    container.grid_columnconfigure(index, weight=weight)
+                else:
+                    container.grid_rowconfigure(index, weight=weight)
+                self._grid_weights[(axis, index)] = weight
+
+    def _plan_button_layout(self, horizontal: bool) -> Tuple[List[Dict[str, Any]], Dict[Tuple[str, int], int]]:
+        placements: List[Dict[str, Any]] = []
+        weights: Dict[Tuple[str, int], int] = {}
         for index in range(len(self._buttons) + 1):
-            container.grid_columnconfigure(index, weight=0)
-            container.grid_rowconfigure(index, weight=0)
+            weights[("column", index)] = 0
+            weights[("row", index)] = 0
 
         if horizontal:
-            for index, button in enumerate(self._buttons):
-                button.grid(row=0, column=index, padx=6, pady=6, sticky="ew")
-                container.grid_columnconfigure(index, weight=1)
-            container.grid_rowconfigure(0, weight=1)
+            for index in range(len(self._buttons)):
+                placements.append({"row": 0, "column": index, "padx": 6, "pady": 6, "sticky": "ew"})
+                weights[("column", index)] = 1
+            weights[("row", 0)] = 1
         else:
-            for index, button in enumerate(self._buttons):
-                button.grid(row=index, column=0, padx=6, pady=6)
-                container.grid_rowconfigure(index, weight=1)
-            container.grid_columnconfigure(0, weight=1)
-
-
+            # Stack into columns of MAX_ROWS so a long system list still fits.
+            for index in range(len(self._buttons)):
+                column, row = divmod(index, self.MAX_ROWS)
+                placements.append({"row": row, "column": column, "padx": 6, "pady": 6, "sticky": ""})
+                weights[("row", row)] = 1
+                weights[("column", column)] = 1
+        return placements, weights
@@ -0,0 +1,267 @@
+﻿"""Frame with one button per card rank, driven by a registered counting system."""
+
+# Rank-based counting notes:
+# - Each rank carries the tag from the system's compiled lookup table.
+# - The buttons for 2 through A record the card and let the state score it.
+
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+
+
+from blackjack_counter.formatting import format_increment
+from blackjack_counter.frames.base import BaseModeFrame, KeyMap, letter_chords
+from blackjack_counter.state import RANKS
+from blackjack_counter.systems import CountingSystem, get_system
+
+if TYPE_CHECKING:  # pragma: no cover - only for type checkers
+    from blackjack_counter.app import CountingApp
+
+
+class RankCountFrame(BaseModeFrame):
+    """Two-pane layout with dedicated card buttons for any rank-tagged system."""
+
+    SYSTEM_KEY: Optional[str] = None
+
+    CARD_KEY_BINDINGS: Dict[str, Iterable[str]] = {
+        "2": ("q",),
+        "3": ("w",),
+        "4": ("e",),
+        "5": ("r",),
+        "6": ("a",),
+        "7": ("s",),
+        "8": ("d",),
+        "9": ("f",),
+        "10": ("z",),
+        "J": ("x",),
+        "Q": ("c",),
+        "K": ("v",),
+        "A": ("b",),
+    }
+
+    def __init__(
+        self,
+        master: ttk.Frame,
+        controller: "CountingApp",
+        system: Optional[CountingSystem] = None,
+    ) -> None:
+        if system is None:
+            if self.SYSTEM_KEY is None:
+                raise ValueError("RankCountFrame needs a counting system")
+            system = get_system(self.SYSTEM_KEY)
+        super().__init__(master, controller, system=system)
+        self.card_values: Dict[str, float] = {rank: system.tag(rank) for rank in RANKS}
+        self.decks_var = tk.StringVar(value="Decks left: -")
+        self.ace_var = tk.StringVar(value="Ace side count: +0.0")
+        self._probability_vars: List[tk.StringVar] = [tk.StringVar(value="-") for _ in RANKS]
+
+        self._card_keymap: KeyMap = {
+            chord: (lambda c=card: self._record_card(c))
+            for card, keys in self.CARD_KEY_BINDINGS.items()
+            for chord in letter_chords(*keys)
+        }
+
+        self._hotkey_window: Optional[tk.Toplevel] = None
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=5)
+        self.rowconfigure(1, weight=1)
+
+        self._build_layout()
+
+    def _build_layout(self) -> None:
+        top_panel = ttk.Frame(self)
+        top_panel.grid(row=0, column=0, sticky="nsew")
+
+        bottom_panel = ttk.Frame(self, padding=(6, 4))
+        bottom_panel.grid(row=1, column=0, sticky="nsew")
+
+        top_panel.columnconfigure(0, weight=1)
+        top_panel.columnconfigure(1, weight=2)
+        top_panel.columnconfigure(2, weight=1)
+        top_panel.columnconfigure(3, weight=1)
+        top_panel.rowconfigure(0, weight=1)
+
+        control_frame = ttk.Frame(top_panel)
+        control_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 8))
+        self.reset_button = ttk.Button(control_frame, text="Reset Shoe [Ctrl+R]", command=self._reset_shoe)
+        self.reset_button.pack(fill="x", pady=(0, 6))
+        self.menu_button = ttk.Button(control_frame, text="Menu", command=self._go_menu)
+        self.menu_button.pack(fill="x")
+        self.hotkey_button = ttk.Button(control_frame, text="Hotkeys…", command=self._show_hotkeys)
+        self.hotkey_button.pack(fill="x", pady=(6, 0))
+
+        history_frame = ttk.Frame(top_panel, padding=(6, 0))
+        history_frame.grid(row=0, column=1, sticky="nsew")
+        history_frame.columnconfigure(0, weight=1)
+
+        history_box = ttk.LabelFrame(history_frame, text="Previously Counted", padding=8)
+        history_box.grid(row=0, column=0, sticky="nsew")
+        self._build_history_strip(history_box)
+        self._build_history_scale(history_box)
+
+        ttk.Label(
+            history_frame,
+            text="Use the card buttons or their shortcuts to record counts.",
+            style="Caption.TLabel",
+            anchor="center",
+            justify="center",
+        ).grid(row=1, column=0, sticky="ew", pady=(8, 0))
+
+        true_frame = ttk.Frame(top_panel, padding=(6, 0))
+        true_frame.grid(row=0, column=2, sticky="nsew")
+        true_frame.columnconfigure(0, weight=1)
+        self._track_column_minsize(top_panel, 1, true_frame)
+
+        true_box = ttk.LabelFrame(true_frame, text="True Count", padding=8)
+        true_box.grid(row=0, column=0, sticky="nsew")
+        ttk.Label(true_box, textvariable=self.true_var, style="Value.TLabel", anchor="center").pack(fill="x")
+        self._build_bet_hint(true_box)
+        ttk.Label(true_box, textvariable=self.cards_var, style="Caption.TLabel", anchor="center").pack(fill="x", pady=(6, 0))
+        self._build_deviation_alert(true_box)
+        self.undo_button = ttk.Button(true_frame, text="Undo [< or Ctrl+Z]", command=self._undo_entry)
+        self.undo_button.grid(row=1, column=0, sticky="ew", pady=(8, 4))
+        self.redo_button = ttk.Button(true_frame, text="Redo [> or Ctrl+Y]", command=self._redo_entry)
+        self.redo_button.grid(row=2, column=0, sticky="ew")
+
+        running_frame = ttk.Frame(top_panel, padding=(6, 0))
+        running_frame.grid(row=0, column=3, sticky="nsew")
+        running_frame.columnconfigure(0, weight=1)
+        running_frame.rowconfigure(0, weight=0)
+        running_frame.rowconfigure(1, weight=1)
+
+        running_box = ttk.LabelFrame(running_frame, text="Running Count", padding=8)
+        running_box.grid(row=0, column=0, sticky="new")
+        ttk.Label(running_box, textvariable=self.running_var, style="Value.TLabel", anchor="center").pack(fill="x")
+
+        shoe_box = ttk.LabelFrame(running_frame, text="Shoe", padding=8)
+        shoe_box.grid(row=1, column=0, sticky="new", pady=(8, 0))
+        ttk.Label(shoe_box, textvariable=self.decks_var, style="Caption.TLabel", anchor="center").pack(fill="x")
+        ttk.Label(shoe_box, textvariable=self.ace_var, style="Caption.TLabel", anchor="center").pack(fill="x")
+
+        self._build_play_hint(running_frame).grid(row=2, column=0, sticky="new", pady=(8, 0))
+
+        for column in range(len(self.card_values)):
+            bottom_panel.columnconfigure(column, weight=1, uniform="cards", minsize=64)
+        bottom_panel.rowconfigure(0, weight=1)
+        bottom_panel.rowconfigure(1, weight=0)
+
+        cards = list(self.card_values.items())
+        for index, (card, value) in enumerate(cards):
+            hints = " / ".join(key.upper() for key in self.CARD_KEY_BINDINGS.get(card, ()))
+            label = f"{card}\n({format_increment(value)})"
+            if hints:
+                label += f"\n[{hints}]"
+
+            button = ttk.Button(
+                bottom_panel,
+                text=label,
+                style="Card.TButton",
+                command=lambda c=card: self._record_card(c),
+            )
+            button.grid(row=0, column=index, padx=2, pady=2, sticky="nsew")
+            ttk.Label(
+                bottom_panel,
+                textvariable=self._probability_vars[index],
+                style="Caption.TLabel",
+                anchor="center",
+            ).grid(row=1, column=index, sticky="ew")
+
+    def _show_counts(self) -> None:
+        """Update the shared counters plus the shoe composition readouts."""
+
+        super()._show_counts()
+        self._set_text(self.decks_var, f"Decks left: {self.state.decks_remaining:.2f}")
+        self._set_text(self.ace_var, f"Ace side count: {self.state.ace_side_count:+.1f}")
+        for var, probability in zip(self._probability_vars, self.state.rank_probabilities()):
+            self._set_text(var, f"{probability:.1%}")
+
+    def _record_card(self, card: str) -> None:
+        """Record the card so the state scores it with the system's table."""
+        self._queue_entry(card)
+
+    def _build_keymap(self) -> KeyMap:
+        keymap = super()._build_keymap()
+        keymap.update(self._card_keymap)
+        return keymap
+
+    def on_hide(self) -> None:
+
+        if self._hotkey_window is not None and self._hotkey_window.winfo_exists():
+            self._hotkey_window.withdraw()
+
+
+        super().on_hide()
+
+    def _show_hotkeys(self) -> None:
+        """Display the key bindings for the rank-button layout."""
+
+
+        if self._hotkey_window is not None and self._hotkey_window.winfo_exists():
+            # Built once, then withdrawn on close and shown again here.
+            self._hotkey_window.deiconify()
+            self._hotkey_window.lift()
+            self._hotkey_window.focus_force()
+            return
+
+        window = tk.Toplevel(self)
+        window.title(f"{self.system.name} Hotkeys")
+        window.protocol("WM_DELETE_WINDOW", window.withdraw)
+        window.resizable(False, False)
+        window.transient(self.winfo_toplevel())
+
+        container = ttk.Frame(window, padding=16)
+        container.grid(row=0, column=0, sticky="nsew")
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
+
+        ttk.Label(
+            container,
+            text=f"Keyboard shortcuts available while using {self.system.name}.",
+            style="Caption.TLabel",
+            anchor="w",
+            justify="left",
+        ).grid(row=0, column=0, sticky="w")
+
+        actions = ttk.LabelFrame(container, text="Other Controls", padding=10)
+        actions.grid(row=1, column=0, sticky="ew", pady=(12, 12))
+        actions.columnconfigure(0, weight=1)
+
+        ttk.Label(
+            actions,
+            text=(
+                "Undo: < or Ctrl+Z\n"
+                "Redo: > or Ctrl+Y\n"
+                "Reset Shoe: Ctrl+R"
+            ),
+            justify="left",
+        ).grid(row=0, column=0, sticky="w")
+
+        cards_frame = ttk.LabelFrame(container, text="Card Shortcuts", padding=10)
+        cards_frame.grid(row=2, column=0, sticky="nsew")
+        for column in range(3):
+            cards_frame.columnconfigure(column, weight=1, uniform="cards")
+
+        card_items = list(self.CARD_KEY_BINDINGS.items())
+        for index, (card, keys) in enumerate(card_items):
+            row, column = divmod(index, 3)
+            cards_frame.rowconfigure(row, weight=1)
+            label = f"{card}: {', '.join(key.upper() for key in keys)}"
+            ttk.Label(cards_frame, text=label, anchor="w").grid(
+                row=row, column=column, sticky="w", padx=4, pady=2
+            )
+
+        ttk.Button(container, text="Close", command=window.withdraw).grid(
+            row=3, column=0, sticky="e", pady=(12, 0)
+        )
+
+        window.bind(
+            "<Destroy>",
+            lambda event: setattr(self, "_hotkey_window", None)
+            if event.widget is window
+            else None,
+        )
+        window.focus_force()
+
+        self._hotkey_window = window
@@ -0,0 +1,333 @@
+"""Crash-safe, append-only journals of counting sessions.
+
+Every change to a ``CountingState`` (a recorded entry, undo, redo, seek or
+reset) is appended to one journal file per session, so the shoe survives a
+crash, a killed process or a laptop going to sleep mid-shoe.
+
+A journal is a 40-byte header (magic, system key, deck count, start time
+in Unix seconds) followed by fixed 8-byte records::
+
+    op (u8) | label code (u8) | half-units (i8) | pad | argument (u32)
+
+``OP_RECORD`` carries an entry, with the milliseconds since the start time
+as its argument; ``OP_UNDO`` and ``OP_REDO`` carry the position the cursor
+moved to (a slider seek is an undo or redo of several
+entries); ``OP_RESET`` clears the shoe. Records are only ever appended,
+so a crash can at worst leave a torn last record, which replay ignores.
+
+Version 1 journals have a 32-byte header without the start time, and their
+entries carry no timestamp (the argument is 0). They are still read, with
+a start time of 0, and a resumed one keeps being written as version 1.
+
+The state publishes its changes to ``SessionJournal.append`` on the UI
+thread, which only queues them; a background thread packs and writes the
+queued records every ``WRITE_INTERVAL`` seconds and calls ``fsync`` at
+most every ``FSYNC_INTERVAL``, so a crash loses at most the last half
+second of presses.
+
+``replay`` memory-maps a journal and rebuilds the final shoe. The entries
+between control records are copied as whole column slices, so a
+million-entry journal replays in well under a second.
+"""
+
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple, Union
+
+from blackjack_counter.state import (
+    LABEL_CODES,
+    CountingState,
+    EntriesAppended,
+    EntriesRemoved,
+    ShoeReset,
+    StateEvent,
+    to_half_units,
+)
+
+MAGIC = b"BJCJRNL2"
+HEADER = struct.Struct("<8s16sdd")
+MAGIC_V1 = b"BJCJRNL1"
+HEADER_V1 = struct.Struct("<8s16sd")
+RECORD = struct.Struct("<BBbxI")
+SUFFIX = ".bjj"
+WRITE_INTERVAL = 0.05
+FSYNC_INTERVAL = 0.5
+
+# Zero is never written, so a zero-filled tail left by a crash ends the journal.
+OP_RECORD = 1
+OP_UNDO = 2
+OP_REDO = 3
+OP_RESET = 4
+
+_CONTROL = re.compile(rb"[^\x01]")
+
+
+class JournalError(ValueError):
+    """The file is not a readable session journal."""
+
+
+@dataclass
+class ReplayedShoe:
+    """The shoe rebuilt from a journal, ready for ``CountingState.load``."""
+
+    system_key: str
+    decks: float
+    started: float
+    codes: bytes
+    halves: bytes
+    position: int
+    records: int
+
+    def restore(self, state: CountingState) -> None:
+        state.load(self.codes, self.halves, self.position)
+
+
+def sessions_dir() -> Path:
+    """Directory holding the session journals (``BLACKJACK_COUNTER_SESSIONS`` overrides it)."""
+
+    override = os.environ.get("BLACKJACK_COUNTER_SESSIONS")
+    if override:
+        return Path(override)
+    base = os.environ.get("APPDATA")
+    root = Path(base) if base else Path.home() / ".local" / "share"
+    return root / "BlackjackCounter" / "sessions"
+
+
+def session_paths(directory: Optional[Path] = None) -> List[Path]:
+    """Journal files in ``directory``, oldest first."""
+
+    directory = directory or sessions_dir()
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f"*{SUFFIX}"))
+
+
+def latest_session(directory: Optional[Path] = None) -> Optional[Path]:
+    """The newest readable journal that holds at least one record."""
+
+    for path in reversed(session_paths(directory)):
+        try:
+            if path.stat().st_size >= records_offset(path) + RECORD.size:
+                return path
+        except (JournalError, OSError):
+            continue
+    return None
+
+
+def read_header(path: Union[str, Path]) -> Tuple[str, float, float]:
+    """The system key, deck count and start time (Unix seconds) of a journal."""
+
+    with open(path, "rb") as handle:
+        return _parse_header(handle.read(HEADER.size), path)[:3]
+
+
+def records_offset(path: Union[str, Path]) -> int:
+    """Byte offset of the first record: the header size of the journal's version."""
+
+    with open(path, "rb") as handle:
+        return _parse_header(handle.read(HEADER.size), path)[3]
+
+
+def _parse_header(data: bytes, path: Union[str, Path]) -> Tuple[str, float, float, int]:
+    magic = data[:len(MAGIC)]
+    if magic == MAGIC and len(data) >= HEADER.size:
+        _, key, decks, started = HEADER.unpack_from(data)
+        size = HEADER.size
+    elif magic == MAGIC_V1 and len(data) >= HEADER_V1.size:
+        _, key, decks = HEADER_V1.unpack_from(data)
+        started, size = 0.0, HEADER_V1.size
+    elif len(data) < HEADER_V1.size:
+        raise JournalError(f"{path} is too short to be a session journal")
+    else:
+        raise JournalError(f"{path} is not a session journal")
+    return key.rstrip(b"\0").decode("ascii"), decks, started, size
+
+
+def replay(path: Union[str, Path]) -> ReplayedShoe:
+    """Rebuild the final shoe recorded in the journal at ``path``."""
+
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        system_key, decks, started, offset = _parse_header(handle.read(HEADER.size), path)
+        count = (size - offset) // RECORD.size
+        if count <= 0:
+            return ReplayedShoe(system_key, decks, started, b"", b"", 0, 0)
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            end = offset + count * RECORD.size
+            ops = view[offset:end:RECORD.size]
+            code_column = view[offset + 1:end:RECORD.size]
+            half_column = view[offset + 2:end:RECORD.size]
+
+            codes = bytearray()
+            halves = bytearray()
+            position = 0
+            run_start = 0
+            records = count
+            for match in _CONTROL.finditer(ops):
+                index = match.start()
+                if index > run_start:
+                    # Recording after an undo drops the redo tail, as in the state.
+                    codes[position:] = code_column[run_start:index]
+                    halves[position:] = half_column[run_start:index]
+                    position = len(codes)
+                run_start = index + 1
+                op = ops[index]
+                if op == OP_RESET:
+                    codes.clear()
+                    halves.clear()
+                    position = 0
+                elif op in (OP_UNDO, OP_REDO):
+                    (target,) = struct.unpack_from("<I", view, offset + index * RECORD.size + 4)
+                    position = min(target, len(codes))
+                else:
+                    # A zero-filled or torn tail from a crash: keep what came before.
+                    records = index
+                    break
+            else:
+                if run_start < count:
+                    codes[position:] = code_column[run_start:count]
+                    halves[position:] = half_column[run_start:count]
+                    position = len(codes)
+    return ReplayedShoe(system_key, decks, started, bytes(codes), bytes(halves), position, records)
+
+
+class SessionJournal:
+    """Append a state's changes to a journal file from a background thread.
+
+    Subscribe ``append`` to a ``CountingState``; call ``close`` when the
+    session ends to write and sync whatever is still queued, or ``flush``
+    to have it written while the journal stays open.
+    """
+
+    def __init__(self, path: Union[str, Path], system_key: str, decks: float, records: Optional[int] = None) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        # Entries carry their time only in version 2 journals.
+        self._timed = True
+        if self._file.tell() == 0:
+            self.started = time.time()
+            self.header_size = HEADER.size
+            self._file.write(HEADER.pack(MAGIC, system_key.encode("ascii"), decks, self.started))
+            self._file.flush()
+        else:
+            try:
+                with open(self.path, "rb") as handle:
+                    header_key, header_decks, self.started, self.header_size = _parse_header(
+                        handle.read(HEADER.size), self.path
+                    )
+            except (JournalError, OSError):
+                self._file.close()
+                raise
+            if (header_key, header_decks) != (system_key, decks):
+                self._file.close()
+                raise JournalError(f"{self.path} belongs to another shoe")
+            self._timed = self.header_size == HEADER.size
+            # Drop a torn or zero-filled tail left by a crash so new records follow the last good one.
+            size = self._file.tell()
+            offset = self.header_size
+            valid = offset + RECORD.size * ((size - offset) // RECORD.size if records is None else records)
+            if valid < size:
+                self._file.truncate(valid)
+                self._file.seek(0, os.SEEK_END)
+        self._pending: Deque[Tuple[float, StateEvent]] = deque()
+        # Events queued by ``append`` and events written so far, for ``flush``.
+        self._queued = 0
+        self._written = 0
+        self._progress = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._write_loop, name="session-journal", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def create(cls, system_key: str, decks: float, directory: Optional[Path] = None) -> "SessionJournal":
+        """Start a new journal file for a session in ``directory``."""
+
+        directory = directory or sessions_dir()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return cls(directory / f"session-{stamp}{SUFFIX}", system_key, decks)
+
+    @classmethod
+    def resume(cls, path: Union[str, Path], shoe: ReplayedShoe) -> "SessionJournal":
+        """Keep appending to the journal ``shoe`` was replayed from."""
+
+        return cls(path, shoe.system_key, shoe.decks, records=shoe.records)
+
+    def append(self, event: StateEvent) -> None:
+        """``CountingState`` listener: queue the change for the writer thread."""
+
+        # A deque append takes no lock and wakes nothing; the writer drains it on its own schedule.
+        self._pending.append((time.time(), event))
+        self._queued += 1
+
+    def flush(self) -> None:
+        """Block until everything queued so far has been written to the file."""
+
+        target = self._queued
+        with self._progress:
+            self._progress.wait_for(lambda: self._written >= target or not self._thread.is_alive())
+
+    def close(self) -> None:
+        """Write everything queued, sync it to disk and stop the writer thread."""
+
+        self._stop.set()
+        self._thread.join()
+        if not self._file.closed:
+            self._file.close()
+
+    def _write_loop(self) -> None:
+        try:
+            self._write_batches()
+        finally:
+            # Release any ``flush`` still waiting, even if writing failed.
+            with self._progress:
+                self._progress.notify_all()
+
+    def _write_batches(self) -> None:
+        handle = self._file
+        pending = self._pending
+        unsynced = False
+        last_sync = time.monotonic()
+        while True:
+            stopping = self._stop.wait(WRITE_INTERVAL)
+            batch = []
+            while pending:
+                stamp, event = pending.popleft()
+                batch.append(_encode(event, stamp - self.started if self._timed else 0.0))
+            if batch:
+                handle.write(b"".join(batch))
+                handle.flush()
+                unsynced = True
+                with self._progress:
+                    self._written += len(batch)
+                    self._progress.notify_all()
+            if unsynced and (stopping or time.monotonic() - last_sync >= FSYNC_INTERVAL):
+                os.fsync(handle.fileno())
+                unsynced = False
+                last_sync = time.monotonic()
+            if stopping:
+                return
+
+
+def _encode(event: StateEvent, elapsed: float) -> bytes:
+    if isinstance(event, EntriesAppended):
+        if event.redone:
+            return RECORD.pack(OP_REDO, 0, 0, event.start + len(event.entries))
+        pack = RECORD.pack
+        millis = min(0xFFFFFFFF, max(0, int(elapsed * 1000)))
+        return b"".join(
+            pack(OP_RECORD, LABEL_CODES[entry.label], to_half_units(entry.value), millis) for entry in event.entries
+        )
+    if isinstance(event, EntriesRemoved):
+        return RECORD.pack(OP_UNDO, 0, 0, event.position)
+    if isinstance(event, ShoeReset):
+        return RECORD.pack(OP_RESET, 0, 0, 0)
+    return b""
@@ -0,0 +1,64 @@
+"""Cached panel measurements shared by every screen of the app."""
+
+import tkinter as tk
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Window sizes within one bucket share their measured column widths.
+BUCKET_PX = 40
+
+Bucket = Tuple[int, int]
+
+
+def size_bucket(width: int, height: int) -> Bucket:
+    """The cache bucket for a window of ``width`` x ``height`` pixels."""
+
+    return (width // BUCKET_PX, height // BUCKET_PX)
+
+
+class LayoutCache:
+    """Column minsizes measured once per frame and window-size bucket.
+
+    A tracked column follows the width of a ``source`` widget. The first
+    layout pass in a bucket measures the source; later passes in the same
+    bucket, including after switching modes, reuse the stored width, and a
+    column is only reconfigured when its minsize actually changes. The font
+    scale follows the window size too, so a bucket's widths were measured
+    with the fonts that bucket uses and never need to be thrown away.
+    """
+
+    def __init__(self) -> None:
+        self._widths: Dict[Tuple[str, Hashable, Bucket], int] = {}
+        # (owner, key, manager, column, source)
+        self._columns: List[Tuple[str, Hashable, tk.Misc, int, tk.Misc]] = []
+        self._applied: Dict[Tuple[str, int], int] = {}
+
+    def get(self, owner: str, key: Hashable, bucket: Bucket) -> Optional[int]:
+        return self._widths.get((owner, key, bucket))
+
+    def put(self, owner: str, key: Hashable, width: int, bucket: Bucket) -> None:
+        self._widths[(owner, key, bucket)] = width
+
+    def track_column(self, owner: str, key: Hashable, manager: tk.Misc, column: int, source: tk.Misc) -> None:
+        """Keep ``manager``'s ``column`` at least as wide as ``source``."""
+
+        self._columns.append((owner, key, manager, column, source))
+
+    def apply(self, bucket: Bucket) -> int:
+        """Set every tracked column for ``bucket``; returns how many were measured."""
+
+        measured = 0
+        for owner, key, manager, column, source in self._columns:
+            width = self.get(owner, key, bucket)
+            if width is None:
+                if not source.winfo_ismapped():
+                    continue
+                width = source.winfo_width()
+                if width <= 1:
+                    continue
+                self.put(owner, key, width, bucket)
+                measured += 1
+            applied_key = (str(manager), column)
+            if self._applied.get(applied_key) != width:
+                manager.columnconfigure(column, minsize=width)
+                self._applied[applied_key] = width
+        return measured
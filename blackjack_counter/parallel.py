@@ -0,0 +1,168 @@
+"""Spread simulation work units over a process pool with reproducible seeds.
+
+A run is split into numbered work units. Unit ``i`` always draws from the
+NumPy ``SeedSequence(seed, spawn_key=(i,))`` substream, which is exactly the
+``i``-th child ``SeedSequence(seed).spawn`` would hand out, so a unit's
+result never depends on which worker ran it or when. Unit results are
+integer accumulators that add exactly; merging them in any order gives
+bit-identical totals for 1 worker or 32.
+
+A task is any picklable object with:
+
+* ``empty()`` - a fresh accumulator with a ``merge(other)`` method, and
+* ``run_unit(rng)`` - an accumulator holding one unit's results.
+"""
+
+import os
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Protocol, Tuple
+
+import numpy as np
+
+ProgressCallback = Callable[[int, int], None]
+UnitCallback = Callable[[int, Any], None]
+
+
+class SimulationTask(Protocol):
+    def empty(self) -> Any: ...
+
+    def run_unit(self, rng: np.random.Generator) -> Any: ...
+
+
+class SimulationCancelled(Exception):
+    """Raised by ``ParallelRunner.run`` when ``cancel`` stopped the run early.
+
+    ``partial`` holds the merged results of the units that finished.
+    """
+
+    def __init__(self, partial: Any, completed: int, total: int) -> None:
+        super().__init__(f"simulation cancelled after {completed} of {total} units")
+        self.partial = partial
+        self.completed = completed
+        self.total = total
+
+
+def unit_seed(seed: int, index: int) -> np.random.SeedSequence:
+    """Seed sequence for work unit ``index`` of a run seeded with ``seed``."""
+
+    return np.random.SeedSequence(seed, spawn_key=(index,))
+
+
+def unit_rng(seed: int, index: int) -> np.random.Generator:
+    """Independent generator for work unit ``index``."""
+
+    return np.random.default_rng(unit_seed(seed, index))
+
+
+def run_unit(task: SimulationTask, seed: int, index: int) -> Tuple[int, Any]:
+    """Run one work unit; module-level so worker processes can unpickle it."""
+
+    return index, task.run_unit(unit_rng(seed, index))
+
+
+def _ignore_interrupts() -> None:
+    """Pool initializer: leave Ctrl-C to the parent, which stops the run cleanly."""
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def new_seed() -> int:
+    """Fresh entropy for a run whose seed was not given, so it can be replayed."""
+
+    return int(np.random.SeedSequence().entropy)
+
+
+class ParallelRunner:
+    """Run ``units`` work units of ``task`` across ``workers`` processes."""
+
+    def __init__(
+        self,
+        task: SimulationTask,
+        units: int,
+        seed: int,
+        *,
+        workers: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        on_unit: Optional[UnitCallback] = None,
+    ) -> None:
+        self.task = task
+        self.units = units
+        self.seed = seed
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.progress = progress
+        self.on_unit = on_unit
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Ask a running ``run`` to stop after the units already in flight."""
+
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self, *, skip: Iterable[int] = (), initial: Any = None) -> Any:
+        """Run every unit not in ``skip`` and return the merged accumulator.
+
+        ``initial`` seeds the merge, which is how a resumed run carries on
+        from results it already has.
+        """
+
+        total = initial if initial is not None else self.task.empty()
+        skipped = set(skip)
+        pending = [index for index in range(self.units) if index not in skipped]
+        done = self.units - len(pending)
+        self._report(done)
+
+        if self.workers == 1:
+            for index in pending:
+                if self.cancelled:
+                    raise SimulationCancelled(total, done, self.units)
+                _, result = run_unit(self.task, self.seed, index)
+                done = self._collect(total, index, result, done)
+            return total
+
+        queue = iter(pending)
+        in_flight: Dict[Future, int] = {}
+        # Keep a couple of units queued per worker without materialising
+        # one future per unit for very long runs.
+        limit = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_interrupts) as pool:
+            try:
+                while True:
+                    while not self.cancelled and len(in_flight) < limit:
+                        index = next(queue, None)
+                        if index is None:
+                            break
+                        in_flight[pool.submit(run_unit, self.task, self.seed, index)] = index
+                    if not in_flight:
+                        break
+                    finished, _ = wait(in_flight, timeout=0.25, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        del in_flight[future]
+                        index, result = future.result()
+                        done = self._collect(total, index, result, done)
+            except BaseException:
+                self._cancelled.set()
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+        if self.cancelled and done < self.units:
+            raise SimulationCancelled(total, done, self.units)
+        return total
+
+    def _collect(self, total: Any, index: int, result: Any, done: int) -> int:
+        total.merge(result)
+        done += 1
+        if self.on_unit is not None:
+            self.on_unit(index, result)
+        self._report(done)
+        return done
+
+    def _report(self, done: int) -> None:
+        if self.progress is not None:
+            self.progress(done, self.units)
@@ -0,0 +1,414 @@
+"""Export session journals to columnar files and aggregate months of them.
+
+``export`` turns each session journal (see ``journal``) into a ``.bjc``
+column file: one row per journaled action, with typed columns
+
+* ``op``, ``label``, ``halves`` - the action as journaled,
+* ``position`` - entries applied after it,
+* ``elapsed_ms`` - time since the session started (carried forward over
+  undo, redo and reset, which carry no time of their own),
+* ``running`` - running count in half-units, including the system's
+  initial running count,
+* ``true_count`` - true count after the action, divided by the decks left
+  as ``simulation`` does,
+* ``rewrite`` - 1 when a recorded entry replaced one that had been undone,
+  i.e. an entry error that was corrected.
+
+Rows are written in chunks of ``CHUNK_ROWS``, each column as a raw
+little-endian array. A small JSON index at the end of the file (found
+through a fixed-size footer) lists the session details and every chunk's
+column offsets, so a reader can load one chunk of one column at a time.
+
+``stats`` streams thousands of column files chunk by chunk, in parallel
+across files, and reports per counting system how often each true count
+came up, how long was spent at it, and how often entries were corrected.
+Memory stays constant: each worker holds one chunk and one small
+accumulator at a time.
+
+Run ``python -m blackjack_counter.sessions --help`` for the command line.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from blackjack_counter.journal import (
+    OP_RECORD,
+    OP_REDO,
+    OP_RESET,
+    OP_UNDO,
+    JournalError,
+    read_header,
+    records_offset,
+    session_paths,
+    sessions_dir,
+)
+from blackjack_counter.simulation import MIN_DECKS_DIVISOR, TC_MAX, TC_MIN
+from blackjack_counter.state import CARDS_PER_DECK
+from blackjack_counter.systems import get_system
+
+FORMAT_VERSION = 1
+MAGIC = b"BJCCOL01"
+FOOTER = struct.Struct("<Q8s")
+SUFFIX = ".bjc"
+CHUNK_ROWS = 65_536
+# Gaps longer than this (a break, the laptop asleep) count as this long.
+IDLE_CAP_MS = 120_000
+
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("op", "u1"),
+    ("label", "u1"),
+    ("halves", "i1"),
+    ("position", "<u4"),
+    ("elapsed_ms", "<u4"),
+    ("running", "<i4"),
+    ("true_count", "<f4"),
+    ("rewrite", "u1"),
+)
+JOURNAL_RECORD = np.dtype([("op", "u1"), ("label", "u1"), ("halves", "i1"), ("pad", "u1"), ("arg", "<u4")])
+
+
+def journal_columns(path: Union[str, Path]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Session details and the column arrays for the journal at ``path``."""
+
+    system_key, decks, started = read_header(path)
+    offset = records_offset(path)
+    count = max(0, (os.path.getsize(path) - offset) // JOURNAL_RECORD.itemsize)
+    raw = np.fromfile(path, dtype=JOURNAL_RECORD, count=count, offset=offset)
+    # A zero op marks a crash-damaged tail; replay stops there too.
+    damaged = np.flatnonzero(raw["op"] == 0)
+    if damaged.size:
+        raw = raw[: damaged[0]]
+    rows = len(raw)
+    op, halves, arg = raw["op"], raw["halves"], raw["arg"]
+
+    position = np.zeros(rows, dtype=np.uint32)
+    running = np.zeros(rows, dtype=np.int64)
+    rewrite = np.zeros(rows, dtype=np.uint8)
+    # prefix[p]: running count in half-units after the first p entries of the current shoe.
+    prefix = np.zeros(rows + 1, dtype=np.int64)
+    cursor = end = 0
+    start = 0
+    for stop in [*np.flatnonzero(op != OP_RECORD).tolist(), rows]:
+        if stop > start:
+            # A run of recorded entries: each appends at the cursor and drops the redo tail.
+            length = stop - start
+            totals = prefix[cursor] + np.cumsum(halves[start:stop], dtype=np.int64)
+            prefix[cursor + 1:cursor + length + 1] = totals
+            running[start:stop] = totals
+            position[start:stop] = np.arange(cursor + 1, cursor + length + 1)
+            rewrite[start:start + min(length, max(0, end - cursor))] = 1
+            cursor = end = cursor + length
+        if stop == rows:
+            break
+        if op[stop] == OP_RESET:
+            cursor = end = 0
+        elif op[stop] in (OP_UNDO, OP_REDO):
+            cursor = min(int(arg[stop]), end)
+        else:
+            raise JournalError(f"{path}: unknown journal op {op[stop]} in record {stop}")
+        position[stop] = cursor
+        running[stop] = prefix[cursor]
+        start = stop + 1
+
+    system = get_system(system_key)
+    running += round(system.initial_running_count(decks) * 2)
+    decks_left = np.maximum((decks * CARDS_PER_DECK - position) / CARDS_PER_DECK, MIN_DECKS_DIVISOR)
+    true_count = running / (2 * decks_left)
+    elapsed = np.maximum.accumulate(np.where(op == OP_RECORD, arg, 0)) if rows else arg
+
+    session = {"source": Path(path).name, "system": system_key, "decks": decks, "started": started}
+    columns = {
+        "op": op,
+        "label": raw["label"],
+        "halves": halves,
+        "position": position,
+        "elapsed_ms": elapsed,
+        "running": running,
+        "true_count": true_count,
+        "rewrite": rewrite,
+    }
+    return session, columns
+
+
+def write_columns(
+    path: Union[str, Path],
+    session: Dict[str, Any],
+    columns: Dict[str, np.ndarray],
+    chunk_rows: int = CHUNK_ROWS,
+) -> None:
+    """Atomically write ``columns`` to a column file at ``path``."""
+
+    path = Path(path)
+    rows = len(columns["op"])
+    typed = {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype in COLUMNS}
+    chunks = []
+    temporary = path.with_name(f".{path.name}.tmp")
+    with open(temporary, "wb") as handle:
+        handle.write(MAGIC)
+        for first in range(0, rows, chunk_rows):
+            last = min(rows, first + chunk_rows)
+            offsets = []
+            for name, _ in COLUMNS:
+                offsets.append(handle.tell())
+                handle.write(typed[name][first:last].tobytes())
+            chunks.append({"rows": last - first, "offsets": offsets})
+        index = {
+            "version": FORMAT_VERSION,
+            "session": session,
+            "columns": [list(column) for column in COLUMNS],
+            "rows": rows,
+            "chunks": chunks,
+        }
+        index_offset = handle.tell()
+        handle.write(json.dumps(index, separators=(",", ":")).encode("utf-8"))
+        handle.write(FOOTER.pack(index_offset, MAGIC))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+class ColumnFile:
+    """Read a column file written by ``write_columns`` one chunk at a time."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < len(MAGIC) + FOOTER.size:
+                raise ValueError(f"{self.path} is too short to be a column file")
+            handle.seek(size - FOOTER.size)
+            index_offset, magic = FOOTER.unpack(handle.read(FOOTER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a column file")
+            handle.seek(index_offset)
+            self.index = json.loads(handle.read(size - FOOTER.size - index_offset))
+        if self.index["version"] != FORMAT_VERSION:
+            raise ValueError(f"{self.path} has format version {self.index['version']}, expected {FORMAT_VERSION}")
+        self._dtypes = {name: np.dtype(dtype) for name, dtype in self.index["columns"]}
+        self._slots = {name: slot for slot, (name, _) in enumerate(self.index["columns"])}
+
+    @property
+    def session(self) -> Dict[str, Any]:
+        return self.index["session"]
+
+    @property
+    def rows(self) -> int:
+        return self.index["rows"]
+
+    def chunks(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield each chunk as a dict of the requested column arrays."""
+
+        names = list(columns) if columns is not None else list(self._slots)
+        with open(self.path, "rb") as handle:
+            for chunk in self.index["chunks"]:
+                arrays = {}
+                for name in names:
+                    handle.seek(chunk["offsets"][self._slots[name]])
+                    arrays[name] = np.fromfile(handle, dtype=self._dtypes[name], count=chunk["rows"])
+                yield arrays
+
+
+def export(
+    journals: Iterable[Path], directory: Path, chunk_rows: int = CHUNK_ROWS
+) -> Tuple[List[Path], List[Path]]:
+    """Write a column file per journal into ``directory``.
+
+    Returns the files written and the journals that could not be read
+    (e.g. left empty by a crash, or for a system no longer registered);
+    those are skipped so the rest still export. Journals whose column file
+    is already newer than the journal are left alone.
+    """
+
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    skipped = []
+    for journal in journals:
+        target = directory / (journal.stem + SUFFIX)
+        try:
+            if target.exists() and target.stat().st_mtime >= journal.stat().st_mtime:
+                continue
+            session, columns = journal_columns(journal)
+        except (JournalError, KeyError, OSError):
+            skipped.append(journal)
+            continue
+        if not len(columns["op"]):
+            continue
+        write_columns(target, session, columns, chunk_rows)
+        written.append(target)
+    return written, skipped
+
+
+@dataclass
+class SessionStats:
+    """Aggregates over a set of sessions of one counting system; they add exactly.
+
+    ``cards[b]`` counts entries that left the true count in bucket ``b``
+    (``tc_min + b``) and ``dwell_ms[b]`` the time spent there before the
+    next action.
+    """
+
+    tc_min: int = TC_MIN
+    tc_max: int = TC_MAX
+    cards: np.ndarray = field(default_factory=lambda: np.zeros(TC_MAX - TC_MIN + 1, dtype=np.int64))
+    dwell_ms: np.ndarray = field(default_factory=lambda: np.zeros(TC_MAX - TC_MIN + 1, dtype=np.int64))
+    sessions: int = 0
+    presses: int = 0
+    undos: int = 0
+    redos: int = 0
+    resets: int = 0
+    rewrites: int = 0
+
+    @property
+    def true_counts(self) -> np.ndarray:
+        return np.arange(self.tc_min, self.tc_max + 1)
+
+    def merge(self, other: "SessionStats") -> None:
+        if (self.tc_min, self.tc_max) != (other.tc_min, other.tc_max):
+            raise ValueError("Cannot merge session stats with different true-count ranges")
+        self.cards += other.cards
+        self.dwell_ms += other.dwell_ms
+        self.sessions += other.sessions
+        self.presses += other.presses
+        self.undos += other.undos
+        self.redos += other.redos
+        self.resets += other.resets
+        self.rewrites += other.rewrites
+
+    @property
+    def error_rate(self) -> float:
+        """Share of recorded entries that were corrections of an undone entry."""
+
+        return self.rewrites / self.presses if self.presses else 0.0
+
+    def format(self) -> str:
+        cards = self.cards / max(1, self.cards.sum())
+        dwell = self.dwell_ms / max(1, self.dwell_ms.sum())
+        lines = ["TC".rjust(5) + "cards".rjust(10) + "time".rjust(10) + "minutes".rjust(10)]
+        for bucket, true_count in enumerate(self.true_counts):
+            label = f"{true_count:+d}"
+            if true_count == self.tc_min:
+                label = f"<={label}"
+            elif true_count == self.tc_max:
+                label = f">={label}"
+            lines.append(
+                label.rjust(5)
+                + f"{cards[bucket]:>10.2%}{dwell[bucket]:>10.2%}{self.dwell_ms[bucket] / 60_000:>10.1f}"
+            )
+        lines.append(
+            f"{self.sessions} sessions, {self.presses:,} entries, {self.undos:,} undos, {self.redos:,} redos, "
+            f"{self.resets:,} resets; {self.rewrites:,} corrected entries ({self.error_rate:.2%})"
+        )
+        return "\n".join(lines)
+
+
+def summarize_file(path: Union[str, Path]) -> Tuple[str, SessionStats]:
+    """Stream one column file into a ``SessionStats``; returns its system key too."""
+
+    column_file = ColumnFile(path)
+    stats = SessionStats(sessions=1)
+    width = stats.tc_max - stats.tc_min + 1
+    # The last row of the previous chunk; its dwell ends at the first row of the next.
+    carried_bucket: Optional[int] = None
+    carried_time = 0
+    for chunk in column_file.chunks(("op", "elapsed_ms", "true_count", "rewrite")):
+        op = chunk["op"]
+        recorded = op == OP_RECORD
+        buckets = np.floor(chunk["true_count"]).astype(np.int64)
+        np.clip(buckets, stats.tc_min, stats.tc_max, out=buckets)
+        buckets -= stats.tc_min
+        times = chunk["elapsed_ms"].astype(np.int64)
+
+        stats.cards += np.bincount(buckets[recorded], minlength=width)
+        if carried_bucket is not None:
+            buckets = np.concatenate(([carried_bucket], buckets))
+            times = np.concatenate(([carried_time], times))
+        gaps = np.minimum(np.diff(times), IDLE_CAP_MS)
+        stats.dwell_ms += np.bincount(buckets[:-1], weights=gaps, minlength=width).astype(np.int64)
+        carried_bucket, carried_time = int(buckets[-1]), int(times[-1])
+
+        stats.presses += int(np.count_nonzero(recorded))
+        stats.undos += int(np.count_nonzero(op == OP_UNDO))
+        stats.redos += int(np.count_nonzero(op == OP_REDO))
+        stats.resets += int(np.count_nonzero(op == OP_RESET))
+        stats.rewrites += int(np.count_nonzero(chunk["rewrite"]))
+    return column_file.session["system"], stats
+
+
+def summarize(paths: Sequence[Path], workers: int = 1) -> Dict[str, SessionStats]:
+    """Aggregate column files per counting system, over ``workers`` processes."""
+
+    totals: Dict[str, SessionStats] = {}
+
+    def add(result: Tuple[str, SessionStats]) -> None:
+        system_key, stats = result
+        if system_key in totals:
+            totals[system_key].merge(stats)
+        else:
+            totals[system_key] = stats
+
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            add(summarize_file(path))
+        return totals
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Results are merged as they arrive, so only the running totals are kept.
+        for result in pool.map(summarize_file, paths, chunksize=chunksize):
+            add(result)
+    return totals
+
+
+def column_paths(directories: Iterable[Path]) -> List[Path]:
+    return sorted(path for directory in directories for path in directory.glob(f"*{SUFFIX}"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    default_out = sessions_dir() / "columns"
+
+    export_command = commands.add_parser("export", help="write a column file for every session journal")
+    export_command.add_argument(
+        "--journals", type=Path, default=None, help=f"journal directory (default: {sessions_dir()})"
+    )
+    export_command.add_argument("--out", type=Path, default=default_out, help=f"output directory (default: {default_out})")
+    export_command.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk")
+
+    stats_command = commands.add_parser("stats", help="aggregate column files per counting system")
+    stats_command.add_argument(
+        "directories", type=Path, nargs="*", help=f"directories of column files (default: {default_out})"
+    )
+    stats_command.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command == "export":
+        journals = session_paths(args.journals)
+        written, skipped = export(journals, args.out, args.chunk_rows)
+        print(f"exported {len(written)} of {len(journals)} journals to {args.out}", file=sys.stderr)
+        if skipped:
+            print(f"skipped {len(skipped)} unreadable journals", file=sys.stderr)
+        return
+
+    paths = column_paths(args.directories or [sessions_dir() / "columns"])
+    if not paths:
+        raise SystemExit("no column files found; run the export command first")
+    for system_key, stats in sorted(summarize(paths, args.workers).items()):
+        print(f"{get_system(system_key).name}")
+        print(stats.format())
+        print()
+
+
+if __name__ == "__main__":
+    main()
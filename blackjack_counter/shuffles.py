@@ -0,0 +1,498 @@
+"""How much count information survives a shuffle.
+
+``CountingState`` assumes a shoe dealt from a complete shuffle down to a
+cut card. Real games also use hand shuffles that leave structure behind,
+partial reshuffles that put the discards back into the undealt cards, and
+continuous shuffling machines (CSMs). This module models all three with
+NumPy, many trials (and many models) per array:
+
+* ``ShuffleModel`` - a hand-shuffle procedure applied to the previous shoe
+  in the order it was dealt: riffles (of the whole stack, or of handfuls
+  paired from the two halves), a strip, more riffles and a cut. Riffles are
+  Gilbert-Shannon-Reeds riffles built from one random bit per card, strips
+  reverse randomly sized packets, and every step is a gather over all rows
+  at once, so grids of thousands of procedures run in one call.
+* ``ReinsertionModel`` - after ``penetration`` of the shoe is dealt the
+  discards are riffled and pushed back in at random places among the
+  undealt cards.
+* ``CsmModel`` - discards go back into random slots after every round and
+  the dealer draws from slots released one at a time.
+
+Information is how well the cards a counter has seen predict the counts
+still to come. For shuffles and reinsertion it is the squared correlation
+between the actual half-deck windows of the new shoe and the best
+prediction from the seen part of the old one, weighted by where the
+procedure tends to send each card (see ``landing_information``); for a
+CSM it is the adjusted R-squared of the next round's tag sum fitted on the
+last few rounds. 1 means the count of what comes next is known exactly, 0
+means nothing seen helps. Run ``python -m blackjack_counter.shuffles``.
+"""
+
+import argparse
+import itertools
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from blackjack_counter.simulation import deal_shoes, shoe_ranks
+from blackjack_counter.state import CARDS_PER_DECK
+from blackjack_counter.systems import CountingSystem, get_system, registered_systems
+
+DEFAULT_TRIALS = 2000
+DEFAULT_PENETRATION = 0.75
+DEFAULT_ROUND_CARDS = 16
+DEFAULT_HISTORY = 4
+CSM_ROUNDS = 160
+CSM_WARMUP = 40
+# Rows (trials times models) shuffled per array, to bound memory.
+MAX_ROWS = 65_536
+
+_BUFFER = -1
+
+
+@dataclass(frozen=True)
+class ShuffleModel:
+    """A hand-shuffle procedure.
+
+    ``grab`` is the size of each riffled handful (half from each half of
+    the stack); 0 riffles the whole stack at once. ``strip_packets`` is the
+    expected number of packets in the strip (0 for no strip).
+    """
+
+    name: str
+    riffles: int = 0
+    grab: int = 0
+    strip_packets: float = 0.0
+    final_riffles: int = 0
+    cut: bool = True
+
+
+@dataclass(frozen=True)
+class ReinsertionModel:
+    """Discards riffled ``riffles`` times and pushed back into the undealt cards."""
+
+    name: str
+    penetration: float = 0.5
+    riffles: int = 0
+
+
+@dataclass(frozen=True)
+class CsmModel:
+    """A continuous shuffler with ``slots`` slots fed after every round."""
+
+    name: str
+    slots: int = 19
+    round_cards: int = DEFAULT_ROUND_CARDS
+
+
+@dataclass(frozen=True)
+class ShuffleResult:
+    name: str
+    kind: str
+    information: float
+
+
+# -- shuffle steps ---------------------------------------------------------
+
+
+@lru_cache(maxsize=32)
+def _interlace(cards: int, grab: int) -> np.ndarray:
+    """Stack order that puts handful k of the top half next to handful k of the bottom half."""
+
+    half, step = cards // 2, grab // 2
+    order = []
+    for start in range(0, half, step):
+        order.extend(range(start, start + step))
+        order.extend(range(half + start, half + start + step))
+    return np.array(order, dtype=np.intp)
+
+
+def riffle(stacks: np.ndarray, rng: np.random.Generator, grab: int = 0) -> np.ndarray:
+    """One Gilbert-Shannon-Reeds riffle of every row, handful by handful.
+
+    Each output card comes from the top packet with probability 1/2, which
+    gives a binomial cut and the GSR interleaving in one draw.
+    """
+
+    rows, cards = stacks.shape
+    grab = grab or cards
+    if grab < cards:
+        stacks = stacks[:, _interlace(cards, grab)]
+    blocks = stacks.reshape(rows, cards // grab, grab)
+    from_top = rng.random(blocks.shape) < 0.5
+    top_cards = from_top.sum(axis=2, keepdims=True)
+    source = np.where(from_top, np.cumsum(from_top, axis=2) - 1, top_cards + np.cumsum(~from_top, axis=2) - 1)
+    return np.take_along_axis(blocks, source, axis=2).reshape(rows, cards)
+
+
+def strip(stacks: np.ndarray, rng: np.random.Generator, packets: np.ndarray) -> np.ndarray:
+    """Strip every row into about ``packets`` packets and reverse their order."""
+
+    rows, cards = stacks.shape
+    position = np.arange(cards)
+    chance = (np.maximum(np.asarray(packets, dtype=np.float64), 1.0) - 1.0) / (cards - 1)
+    breaks = rng.random((rows, cards - 1)) < np.broadcast_to(chance, (rows,))[:, None]
+    starts = np.concatenate([np.ones((rows, 1), dtype=bool), breaks], axis=1)
+    ends = np.concatenate([breaks, np.ones((rows, 1), dtype=bool)], axis=1)
+    start = np.maximum.accumulate(np.where(starts, position, 0), axis=1)
+    end = np.minimum.accumulate(np.where(ends, position + 1, cards)[:, ::-1], axis=1)[:, ::-1]
+    out = np.empty_like(stacks)
+    np.put_along_axis(out, cards - end + (position - start), stacks, axis=1)
+    return out
+
+
+def cut(stacks: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Cut every row somewhere in its middle half."""
+
+    rows, cards = stacks.shape
+    offset = rng.integers(cards // 4, 3 * cards // 4 + 1, size=(rows, 1))
+    return np.take_along_axis(stacks, (np.arange(cards) + offset) % cards, axis=1)
+
+
+def _riffle_rows(stacks: np.ndarray, rng: np.random.Generator, counts: np.ndarray, grab: int) -> None:
+    """Riffle row i ``counts[i]`` times, in place."""
+
+    for done in range(int(counts.max(initial=0))):
+        rows = np.flatnonzero(counts > done)
+        stacks[rows] = riffle(stacks[rows], rng, grab)
+
+
+def apply_procedures(stacks: np.ndarray, models: Sequence[ShuffleModel], rng: np.random.Generator) -> np.ndarray:
+    """Shuffle row i with ``models[i]``; all models must share one ``grab``."""
+
+    grabs = {model.grab for model in models}
+    if len(grabs) != 1:
+        raise ValueError("models applied together must use the same grab size")
+    grab = grabs.pop()
+    cards = stacks.shape[1]
+    if grab and (cards % grab or grab % 2):
+        raise ValueError(f"grab of {grab} must be even and divide the {cards}-card stack")
+
+    stacks = stacks.copy()
+    _riffle_rows(stacks, rng, np.array([model.riffles for model in models]), grab)
+    packets = np.array([model.strip_packets for model in models])
+    stripped = np.flatnonzero(packets > 0)
+    if stripped.size:
+        stacks[stripped] = strip(stacks[stripped], rng, packets[stripped])
+    _riffle_rows(stacks, rng, np.array([model.final_riffles for model in models]), grab)
+    cutting = np.flatnonzero([model.cut for model in models])
+    if cutting.size:
+        stacks[cutting] = cut(stacks[cutting], rng)
+    return stacks
+
+
+def reinsert(
+    stacks: np.ndarray, rng: np.random.Generator, dealt: int, riffles: np.ndarray
+) -> np.ndarray:
+    """Riffle the first ``dealt`` cards and push them back in at random places."""
+
+    rows, cards = stacks.shape
+    discards = stacks[:, :dealt].copy()
+    _riffle_rows(discards, rng, np.asarray(riffles), 0)
+    places = np.zeros((rows, cards), dtype=bool)
+    places[:, :dealt] = True
+    places = rng.permuted(places, axis=1)
+    out = np.empty_like(stacks)
+    out[places] = discards.ravel()
+    out[~places] = stacks[:, dealt:].ravel()
+    return out
+
+
+# -- information -----------------------------------------------------------
+
+
+def adjusted_r2(predictors: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Adjusted R-squared of a least-squares fit of each target column."""
+
+    samples = len(predictors)
+    design = np.hstack([np.ones((samples, 1)), predictors])
+    coefficients, _, rank, _ = np.linalg.lstsq(design, targets, rcond=None)
+    residual = ((targets - design @ coefficients) ** 2).sum(axis=0)
+    total = ((targets - targets.mean(axis=0)) ** 2).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r2 = 1.0 - residual / total
+    used = rank - 1
+    adjusted = 1.0 - (1.0 - r2) * (samples - 1) / max(1, samples - used - 1)
+    return np.clip(np.nan_to_num(adjusted, nan=0.0), 0.0, 1.0)
+
+
+def _windows(tags: np.ndarray, width: int) -> np.ndarray:
+    rows, cards = tags.shape
+    return tags[:, : cards - cards % width].reshape(rows, -1, width).sum(axis=2)
+
+
+def landing_information(before: np.ndarray, sources: np.ndarray, seen: int, width: int) -> float:
+    """How well the seen part of ``before`` predicts each window after the shuffle.
+
+    ``before`` holds the tags of the old shoe in dealing order, one trial
+    per row, and ``sources`` the old position of every card after the
+    shuffle. The prediction is the best one a counter who knows the
+    procedure (but not how this shuffle fell) can make: each seen card
+    weighted by its chance of landing in the window, each unseen card by
+    the mean of the unseen tags. Returns the squared correlation between
+    predicted and actual window counts, averaged over the windows.
+    """
+
+    trials, cards = sources.shape
+    windows = cards // width
+    window_of = np.minimum(np.arange(cards) // width, windows - 1)
+    cells = (window_of * cards + sources).ravel()
+    landing = np.bincount(cells, minlength=windows * cards).reshape(windows, cards) / trials
+
+    known = before.astype(np.float64)
+    unseen_mean = (before.sum(axis=1) - known[:, :seen].sum(axis=1)) / max(1, cards - seen)
+    known[:, seen:] = unseen_mean[:, None]
+    predicted = known @ landing.T
+    actual = _windows(np.take_along_axis(before, sources, axis=1), width).astype(np.float64)
+
+    predicted -= predicted.mean(axis=0)
+    actual -= actual.mean(axis=0)
+    spread = np.sqrt((predicted ** 2).sum(axis=0) * (actual ** 2).sum(axis=0))
+    correlation = np.divide((predicted * actual).sum(axis=0), spread, out=np.zeros(windows), where=spread > 0)
+    return float((correlation ** 2).mean())
+
+
+def _positions(rows: int, cards: int) -> np.ndarray:
+    return np.tile(np.arange(cards, dtype=np.int32), (rows, 1))
+
+
+def _tags(system: CountingSystem) -> np.ndarray:
+    return np.asarray(system.table, dtype=np.int16)
+
+
+def _trial_blocks(models: Sequence, trials: int) -> Iterable[Tuple[List, int]]:
+    """Split ``models`` into groups whose trials fit in ``MAX_ROWS`` rows."""
+
+    per_block = max(1, MAX_ROWS // trials)
+    for start in range(0, len(models), per_block):
+        yield list(models[start : start + per_block]), trials
+
+
+def procedure_information(
+    models: Sequence[ShuffleModel],
+    decks: int,
+    system: CountingSystem,
+    rng: np.random.Generator,
+    *,
+    trials: int = DEFAULT_TRIALS,
+    penetration: float = DEFAULT_PENETRATION,
+) -> List[float]:
+    """Information kept by each hand-shuffle procedure.
+
+    Every trial shuffles a freshly dealt shoe; the counter saw its first
+    ``penetration`` before the shuffle.
+    """
+
+    cards = decks * CARDS_PER_DECK
+    width = CARDS_PER_DECK // 2
+    seen = int(penetration * cards)
+    table = _tags(system)
+    results: Dict[ShuffleModel, float] = {}
+    by_grab: Dict[int, List[ShuffleModel]] = {}
+    for model in models:
+        by_grab.setdefault(model.grab, []).append(model)
+    for group in by_grab.values():
+        for block, count in _trial_blocks(group, trials):
+            before = table[deal_shoes(rng, decks, len(block) * count)]
+            sources = apply_procedures(
+                _positions(len(before), cards), [model for model in block for _ in range(count)], rng
+            )
+            for index, model in enumerate(block):
+                rows = slice(index * count, (index + 1) * count)
+                results[model] = landing_information(before[rows], sources[rows], seen, width)
+    return [results[model] for model in models]
+
+
+def reinsertion_information(
+    models: Sequence[ReinsertionModel],
+    decks: int,
+    system: CountingSystem,
+    rng: np.random.Generator,
+    *,
+    trials: int = DEFAULT_TRIALS,
+) -> List[float]:
+    cards = decks * CARDS_PER_DECK
+    width = CARDS_PER_DECK // 2
+    table = _tags(system)
+    information = []
+    for model in models:
+        seen = int(model.penetration * cards)
+        before = table[deal_shoes(rng, decks, trials)]
+        sources = reinsert(_positions(trials, cards), rng, seen, np.full(trials, model.riffles))
+        information.append(landing_information(before, sources, seen, width))
+    return information
+
+
+def csm_information(
+    models: Sequence[CsmModel],
+    decks: int,
+    system: CountingSystem,
+    rng: np.random.Generator,
+    *,
+    trials: int = DEFAULT_TRIALS,
+    history: int = DEFAULT_HISTORY,
+    rounds: int = CSM_ROUNDS,
+    warmup: int = CSM_WARMUP,
+) -> List[float]:
+    """Information about the next round from the last ``history`` rounds.
+
+    All trials of all models with the same cards per round run together;
+    each card carries its slot (or ``_BUFFER`` once released) and a key
+    that orders the buffer.
+    """
+
+    cards = decks * CARDS_PER_DECK
+    table = _tags(system)
+    results: Dict[CsmModel, float] = {}
+    by_round: Dict[int, List[CsmModel]] = {}
+    for model in models:
+        by_round.setdefault(model.round_cards, []).append(model)
+    for dealt_cards, group in by_round.items():
+        for block, count in _trial_blocks(group, trials):
+            slots = np.repeat([model.slots for model in block], count)[:, None]
+            rows = len(slots)
+            tags = np.broadcast_to(table[shoe_ranks(decks)], (rows, cards))
+            where = rng.integers(0, slots, size=(rows, cards))
+            key = rng.random((rows, cards))
+            releases = np.zeros(rows)
+            sums = np.zeros((rows, rounds), dtype=np.int32)
+            for round_index in range(rounds):
+                while True:
+                    short = np.flatnonzero((where == _BUFFER).sum(axis=1) < dealt_cards)
+                    if not short.size:
+                        break
+                    # Release the slot of a random card still in the machine.
+                    pick = np.where(where[short] >= 0, rng.random((short.size, cards)), -1.0).argmax(axis=1)
+                    chosen = where[short, pick]
+                    released = where[short] == chosen[:, None]
+                    where[short] = np.where(released, _BUFFER, where[short])
+                    key[short] = np.where(released, releases[short, None] + 1.0 + key[short], key[short])
+                    releases[short] += 1.0
+                dealt = np.argpartition(np.where(where == _BUFFER, key, np.inf), dealt_cards - 1, axis=1)[
+                    :, :dealt_cards
+                ]
+                sums[:, round_index] = np.take_along_axis(tags, dealt, axis=1).sum(axis=1)
+                np.put_along_axis(where, dealt, rng.integers(0, slots, size=(rows, dealt_cards)), axis=1)
+                np.put_along_axis(key, dealt, rng.random((rows, dealt_cards)), axis=1)
+
+            for index, model in enumerate(block):
+                model_sums = sums[index * count : (index + 1) * count, warmup - history :]
+                lagged = np.lib.stride_tricks.sliding_window_view(model_sums, history + 1, axis=1)
+                lagged = lagged.reshape(-1, history + 1)
+                results[model] = float(adjusted_r2(lagged[:, :-1], lagged[:, -1:])[0])
+    return [results[model] for model in models]
+
+
+def evaluate(
+    models: Sequence[object],
+    decks: int = 6,
+    system: Optional[CountingSystem] = None,
+    *,
+    trials: int = DEFAULT_TRIALS,
+    penetration: float = DEFAULT_PENETRATION,
+    seed: Optional[int] = None,
+) -> List[ShuffleResult]:
+    """Information kept by each model, in the order given."""
+
+    system = system or get_system("hilo")
+    rng = np.random.default_rng(seed)
+    kinds = (
+        ("shuffle", ShuffleModel, lambda group: procedure_information(group, decks, system, rng, trials=trials, penetration=penetration)),
+        ("reinsertion", ReinsertionModel, lambda group: reinsertion_information(group, decks, system, rng, trials=trials)),
+        ("csm", CsmModel, lambda group: csm_information(group, decks, system, rng, trials=trials)),
+    )
+    found: Dict[object, ShuffleResult] = {}
+    for kind, cls, run in kinds:
+        group = [model for model in models if isinstance(model, cls)]
+        if group:
+            for model, information in zip(group, run(group)):
+                found[model] = ShuffleResult(model.name, kind, information)
+    return [found[model] for model in models]
+
+
+def standard_models(decks: int) -> List[object]:
+    """A catalogue of common shuffles for ``decks`` decks."""
+
+    cards = decks * CARDS_PER_DECK
+    grab = next((size for size in (CARDS_PER_DECK, CARDS_PER_DECK // 2) if cards % size == 0 and size < cards), 0)
+    models: List[object] = [
+        ShuffleModel("no shuffle", cut=False),
+        ShuffleModel("cut only"),
+        ShuffleModel("strip only (8 packets)", strip_packets=8),
+    ]
+    models += [ShuffleModel(f"{count} whole-stack riffle{'s' if count > 1 else ''}", riffles=count) for count in (1, 2, 3, 4, 7)]
+    if grab:
+        models += [
+            ShuffleModel(f"{count} x {grab}-card handful riffles", riffles=count, grab=grab) for count in (1, 2, 4)
+        ]
+        models.append(
+            ShuffleModel(f"casino: 2 handful riffles, strip, riffle ({grab})", riffles=2, grab=grab, strip_packets=6, final_riffles=1)
+        )
+    models += [
+        ReinsertionModel("discards reinserted at 50%, unshuffled", 0.5, 0),
+        ReinsertionModel("discards reinserted at 50%, 1 riffle", 0.5, 1),
+        ReinsertionModel("discards reinserted at 75%, 3 riffles", 0.75, 3),
+        CsmModel("CSM, 19 slots", 19),
+        CsmModel("CSM, 38 slots", 38),
+    ]
+    return models
+
+
+def procedure_grid(decks: int) -> List[ShuffleModel]:
+    """Every combination of riffle counts, handful sizes, strips and cuts."""
+
+    cards = decks * CARDS_PER_DECK
+    grabs = [0] + [size for size in (CARDS_PER_DECK // 2, CARDS_PER_DECK, 2 * CARDS_PER_DECK) if size < cards and cards % size == 0]
+    models = []
+    for riffles, grab, packets, final, cutting in itertools.product(range(8), grabs, (0, 4, 8, 16), range(4), (False, True)):
+        name = f"{riffles}R/{grab or 'all'}" + (f" S{packets}" if packets else "") + (f" +{final}R" if final else "")
+        models.append(ShuffleModel(name + (" C" if cutting else ""), riffles, grab, packets, final, cutting))
+    return models
+
+
+def format_results(results: Sequence[ShuffleResult]) -> str:
+    width = max(len(result.name) for result in results)
+    lines = [f"{'model'.ljust(width)}  {'kind':<12}information"]
+    for result in results:
+        lines.append(f"{result.name.ljust(width)}  {result.kind:<12}{result.information:>11.3f}")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=6, help="decks per shoe (default: 6)")
+    parser.add_argument(
+        "--system", default="hilo", choices=[system.key for system in registered_systems()], help="tags to count"
+    )
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS, help="shuffles per model")
+    parser.add_argument("--penetration", type=float, default=DEFAULT_PENETRATION, help="share seen before a shuffle")
+    parser.add_argument(
+        "--grid", action="store_true", help="rank every procedure in a grid of riffles, handfuls, strips and cuts"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    system = get_system(args.system)
+    models = procedure_grid(args.decks) if args.grid else standard_models(args.decks)
+    start = time.perf_counter()
+    results = evaluate(
+        models, args.decks, system, trials=args.trials, penetration=args.penetration, seed=args.seed
+    )
+    elapsed = time.perf_counter() - start
+    if args.grid:
+        results = sorted(results, key=lambda result: result.information)
+        shown = results[:10] + results[-10:] if len(results) > 20 else results
+        print(format_results(shown))
+    else:
+        print(format_results(results))
+    print(f"{len(models)} models, {args.trials} trials each, {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
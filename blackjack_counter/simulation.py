@@ -0,0 +1,402 @@
+"""Headless shoe simulator that measures how often each true count shows up.
+
+Shoes are shuffled and dealt in batches with NumPy: every row of a batch is
+an independently permuted shoe of rank indexes (``state.RANKS`` order), the
+running count comes from a cumulative sum through the counting system's
+lookup table, and true counts are bucketed for all cards at once. The GUI
+never imports this module, so NumPy is only needed for analysis runs.
+
+Run ``python -m blackjack_counter.simulation --help`` for the command line;
+``--workers`` spreads the shoes over a process pool (see ``parallel``) and
+``--checkpoint`` makes long runs resumable after a crash or Ctrl-C (see
+``checkpoint``).
+"""
+
+import argparse
+import signal
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from blackjack_counter.checkpoint import DEFAULT_INTERVAL, CheckpointMismatch, Checkpointer
+from blackjack_counter.deviations import TC_MAX, TC_MIN
+from blackjack_counter.parallel import ParallelRunner, SimulationCancelled, new_seed
+from blackjack_counter.state import CARDS_PER_DECK, RANKS, SUITS
+from blackjack_counter.systems import CountingSystem, get_system, registered_systems
+
+DEFAULT_PENETRATIONS: Tuple[float, ...] = (0.5, 0.625, 0.75, 5 / 6)
+DEFAULT_BATCH_SIZE = 2048
+DEFAULT_UNIT_SHOES = 20_000
+# Matches CountingState.true_count, which never divides by less than this.
+MIN_DECKS_DIVISOR = 0.25
+
+
+def shoe_ranks(decks: int) -> np.ndarray:
+    """An unshuffled shoe as rank indexes."""
+
+    return np.repeat(np.arange(len(RANKS), dtype=np.int8), SUITS * decks)
+
+
+def deal_shoes(rng: np.random.Generator, decks: int, count: int) -> np.ndarray:
+    """Shuffle ``count`` independent shoes, one per row."""
+
+    shoes = np.tile(shoe_ranks(decks), (count, 1))
+    return rng.permuted(shoes, axis=1, out=shoes)
+
+
+def running_counts(shoes: np.ndarray, system: CountingSystem, decks: int) -> np.ndarray:
+    """Running count in half-units after each card of each shoe."""
+
+    table = np.asarray(system.table, dtype=np.int16)
+    counts = np.cumsum(table[shoes], axis=1, dtype=np.int32)
+    counts += round(system.initial_running_count(decks) * 2)
+    return counts
+
+
+def decks_left_after(decks: int) -> np.ndarray:
+    """True-count divisor after each card of a shoe, clamped like CountingState."""
+
+    cards = decks * CARDS_PER_DECK
+    remaining = cards - np.arange(1, cards + 1, dtype=np.float64)
+    return np.maximum(remaining / CARDS_PER_DECK, MIN_DECKS_DIVISOR)
+
+
+def true_count_buckets(
+    shoes: np.ndarray,
+    system: CountingSystem,
+    decks: int,
+    *,
+    tc_min: int = TC_MIN,
+    tc_max: int = TC_MAX,
+) -> np.ndarray:
+    """Bucket index (0 for ``tc_min``) of the true count after each card."""
+
+    halves = running_counts(shoes, system, decks)
+    divisor = 2 * decks_left_after(decks)[: shoes.shape[1]]
+    buckets = np.floor(halves / divisor)
+    np.clip(buckets, tc_min, tc_max, out=buckets)
+    buckets -= tc_min
+    return buckets.astype(np.intp)
+
+
+def cut_positions(decks: int, penetrations: Sequence[float]) -> List[int]:
+    """Number of cards dealt before the cut card for each penetration."""
+
+    cards = decks * CARDS_PER_DECK
+    cuts = []
+    for penetration in penetrations:
+        if not 0 < penetration <= 1:
+            raise ValueError(f"penetration must be in (0, 1], got {penetration!r}")
+        cuts.append(max(1, int(round(penetration * cards))))
+    return cuts
+
+
+@dataclass
+class TrueCountTable:
+    """Integer true-count histograms, one row per penetration level.
+
+    ``counts[p, b]`` is how many dealt cards left the true count in bucket
+    ``b`` (``tc_min + b``) across all shoes dealt to penetration ``p``.
+    Tables add exactly, so partial runs can be merged in any order.
+    """
+
+    system_key: str
+    decks: int
+    penetrations: Tuple[float, ...]
+    tc_min: int
+    tc_max: int
+    counts: np.ndarray
+    shoes: int = 0
+
+    @classmethod
+    def empty(
+        cls,
+        system: CountingSystem,
+        decks: int,
+        penetrations: Sequence[float] = DEFAULT_PENETRATIONS,
+        *,
+        tc_min: int = TC_MIN,
+        tc_max: int = TC_MAX,
+    ) -> "TrueCountTable":
+        counts = np.zeros((len(penetrations), tc_max - tc_min + 1), dtype=np.int64)
+        return cls(system.key, decks, tuple(penetrations), tc_min, tc_max, counts)
+
+    @property
+    def true_counts(self) -> np.ndarray:
+        """Lower edge of each bucket."""
+
+        return np.arange(self.tc_min, self.tc_max + 1)
+
+    def frequencies(self) -> np.ndarray:
+        """Each row of ``counts`` normalised to sum to one."""
+
+        totals = self.counts.sum(axis=1, keepdims=True)
+        return np.divide(self.counts, totals, out=np.zeros(self.counts.shape), where=totals > 0)
+
+    def is_compatible(self, other: "TrueCountTable") -> bool:
+        return (
+            self.system_key == other.system_key
+            and self.decks == other.decks
+            and self.penetrations == other.penetrations
+            and (self.tc_min, self.tc_max) == (other.tc_min, other.tc_max)
+        )
+
+    def merge(self, other: "TrueCountTable") -> None:
+        """Add another table's counts into this one."""
+
+        if not self.is_compatible(other):
+            raise ValueError("Cannot merge true-count tables from different setups")
+        self.counts += other.counts
+        self.shoes += other.shoes
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The accumulated values, for ``checkpoint.save``."""
+
+        return {"counts": self.counts, "shoes": np.array(self.shoes, dtype=np.int64)}
+
+    def load_arrays(self, arrays: Mapping[str, np.ndarray]) -> None:
+        """Replace the accumulated values with ones saved by ``arrays``."""
+
+        counts = np.asarray(arrays["counts"], dtype=np.int64)
+        if counts.shape != self.counts.shape:
+            raise ValueError(f"saved counts have shape {counts.shape}, expected {self.counts.shape}")
+        self.counts[...] = counts
+        self.shoes = int(arrays["shoes"])
+
+    def format(self) -> str:
+        """Plain-text frequency table, one column per penetration."""
+
+        header = "TC".rjust(5) + "".join(f"{penetration:>10.1%}" for penetration in self.penetrations)
+        lines = [header]
+        frequencies = self.frequencies()
+        for bucket, true_count in enumerate(self.true_counts):
+            label = f"{true_count:+d}"
+            if true_count == self.tc_min:
+                label = f"<={label}"
+            elif true_count == self.tc_max:
+                label = f">={label}"
+            lines.append(label.rjust(5) + "".join(f"{row[bucket]:>10.2%}" for row in frequencies))
+        return "\n".join(lines)
+
+
+class ShoeSimulator:
+    """Deal batches of shoes for one system and accumulate a ``TrueCountTable``."""
+
+    def __init__(
+        self,
+        system: CountingSystem,
+        decks: int = 6,
+        penetrations: Sequence[float] = DEFAULT_PENETRATIONS,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        tc_min: int = TC_MIN,
+        tc_max: int = TC_MAX,
+    ) -> None:
+        self.system = system
+        self.decks = decks
+        self.penetrations = tuple(penetrations)
+        self.batch_size = batch_size
+        self.tc_min = tc_min
+        self.tc_max = tc_max
+
+        cuts = cut_positions(decks, self.penetrations)
+        self._deal_to = max(cuts)
+        self._buckets = tc_max - tc_min + 1
+        # Cards are grouped by the first penetration whose cut they fall
+        # under, so one bincount per batch covers every penetration level.
+        order = np.argsort(cuts, kind="stable")
+        segment = np.empty(self._deal_to, dtype=np.intp)
+        start = 0
+        for rank, index in enumerate(order):
+            segment[start:cuts[index]] = rank
+            start = max(start, cuts[index])
+        self._segment_offsets = segment * self._buckets
+        self._segment_order = order
+
+    def empty_table(self) -> TrueCountTable:
+        return TrueCountTable.empty(
+            self.system, self.decks, self.penetrations, tc_min=self.tc_min, tc_max=self.tc_max
+        )
+
+    def run_batch(self, rng: np.random.Generator, shoes: int, table: TrueCountTable) -> None:
+        """Deal ``shoes`` shoes and add their true counts to ``table``."""
+
+        dealt = deal_shoes(rng, self.decks, shoes)[:, : self._deal_to]
+        buckets = true_count_buckets(dealt, self.system, self.decks, tc_min=self.tc_min, tc_max=self.tc_max)
+        buckets += self._segment_offsets
+        per_segment = np.bincount(
+            buckets.ravel(), minlength=len(self._segment_order) * self._buckets
+        ).reshape(len(self._segment_order), self._buckets)
+
+        # A deeper cut also sees every card dealt before shallower cuts.
+        cumulative = np.cumsum(per_segment, axis=0)
+        for rank, index in enumerate(self._segment_order):
+            table.counts[index] += cumulative[rank]
+        table.shoes += shoes
+
+    def run(self, shoes: int, rng: np.random.Generator, table: Optional[TrueCountTable] = None) -> TrueCountTable:
+        """Deal ``shoes`` shoes in batches and return the accumulated table."""
+
+        table = table if table is not None else self.empty_table()
+        remaining = shoes
+        while remaining > 0:
+            batch = min(self.batch_size, remaining)
+            self.run_batch(rng, batch, table)
+            remaining -= batch
+        return table
+
+
+def simulate_true_counts(
+    system: CountingSystem,
+    decks: int = 6,
+    shoes: int = 100_000,
+    penetrations: Sequence[float] = DEFAULT_PENETRATIONS,
+    *,
+    seed: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> TrueCountTable:
+    """True-count frequency table for ``shoes`` shoes of ``system`` on one core."""
+
+    simulator = ShoeSimulator(system, decks, penetrations, batch_size=batch_size)
+    return simulator.run(shoes, np.random.default_rng(seed))
+
+
+@dataclass(frozen=True)
+class TrueCountTask:
+    """Picklable work-unit description for ``parallel.ParallelRunner``."""
+
+    system_key: str
+    decks: int = 6
+    penetrations: Tuple[float, ...] = DEFAULT_PENETRATIONS
+    shoes_per_unit: int = DEFAULT_UNIT_SHOES
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    def simulator(self) -> ShoeSimulator:
+        return ShoeSimulator(get_system(self.system_key), self.decks, self.penetrations, batch_size=self.batch_size)
+
+    def empty(self) -> TrueCountTable:
+        return self.simulator().empty_table()
+
+    def run_unit(self, rng: np.random.Generator) -> TrueCountTable:
+        return self.simulator().run(self.shoes_per_unit, rng)
+
+
+def units_for(shoes: int, shoes_per_unit: int) -> int:
+    """Work units needed to deal at least ``shoes`` shoes."""
+
+    return max(1, -(-shoes // shoes_per_unit))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--system",
+        default="hilo",
+        choices=[system.key for system in registered_systems()],
+        help="counting system to score shoes with (default: hilo)",
+    )
+    parser.add_argument("--decks", type=int, default=6, help="decks per shoe (default: 6)")
+    parser.add_argument("--shoes", type=int, default=100_000, help="shoes to deal (default: 100000)")
+    parser.add_argument(
+        "--penetration",
+        type=float,
+        action="append",
+        dest="penetrations",
+        help="fraction of the shoe dealt before the cut card; repeat for several",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="shoes dealt per NumPy batch")
+    parser.add_argument(
+        "--unit-shoes",
+        type=int,
+        default=DEFAULT_UNIT_SHOES,
+        help="shoes per work unit; results depend on this and --seed, never on --workers",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="file to save progress to; rerun with the same options to resume from it",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"minimum seconds between checkpoint writes (default: {DEFAULT_INTERVAL:g})",
+    )
+    return parser
+
+
+def print_progress(done: int, total: int) -> None:
+    print(f"\r{done}/{total} units ({done / total:.0%})", end="", file=sys.stderr, flush=True)
+    if done == total:
+        print(file=sys.stderr)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.checkpoint and args.seed is None:
+        raise SystemExit("--checkpoint needs --seed so the resumed run deals the same shoes")
+    seed = args.seed if args.seed is not None else new_seed()
+    task = TrueCountTask(
+        args.system,
+        args.decks,
+        tuple(args.penetrations or DEFAULT_PENETRATIONS),
+        args.unit_shoes,
+        args.batch_size,
+    )
+    units = units_for(args.shoes, args.unit_shoes)
+
+    checkpointer = None
+    initial = None
+    skip: Iterable[int] = ()
+    if args.checkpoint:
+        checkpointer = Checkpointer(args.checkpoint, task, seed, units, interval=args.checkpoint_interval)
+        try:
+            initial, skip = checkpointer.resume()
+        except CheckpointMismatch as error:
+            raise SystemExit(str(error)) from None
+        if skip:
+            print(f"resuming from {args.checkpoint}: {len(skip)} of {units} units done", file=sys.stderr)
+
+    runner = ParallelRunner(
+        task,
+        units,
+        seed,
+        workers=args.workers,
+        progress=print_progress,
+        on_unit=checkpointer.on_unit if checkpointer else None,
+    )
+    # The first Ctrl-C lets the units in flight finish so the checkpoint
+    # matches the merged totals exactly; a second one aborts.
+    def _interrupt(signum: int, frame: object) -> None:
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print("\nstopping after the current units (Ctrl-C again to abort)", file=sys.stderr)
+        runner.cancel()
+
+    previous_handler = signal.signal(signal.SIGINT, _interrupt)
+    try:
+        table = runner.run(skip=skip, initial=initial)
+    except KeyboardInterrupt:
+        print("\ninterrupted", file=sys.stderr)
+        sys.exit(130)
+    except SimulationCancelled as cancelled:
+        table = cancelled.partial
+        print(f"\ncancelled after {cancelled.completed} of {cancelled.total} units", file=sys.stderr)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    if checkpointer is not None:
+        checkpointer.write()
+        print(
+            f"checkpoint {args.checkpoint}: {checkpointer.writes} writes, "
+            f"{checkpointer.overhead:.3%} of run time",
+            file=sys.stderr,
+        )
+
+    print(f"{table.shoes:,} shoes, {table.decks} decks, {get_system(table.system_key).name}, seed {seed}")
+    print(table.format())
+
+if __name__ == "__main__":
+    main()
@@ -1,94 +1,471 @@
 """Domain models that track running and true counts for the blackjack counter."""
 
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import List, Optional
+from itertools import accumulate, islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple, Union, overload
 
-MAX_REDO_HISTORY = 20
-MAX_UNDO_STREAK = 50
+if TYPE_CHECKING:  # pragma: no cover - only for type checkers
+    from blackjack_counter.systems import CountingSystem
+
+CARDS_PER_DECK = 52
+SUITS = 4
+CHECKPOINT_INTERVAL = 64
+
+RANKS = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A")
+# Cards entered by class rather than rank (the Hi-Lo buttons). Each one
+# removes a card from the ranks whose tag has the matching sign.
+CARD_CLASSES = ("Low", "Hi", "Neutral")
+# Labels are stored as one-byte codes; ranks come first so a code below
+# len(RANKS) is also the rank index.
+LABELS = RANKS + CARD_CLASSES
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
 
 
-@dataclass
 class CountEntry:
     """Represents a single counting adjustment and its label."""
-    label: str
-    value: float
+
+    __slots__ = ("label", "value")
+
+    def __init__(self, label: str, value: float) -> None:
+        self.label = label
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CountEntry):
+            return NotImplemented
+        return self.label == other.label and self.value == other.value
+
+    def __repr__(self) -> str:
+        return f"CountEntry(label={self.label!r}, value={self.value!r})"
+
+
+@dataclass(frozen=True)
+class StateEvent:
+    """A change published by ``CountingState`` to its subscribers."""
+
+
+@dataclass(frozen=True)
+class EntriesAppended(StateEvent):
+    """``entries`` now apply from position ``start``: newly recorded, or redone.
+
+    ``discarded`` counts the redo entries dropped to make room for new ones.
+    """
+
+    start: int
+    entries: Tuple[CountEntry, ...]
+    redone: bool = False
+    discarded: int = 0
+
+
+@dataclass(frozen=True)
+class EntriesRemoved(StateEvent):
+    """The position moved back to ``position``, taking ``count`` entries off (undo or seek)."""
+
+    position: int
+    count: int
+
+
+@dataclass(frozen=True)
+class ShoeReset(StateEvent):
+    """Every entry was cleared."""
+
+
+@dataclass(frozen=True)
+class CapabilityChanged(StateEvent):
+    """Undo or redo became available or unavailable."""
+
+    can_undo: bool
+    can_redo: bool
+
+
+StateListener = Callable[[StateEvent], None]
+
+
+def to_half_units(value: float) -> int:
+    """Convert a count adjustment to whole half-units, rejecting finer steps."""
+    halves = round(value * 2)
+    if abs(halves - value * 2) > 1e-9:
+        raise ValueError(f"Count adjustments must be multiples of 0.5, got {value!r}")
+    if not -128 <= halves <= 127:
+        raise ValueError(f"Count adjustment {value!r} is out of range")
+    return halves
+
+
+class HistoryView(Sequence):
+    """Read-only sequence over the recorded entries of a ``CountingState``.
+
+    Entries are materialised as ``CountEntry`` objects only when indexed or
+    iterated; the underlying storage stays in compact arrays.
+    """
+
+    __slots__ = ("_state",)
+
+    def __init__(self, state: "CountingState") -> None:
+        self._state = state
+
+    def __len__(self) -> int:
+        return self._state._size
+
+    @overload
+    def __getitem__(self, index: int) -> CountEntry: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[CountEntry]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CountEntry, List[CountEntry]]:
+        size = self._state._size
+        if isinstance(index, slice):
+            return [self._state._entry_at(position) for position in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._state._entry_at(index)
+
+    def __iter__(self) -> Iterator[CountEntry]:
+        entry_at = self._state._entry_at
+        for position in range(self._state._size):
+            yield entry_at(position)
 
 
 class CountingState:
-    """Mutable state for the running and true counts across the shoe."""
+    """Mutable state for the running and true counts across the shoe.
+
+    Each entry is stored as a one-byte label code plus a signed byte of
+    half-units, which keeps Wong Halves sessions exact and lets an all-day
+    session hold millions of entries without one Python object apiece.
+
+    Alongside the entries the state keeps a prefix-sum array of the running
+    count and a per-label tally every ``CHECKPOINT_INTERVAL`` entries, so
+    the count and card composition at any earlier point can be read in
+    constant time. The current position is a cursor into that storage:
+    undo, redo and ``seek`` only move the cursor, and entries past it stay
+    available for redo until something new is recorded.
+
+    Every change is published to the listeners added with ``subscribe`` as
+    a ``StateEvent``, so views and loggers can follow the shoe without
+    polling it.
+    """
 
-    def __init__(self, decks: float = 6.0) -> None:
+    def __init__(self, decks: float = 6.0, system: Optional["CountingSystem"] = None) -> None:
         self.decks_total = decks
-        self.history: List[CountEntry] = []
-        self._redo_stack: List[CountEntry] = []
+        self.system = system
+        self._initial_halves = round(system.initial_running_count(decks) * 2) if system else 0
+        self._class_ranks = self._build_class_ranks(system)
+        self._history_view = HistoryView(self)
+        self._listeners: List[StateListener] = []
+        self._capabilities = (False, False)
+        self.reset()
 
-        self._undo_limit = MAX_UNDO_STREAK
-        self._redo_limit = MAX_REDO_HISTORY
-        self._undos_since_record = 0
+    def subscribe(self, listener: StateListener) -> Callable[[], None]:
+        """Call ``listener`` with every future change; returns a function that unsubscribes."""
+        self._listeners.append(listener)
+        return lambda: self.unsubscribe(listener)
+
+    def unsubscribe(self, listener: StateListener) -> None:
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def _publish(self, event: StateEvent) -> None:
+        for listener in tuple(self._listeners):
+            listener(event)
+
+    def _publish_capabilities(self) -> None:
+        capabilities = (self._size > 0, self._size < len(self._codes))
+        if capabilities != self._capabilities:
+            self._capabilities = capabilities
+            if self._listeners:
+                self._publish(CapabilityChanged(*capabilities))
+
+    def _publish_appended(self, start: int, redone: bool = False, discarded: int = 0) -> None:
+        if self._listeners:
+            entries = tuple(self._entry_at(position) for position in range(start, self._size))
+            self._publish(EntriesAppended(start, entries, redone, discarded))
+        self._publish_capabilities()
+
+    @property
+    def history(self) -> HistoryView:
+        """Recorded entries up to the current position."""
+        return self._history_view
+
+    @property
+    def position(self) -> int:
+        """Number of entries currently applied to the counts."""
+        return self._size
+
+    @property
+    def end(self) -> int:
+        """Furthest position redo or ``seek`` can move forward to."""
+        return len(self._codes)
 
     def reset(self) -> None:
         """Clear all recorded cards and adjustments."""
-        self.history.clear()
-        self._redo_stack.clear()
-        self._undos_since_record = 0
+        self._codes = bytearray()
+        self._halves = array("b")
+        # _prefix[i] is the running count in half-units after i entries.
+        self._prefix = array("i", [0])
+        # Label tallies for the first k * CHECKPOINT_INTERVAL entries,
+        # flattened with len(LABELS) slots per checkpoint.
+        self._checkpoints = array("I", bytes(4 * len(LABELS)))
+        self._stored_counts = [0] * len(LABELS)
+        # Entries per label up to the cursor.
+        self._counts = [0] * len(LABELS)
+        self._size = 0
+        if self._listeners:
+            self._publish(ShoeReset())
+        self._publish_capabilities()
 
     def record(self, label: str, value: float) -> None:
         """Append a new adjustment to the running count history."""
-        self.history.append(CountEntry(label, value))
-        self._redo_stack.clear()
-        self._undos_since_record = 0
+        start, discarded = self._size, len(self._codes) - self._size
+        self._append(*self._adjustment(label, value))
+        self._publish_appended(start, discarded=discarded)
+
+    def record_card(self, rank: str) -> None:
+        """Record a card by rank, scored through the attached system's table."""
+        start, discarded = self._size, len(self._codes) - self._size
+        self._append(*self._card(rank))
+        self._publish_appended(start, discarded=discarded)
+
+    def record_many(self, entries: Iterable[Tuple[str, Optional[float]]]) -> None:
+        """Append several entries in order, as one update.
+
+        Each entry is ``(label, value)`` as for ``record``, or ``(rank, None)``
+        to record a card as ``record_card`` does. Every entry is checked
+        before any is applied, so a bad one leaves the state unchanged.
+        """
+        resolved = [
+            self._card(label) if value is None else self._adjustment(label, value) for label, value in entries
+        ]
+        if not resolved:
+            return
+        start, discarded = self._size, len(self._codes) - self._size
+        if discarded:
+            self._truncate()
+        self._extend([code for code, _ in resolved], [half for _, half in resolved])
+        self._publish_appended(start, discarded=discarded)
+
+    def load(self, codes: bytes, halves: bytes, position: Optional[int] = None) -> None:
+        """Replace the shoe with raw entries, e.g. replayed from a session journal.
+
+        ``codes`` holds one ``LABEL_CODES`` byte per entry and ``halves`` the
+        matching adjustments in half-units as signed bytes. Entries past
+        ``position`` (default: all applied) stay available for redo.
+        """
+        if len(codes) != len(halves):
+            raise ValueError("codes and halves must have the same length")
+        if codes and max(codes) >= len(LABELS):
+            raise ValueError(f"label code {max(codes)} is out of range")
+        self.reset()
+        signed = array("b")
+        signed.frombytes(bytes(halves))
+        self._extend(codes, signed)
+        if position is not None and position != self._size:
+            self.seek(position)
+        else:
+            self._publish_appended(0)
+
+    def _extend(self, codes: Iterable[int], halves: Sequence[int]) -> None:
+        """Append entries at the end of the storage (the redo tail must already be gone)."""
+        self._codes.extend(codes)
+        self._halves.extend(halves)
+        self._prefix.extend(islice(accumulate(halves, initial=self._prefix[-1]), 1, None))
+        stored, counts = self._stored_counts, self._counts
+        size = self._size
+        for code in self._codes[size:]:
+            stored[code] += 1
+            counts[code] += 1
+            size += 1
+            if size % CHECKPOINT_INTERVAL == 0:
+                self._checkpoints.extend(stored)
+        self._size = size
+
+    def _adjustment(self, label: str, value: float) -> Tuple[int, int]:
+        try:
+            code = LABEL_CODES[label]
+        except KeyError:
+            raise ValueError(f"Unknown count label {label!r}") from None
+        return code, to_half_units(value)
+
+    def _card(self, rank: str) -> Tuple[int, int]:
+        if self.system is None:
+            raise ValueError("record_card needs a CountingState created with a counting system")
+        code = LABEL_CODES.get(rank, len(LABELS))
+        if code >= len(RANKS):
+            raise ValueError(f"{rank!r} is not a card rank")
+        return code, self.system.table[code]
+
+    def _append(self, code: int, halves: int) -> None:
+        if len(self._codes) > self._size:
+            self._truncate()
+        self._codes.append(code)
+        self._halves.append(halves)
+        self._prefix.append(self._prefix[-1] + halves)
+        self._stored_counts[code] += 1
+        self._counts[code] += 1
+        self._size += 1
+        if self._size % CHECKPOINT_INTERVAL == 0:
+            self._checkpoints.extend(self._stored_counts)
+
+    def seek(self, position: int) -> bool:
+        """Move to ``position`` (0 to ``end``) without replaying entries.
+
+        Returns ``True`` when the position changed.
+        """
+        if not 0 <= position <= len(self._codes):
+            raise IndexError(f"position {position} is outside 0..{len(self._codes)}")
+        previous = self._size
+        if position == previous:
+            return False
+        self._size = position
+        self._counts = list(self.label_counts_at(position))
+        if position > previous:
+            self._publish_appended(previous, redone=True)
+        else:
+            if self._listeners:
+                self._publish(EntriesRemoved(position, previous - position))
+            self._publish_capabilities()
+        return True
 
     def undo(self) -> Optional[CountEntry]:
         """Remove and return the most recent entry if one exists."""
-        if not self.history or self._undos_since_record >= self._undo_limit:
+        if not self._size:
             return None
-        entry = self.history.pop()
-        self._redo_stack.append(entry)
-        self._undos_since_record += 1
-        if len(self._redo_stack) > self._redo_limit:
-            self._redo_stack.pop(0)
-        return entry
+        self._size -= 1
+        self._counts[self._codes[self._size]] -= 1
+        if self._listeners:
+            self._publish(EntriesRemoved(self._size, 1))
+        self._publish_capabilities()
+        return self._entry_at(self._size)
 
     def redo(self) -> Optional[CountEntry]:
         """Reapply the most recently undone entry if available."""
-        if not self._redo_stack:
+        if self._size >= len(self._codes):
             return None
-        entry = self._redo_stack.pop()
-        self.history.append(entry)
-        if self._undos_since_record:
-            self._undos_since_record -= 1
-        return entry
+        self._counts[self._codes[self._size]] += 1
+        self._size += 1
+        self._publish_appended(self._size - 1, redone=True)
+        return self._entry_at(self._size - 1)
+
+    def running_count_at(self, position: int) -> float:
+        """Running count after the first ``position`` entries."""
+        return (self._initial_halves + self._prefix[position]) / 2
+
+    def label_counts_at(self, position: int) -> Tuple[int, ...]:
+        """How many times each label in ``LABELS`` was recorded in the first ``position`` entries."""
+        if not 0 <= position <= len(self._codes):
+            raise IndexError(f"position {position} is outside 0..{len(self._codes)}")
+        width = len(LABELS)
+        checkpoint = position // CHECKPOINT_INTERVAL
+        counts = list(self._checkpoints[checkpoint * width:(checkpoint + 1) * width])
+        for code in self._codes[checkpoint * CHECKPOINT_INTERVAL:position]:
+            counts[code] += 1
+        return tuple(counts)
+
+    def _truncate(self) -> None:
+        """Drop the redo tail so a new entry can follow the current position."""
+        size = self._size
+        del self._codes[size:]
+        del self._halves[size:]
+        del self._prefix[size + 1:]
+        del self._checkpoints[(size // CHECKPOINT_INTERVAL + 1) * len(LABELS):]
+        self._stored_counts = list(self.label_counts_at(size))
+
+    @staticmethod
+    def _build_class_ranks(system: Optional["CountingSystem"]) -> Tuple[Tuple[int, ...], ...]:
+        """Rank indexes each card class draws from, in CARD_CLASSES order."""
+        if system is None:
+            everything = tuple(range(len(RANKS)))
+            return (everything,) * len(CARD_CLASSES)
+        table = system.table
+        return (
+            tuple(index for index, halves in enumerate(table) if halves > 0),
+            tuple(index for index, halves in enumerate(table) if halves < 0),
+            tuple(index for index, halves in enumerate(table) if halves == 0),
+        )
+
+    def _entry_at(self, position: int) -> CountEntry:
+        return CountEntry(LABELS[self._codes[position]], self._halves[position] / 2)
 
     @property
     def can_undo(self) -> bool:
         """Indicate whether an undo action is currently allowed."""
-        return bool(self.history) and self._undos_since_record < self._undo_limit
+        return self._size > 0
 
     @property
     def can_redo(self) -> bool:
         """Indicate whether a redo action is currently allowed."""
-        return bool(self._redo_stack)
+        return self._size < len(self._codes)
 
     @property
     def running_count(self) -> float:
-        """Current running count derived from all history entries."""
-        return sum(entry.value for entry in self.history)
+        """Current running count, read from the prefix sums."""
+        return (self._initial_halves + self._prefix[self._size]) / 2
 
     @property
     def cards_seen(self) -> int:
         """Total number of cards/presses recorded."""
-        return len(self.history)
+        return self._size
+
+    @property
+    def composition(self) -> Tuple[float, ...]:
+        """Expected cards left of each rank in ``RANKS`` order.
+
+        Exact when every card was entered by rank; class presses are spread
+        over their ranks in proportion to what each still holds.
+        """
+        per_rank = SUITS * float(self.decks_total)
+        remaining = [max(0.0, per_rank - seen) for seen in self._counts[:len(RANKS)]]
+        for class_index, ranks in enumerate(self._class_ranks):
+            removed = self._counts[len(RANKS) + class_index]
+            if not removed:
+                continue
+            available = sum(remaining[rank] for rank in ranks)
+            if available <= 0:
+                continue
+            keep = max(0.0, available - removed) / available
+            for rank in ranks:
+                remaining[rank] *= keep
+        return tuple(remaining)
+
+    @property
+    def cards_remaining(self) -> float:
+        """Cards left in the shoe according to the composition."""
+        return sum(self.composition)
 
     @property
     def decks_remaining(self) -> float:
-        """Estimated number of decks left, clamped to zero."""
-        remaining = self.decks_total - (self.cards_seen / 52.0)
-        return remaining if remaining > 0 else 0.0
+        """Decks left in the shoe, clamped to zero."""
+        return self.cards_remaining / CARDS_PER_DECK
+
+    def rank_probabilities(self) -> Tuple[float, ...]:
+        """Chance that the next card is each rank, in ``RANKS`` order."""
+        composition = self.composition
+        total = sum(composition)
+        if total <= 0:
+            return (0.0,) * len(RANKS)
+        return tuple(cards / total for cards in composition)
+
+    @property
+    def ace_side_count(self) -> float:
+        """Aces left beyond what an average shoe would hold at this depth.
+
+        Positive values mean the remaining cards are ace-rich.
+        """
+        composition = self.composition
+        total = sum(composition)
+        return composition[LABEL_CODES["A"]] - total / len(RANKS)
 
     @property
     def true_count(self) -> float:
-        """True count computed against the decks that remain."""
-        if not self.history:
-            return 0.0
+        """True count computed against the decks that remain.
+
+        The running count includes the initial running count of unbalanced
+        systems, so the true count before the first card is not zero for them.
+        """
         decks_remaining = max(0.25, self.decks_remaining)
         return self.running_count / decks_remaining
@@ -0,0 +1,365 @@
+"""Player expected values and best plays for the cards left in the shoe.
+
+For a player hand against a dealer upcard this works out the EV of
+standing, hitting, doubling, splitting and (late) surrendering, per unit
+bet, then picks the best. The dealer side comes from ``dealer.DealerEngine``
+and is exact for the shoe. Player draws use the composition at the moment
+of the decision; cards the player draws are not taken back out of the
+dealer's shoe. That is the usual simplification that keeps a full
+strategy table to a few milliseconds in pure Python.
+
+Decisions assume the dealer has checked for blackjack (US peek rules), so
+a ten or ace upcard is handled conditioned on no dealer blackjack.
+
+Everything for one (shoe, upcard) pair is computed once and cached, so all
+hands asked about under the same composition share the work.
+
+Run ``python -m blackjack_counter.strategy --help`` to print a table.
+"""
+
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from blackjack_counter.dealer import (
+    ACE,
+    CARD_NAMES,
+    CARD_VALUES,
+    DEFAULT_MAX_ENTRIES,
+    OUTCOMES,
+    TEN,
+    DealerEngine,
+    Shoe,
+    full_shoe,
+    hand_total,
+    remove_card,
+)
+
+STAND = "stand"
+HIT = "hit"
+DOUBLE = "double"
+SPLIT = "split"
+SURRENDER = "surrender"
+ACTIONS = (STAND, HIT, DOUBLE, SPLIT, SURRENDER)
+ACTION_CODES = {STAND: "S", HIT: "H", DOUBLE: "D", SPLIT: "P", SURRENDER: "R"}
+
+HARD = "hard"
+SOFT = "soft"
+PAIR = "pair"
+HARD_TOTALS = tuple(range(5, 21))
+SOFT_TOTALS = tuple(range(13, 21))
+DEFAULT_MAX_ANALYSES = 512
+
+# Dealer outcome index for each final total 17..21.
+_DEALER_TOTAL_INDEX = {total: OUTCOMES.index(str(total)) for total in range(17, 22)}
+
+
+@dataclass(frozen=True)
+class Rules:
+    """Table rules that change the player's options."""
+
+    hits_soft_17: bool = False
+    double_after_split: bool = True
+    max_split_hands: int = 4
+    resplit_aces: bool = False
+    hit_split_aces: bool = False
+    surrender: bool = False
+
+
+@dataclass(frozen=True)
+class Advice:
+    """EV of each allowed action for one hand, per unit of the original bet."""
+
+    evs: Mapping[str, float] = field(default_factory=dict)
+
+    @property
+    def best(self) -> str:
+        return max(self.evs, key=self.evs.__getitem__)
+
+    @property
+    def best_ev(self) -> float:
+        return self.evs[self.best]
+
+
+class UpcardAnalysis:
+    """Every EV the engine needs for one shoe and dealer upcard."""
+
+    def __init__(self, shoe: Shoe, upcard: int, rules: Rules, dealer: DealerEngine) -> None:
+        total = sum(shoe)
+        if total <= 0:
+            raise ValueError("the shoe is empty")
+        self.upcard = upcard
+        self.rules = rules
+        self.probabilities = tuple(count / total for count in shoe)
+        self.dealer = dealer.outcomes(shoe, upcard, peeked=True)
+        self._stand = self._stand_table()
+        self._best: Dict[Tuple[int, bool], float] = {}
+        self._hit: Dict[Tuple[int, bool], float] = {}
+
+    def stand(self, hard: int, has_ace: bool) -> float:
+        best, _ = hand_total(hard, has_ace)
+        return -1.0 if best > 21 else self._stand[max(best, 16)]
+
+    def hit(self, hard: int, has_ace: bool) -> float:
+        key = (hard, has_ace)
+        cached = self._hit.get(key)
+        if cached is None:
+            cached = 0.0
+            for slot, p in enumerate(self.probabilities):
+                if p:
+                    cached += p * self._play_on(hard + CARD_VALUES[slot], has_ace or slot == ACE)
+            self._hit[key] = cached
+        return cached
+
+    def double(self, hard: int, has_ace: bool) -> float:
+        ev = 0.0
+        for slot, p in enumerate(self.probabilities):
+            if p:
+                ev += p * self.stand(hard + CARD_VALUES[slot], has_ace or slot == ACE)
+        return 2.0 * ev
+
+    def split(self, slot: int) -> float:
+        """EV of splitting a pair of ``slot`` cards, over both (or more) hands."""
+
+        rules = self.rules
+        is_ace = slot == ACE
+        value = CARD_VALUES[slot]
+        resplit = rules.resplit_aces or not is_ace
+        max_hands = max(2, rules.max_split_hands) if resplit else 2
+
+        def post_split(other: int) -> float:
+            hard = value + CARD_VALUES[other]
+            has_ace = is_ace or other == ACE
+            if is_ace and not rules.hit_split_aces:
+                return self.stand(hard, has_ace)
+            best = max(self.stand(hard, has_ace), self.hit(hard, has_ace))
+            if rules.double_after_split:
+                best = max(best, self.double(hard, has_ace))
+            return best
+
+        p_pair = self.probabilities[slot]
+        # EV contributed by a split hand whose second card is not another pair card.
+        other_ev = sum(p * post_split(other) for other, p in enumerate(self.probabilities) if p and other != slot)
+        pair_ev = post_split(slot)
+
+        # open_hands still need a second card; hands is how many exist in total.
+        memo: Dict[Tuple[int, int], float] = {}
+
+        def expected(open_hands: int, hands: int) -> float:
+            if open_hands == 0:
+                return 0.0
+            key = (open_hands, hands)
+            if key not in memo:
+                rest = expected(open_hands - 1, hands)
+                if hands < max_hands:
+                    drew_pair = expected(open_hands + 1, hands + 1)
+                else:
+                    drew_pair = pair_ev + rest
+                memo[key] = p_pair * drew_pair + other_ev + (1.0 - p_pair) * rest
+            return memo[key]
+
+        return expected(2, 2)
+
+    def advise(self, hard: int, has_ace: bool, *, pair: Optional[int] = None, first_two: bool = True) -> Advice:
+        evs = {STAND: self.stand(hard, has_ace), HIT: self.hit(hard, has_ace)}
+        if first_two:
+            evs[DOUBLE] = self.double(hard, has_ace)
+            if pair is not None:
+                evs[SPLIT] = self.split(pair)
+            if self.rules.surrender:
+                evs[SURRENDER] = -0.5
+        return Advice(evs)
+
+    def _stand_table(self) -> Dict[int, float]:
+        dealer = self.dealer
+        bust = dealer[0]
+        table = {}
+        for player in range(16, 22):
+            ev = bust
+            for total, index in _DEALER_TOTAL_INDEX.items():
+                if total < player:
+                    ev += dealer[index]
+                elif total > player:
+                    ev -= dealer[index]
+            table[player] = ev
+        return table
+
+    def _play_on(self, hard: int, has_ace: bool) -> float:
+        """Best of standing or hitting again after taking a card."""
+
+        best, _ = hand_total(hard, has_ace)
+        if best > 21:
+            return -1.0
+        key = (hard, has_ace)
+        cached = self._best.get(key)
+        if cached is None:
+            stand = self.stand(hard, has_ace)
+            cached = stand if best == 21 else max(stand, self.hit(hard, has_ace))
+            self._best[key] = cached
+        return cached
+
+
+@dataclass
+class StrategyTable:
+    """Best play for every starting hand against every upcard still possible."""
+
+    rules: Rules
+    cells: Dict[Tuple[str, int, int], Advice]
+    upcards: Tuple[int, ...]
+
+    def advice(self, kind: str, total: int, upcard: int) -> Optional[Advice]:
+        """``total`` is the hand total, or the card slot for pairs."""
+
+        return self.cells.get((kind, total, upcard))
+
+    def format(self) -> str:
+        """Chart of action letters (S, H, D, P, R) in the usual layout."""
+
+        rows: List[str] = ["      " + "".join(CARD_NAMES[upcard].rjust(3) for upcard in self.upcards)]
+        sections = (
+            (HARD, HARD_TOTALS, lambda total: f"H{total}"),
+            (SOFT, SOFT_TOTALS, lambda total: f"S{total}"),
+            (PAIR, range(len(CARD_VALUES)), lambda slot: f"{CARD_NAMES[slot]},{CARD_NAMES[slot]}"),
+        )
+        for kind, totals, name in sections:
+            for total in totals:
+                letters = []
+                for upcard in self.upcards:
+                    advice = self.cells.get((kind, total, upcard))
+                    letters.append(ACTION_CODES[advice.best] if advice else "-")
+                rows.append(name(total).ljust(6) + "".join(letter.rjust(3) for letter in letters))
+        return "\n".join(rows)
+
+
+class StrategyEngine:
+    """Player EVs for a live shoe, cached per (shoe, upcard)."""
+
+    def __init__(
+        self,
+        rules: Rules = Rules(),
+        *,
+        dealer: Optional[DealerEngine] = None,
+        max_analyses: int = DEFAULT_MAX_ANALYSES,
+        max_dealer_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.rules = rules
+        self.dealer = dealer or DealerEngine(rules.hits_soft_17, max_entries=max_dealer_entries)
+        if self.dealer.hits_soft_17 != rules.hits_soft_17:
+            raise ValueError("the dealer engine and rules disagree on soft 17")
+        self.max_analyses = max(1, max_analyses)
+        self._analyses: "OrderedDict[Tuple[Shoe, int], UpcardAnalysis]" = OrderedDict()
+
+    def analysis(self, shoe: Shoe, upcard: int) -> UpcardAnalysis:
+        """Cached analysis for ``upcard`` with ``shoe`` holding the unseen cards."""
+
+        key = (shoe, upcard)
+        cached = self._analyses.get(key)
+        if cached is not None:
+            self._analyses.move_to_end(key)
+            return cached
+        analysis = UpcardAnalysis(shoe, upcard, self.rules, self.dealer)
+        self._analyses[key] = analysis
+        if len(self._analyses) > self.max_analyses:
+            self._analyses.popitem(last=False)
+        return analysis
+
+    def advise(self, shoe: Shoe, cards: Sequence[int], upcard: int) -> Advice:
+        """Best play for the player's ``cards`` (shoe slots) against ``upcard``.
+
+        ``shoe`` is the unseen cards, so the player's cards and the upcard
+        should already be out of it.
+        """
+
+        if not cards:
+            raise ValueError("a hand needs at least one card")
+        hard = sum(CARD_VALUES[slot] for slot in cards)
+        has_ace = ACE in cards
+        first_two = len(cards) == 2
+        pair = cards[0] if first_two and cards[0] == cards[1] else None
+        return self.analysis(shoe, upcard).advise(hard, has_ace, pair=pair, first_two=first_two)
+
+    def advise_hand(self, shoe: Shoe, kind: str, total: int, upcard: int) -> Advice:
+        """Best play for a two-card hand described as in ``StrategyTable``."""
+
+        analysis = self.analysis(shoe, upcard)
+        if kind == PAIR:
+            return analysis.advise(2 * CARD_VALUES[total], total == ACE, pair=total)
+        if kind == SOFT:
+            return analysis.advise(total - 10, True)
+        return analysis.advise(total, False)
+
+    def table(self, shoe: Shoe) -> StrategyTable:
+        """Best play for every starting hand against every upcard in ``shoe``."""
+
+        upcards = tuple(slot for slot, count in enumerate(shoe) if count and sum(shoe) > 1)
+        cells: Dict[Tuple[str, int, int], Advice] = {}
+        for upcard in upcards:
+            rest = remove_card(shoe, upcard)
+            for total in HARD_TOTALS:
+                cells[(HARD, total, upcard)] = self.advise_hand(rest, HARD, total, upcard)
+            for total in SOFT_TOTALS:
+                cells[(SOFT, total, upcard)] = self.advise_hand(rest, SOFT, total, upcard)
+            for slot in range(len(CARD_VALUES)):
+                cells[(PAIR, slot, upcard)] = self.advise_hand(rest, PAIR, slot, upcard)
+        return StrategyTable(self.rules, cells, upcards)
+
+    def clear(self) -> None:
+        self._analyses.clear()
+        self.dealer.clear()
+
+
+def hand_choices() -> List[Tuple[str, str, int]]:
+    """(label, kind, total) for every starting hand, in chart order."""
+
+    choices = [(f"Hard {total}", HARD, total) for total in HARD_TOTALS]
+    choices += [(f"Soft {total} (A,{total - 11})", SOFT, total) for total in SOFT_TOTALS]
+    choices += [(f"Pair {name}s", PAIR, slot) for slot, name in enumerate(CARD_NAMES)]
+    return choices
+
+
+def hand_cards(kind: str, total: int) -> Tuple[int, int]:
+    """Shoe slots of two cards making the hand ``(kind, total)`` from ``hand_choices``.
+
+    Pairs and soft hands fix both cards. A hard total can be dealt many
+    ways, so it gets representative cards: a ten and the rest from 12 up
+    (10,6 for hard 16), two different middling cards below that.
+    """
+
+    if kind == PAIR:
+        return total, total
+    if kind == SOFT:
+        return ACE, CARD_VALUES.index(total - 11)
+    if total >= 12:
+        return TEN, CARD_VALUES.index(total - 10)
+    high, low = total - total // 2, total // 2
+    if high == low:
+        high, low = high + 1, low - 1
+    return CARD_VALUES.index(high), CARD_VALUES.index(low)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Print the composition-dependent strategy chart for a full shoe.")
+    parser.add_argument("--decks", type=int, default=6, help="decks in the shoe (default: 6)")
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument("--no-das", action="store_true", help="no doubling after a split")
+    parser.add_argument("--split-hands", type=int, default=4, help="most hands a split can make (default: 4)")
+    parser.add_argument("--resplit-aces", action="store_true", help="aces may be resplit")
+    parser.add_argument("--surrender", action="store_true", help="late surrender is offered")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    rules = Rules(
+        hits_soft_17=args.h17,
+        double_after_split=not args.no_das,
+        max_split_hands=args.split_hands,
+        resplit_aces=args.resplit_aces,
+        surrender=args.surrender,
+    )
+    print(StrategyEngine(rules).table(full_shoe(args.decks)).format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Registry of card-counting systems defined as data.
+
+Every system lists a tag per rank plus a few flags. On registration the tags
+are compiled once into a 13-slot table of integer half-units, indexed the
+same way as ``state.RANKS``. The UI frames, ``CountingState`` and any batch
+or simulation code all score cards through that table, so adding a system is
+a matter of registering another ``CountingSystem``.
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from blackjack_counter.state import RANKS, SUITS, to_half_units
+
+RANK_INDEX = {rank: index for index, rank in enumerate(RANKS)}
+
+
+@dataclass(frozen=True, eq=False)
+class CountingSystem:
+    """A counting system: per-rank tags plus how the count starts."""
+
+    key: str
+    name: str
+    tags: Mapping[str, float]
+    balanced: bool = True
+    irc_per_deck: float = 0.0
+    irc_offset: float = 0.0
+    ace_side_count: bool = False
+    table: Tuple[int, ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        missing = [rank for rank in RANKS if rank not in self.tags]
+        if missing:
+            raise ValueError(f"{self.name} is missing tags for {', '.join(missing)}")
+        unknown = sorted(set(self.tags) - set(RANKS))
+        if unknown:
+            raise ValueError(f"{self.name} has tags for unknown ranks {', '.join(unknown)}")
+
+        table = tuple(to_half_units(self.tags[rank]) for rank in RANKS)
+        deck_total = SUITS * sum(table)
+        if self.balanced != (deck_total == 0):
+            kind = "balanced" if self.balanced else "unbalanced"
+            raise ValueError(f"{self.name} is declared {kind} but a full deck sums to {deck_total / 2:+g}")
+
+        object.__setattr__(self, "tags", MappingProxyType(dict(self.tags)))
+        object.__setattr__(self, "table", table)
+
+    def tag(self, rank: str) -> float:
+        """Count adjustment for a single card of ``rank``."""
+
+        return self.table[RANK_INDEX[rank]] / 2
+
+    def initial_running_count(self, decks: float) -> float:
+        """Running count at the start of a shoe with ``decks`` decks."""
+
+        if self.balanced:
+            return 0.0
+        return round((self.irc_offset + self.irc_per_deck * decks) * 2) / 2
+
+    def score(self, ranks: Iterable[int]) -> int:
+        """Sum the half-unit tags for a sequence of rank indexes."""
+
+        table = self.table
+        return sum(table[rank] for rank in ranks)
+
+
+_REGISTRY: Dict[str, CountingSystem] = {}
+
+
+def register(system: CountingSystem) -> CountingSystem:
+    """Add ``system`` to the registry, replacing any system with the same key."""
+
+    _REGISTRY[system.key] = system
+    return system
+
+
+def get_system(key: str) -> CountingSystem:
+    """Look up a registered system by key."""
+
+    try:
+        return _REGISTRY[key]
+    except KeyError:
+        raise KeyError(f"No counting system registered as {key!r}") from None
+
+
+def registered_systems() -> Tuple[CountingSystem, ...]:
+    """All registered systems in registration order."""
+
+    return tuple(_REGISTRY.values())
+
+
+def score_many(systems: Sequence[CountingSystem], ranks: Iterable[int]) -> List[int]:
+    """Score one pass over ``ranks`` for several systems at once.
+
+    Returns the half-unit running total for each system, in order.
+    """
+
+    # Transpose the tables so each card needs a single lookup.
+    columns = list(zip(*(system.table for system in systems))) if systems else []
+    totals = [0] * len(systems)
+    for rank in ranks:
+        row = columns[rank]
+        for slot, halves in enumerate(row):
+            totals[slot] += halves
+    return totals
+
+
+def _tags(values: Sequence[float]) -> Dict[str, float]:
+    """Expand 10 values (2 through 9, ten-valued, ace) to the 13 ranks."""
+
+    *low, ten, ace = values
+    tags = dict(zip(RANKS[:8], low))
+    tags.update({"10": ten, "J": ten, "Q": ten, "K": ten, "A": ace})
+    return tags
+
+
+HI_LO = register(CountingSystem(
+    key="hilo",
+    name="Hi-Lo",
+    tags=_tags((1, 1, 1, 1, 1, 0, 0, 0, -1, -1)),
+))
+WONG_HALVES = register(CountingSystem(
+    key="wong_halves",
+    name="Wong Halves",
+    tags=_tags((0.5, 1, 1, 1.5, 1, 0.5, 0, -0.5, -1, -1)),
+))
+KO = register(CountingSystem(
+    key="ko",
+    name="KO",
+    tags=_tags((1, 1, 1, 1, 1, 1, 0, 0, -1, -1)),
+    balanced=False,
+    irc_per_deck=-4,
+    irc_offset=4,
+))
+HI_OPT_II = register(CountingSystem(
+    key="hi_opt_2",
+    name="Hi-Opt II",
+    tags=_tags((1, 1, 2, 2, 1, 1, 0, 0, -2, 0)),
+    ace_side_count=True,
+))
+OMEGA_II = register(CountingSystem(
+    key="omega_2",
+    name="Omega II",
+    tags=_tags((1, 1, 2, 2, 2, 1, 0, -1, -2, 0)),
+    ace_side_count=True,
+))
+ZEN = register(CountingSystem(
+    key="zen",
+    name="Zen",
+    tags=_tags((1, 1, 2, 2, 2, 1, 0, 0, -2, -1)),
+))
+# Red 7 counts red sevens as +1 and black sevens as 0. Cards are entered by
+# rank only, so a seven carries the average of the two.
+RED_7 = register(CountingSystem(
+    key="red_7",
+    name="Red 7",
+    tags=_tags((1, 1, 1, 1, 1, 0.5, 0, 0, -1, -1)),
+    balanced=False,
+    irc_per_deck=-2,
+))
@@ -0,0 +1,506 @@
+"""Full-table round simulator: several seats, real rules, whole shoes.
+
+Shoes are shuffled in NumPy batches, one row per shoe, and every shoe in a
+batch plays the same round at the same time: burn cards, a deal of two
+cards to each seat and the dealer, the dealer's peek, each seat's hands in
+seat order (with splits, doubles and surrender), then the dealer's hand.
+A shoe is reshuffled once a round ends past the cut card. Rows only differ
+in data, never in code path: every decision is a lookup in the strategy
+arrays built by ``strategy_arrays`` (indexed by hand context, soft flag,
+hard total and upcard), so a batch costs the same number of NumPy calls
+however many shoes it holds.
+
+All seats play basic strategy for the full shoe and bet one unit. The
+true count at the start of each round is read for every counting system
+from the cards seen so far (burn cards stay hidden), using the same tag
+tables as the counting frames, and each seat's result is added to that
+count's bucket. Results are kept in tenths of a unit so blackjack payouts
+such as 6:5 stay exact, and accumulators merge exactly through
+``parallel.ParallelRunner``.
+
+Run ``python -m blackjack_counter.table_sim --help``.
+"""
+
+import argparse
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from blackjack_counter.dealer import ACE, RANK_SLOTS, full_shoe, remove_card
+from blackjack_counter.parallel import ParallelRunner, new_seed
+from blackjack_counter.simulation import (
+    MIN_DECKS_DIVISOR,
+    TC_MAX,
+    TC_MIN,
+    cut_positions,
+    deal_shoes,
+    print_progress,
+    units_for,
+)
+from blackjack_counter.state import CARDS_PER_DECK
+from blackjack_counter.strategy import DOUBLE, HIT, SPLIT, STAND, SURRENDER, Rules, StrategyEngine
+from blackjack_counter.systems import get_system, registered_systems
+
+DEFAULT_SEATS = 5
+DEFAULT_PENETRATION = 0.75
+DEFAULT_BURN_CARDS = 1
+DEFAULT_BLACKJACK_PAYOUT = 1.5
+DEFAULT_BATCH_SIZE = 8192
+DEFAULT_UNIT_SHOES = 32_768
+DEFAULT_SYSTEMS: Tuple[str, ...] = ("hilo", "wong_halves")
+# Results are stored in tenths of a unit bet.
+RESULT_SCALE = 10
+
+# Action codes in the strategy arrays.
+ACT_STAND, ACT_HIT, ACT_DOUBLE, ACT_SPLIT, ACT_SURRENDER = range(5)
+_ACTION_CODES = {STAND: ACT_STAND, HIT: ACT_HIT, DOUBLE: ACT_DOUBLE, SPLIT: ACT_SPLIT, SURRENDER: ACT_SURRENDER}
+# Hand contexts: the first two cards, two cards after a split, or more.
+OPENING, SPLIT_HAND, DRAWN = range(3)
+_MAX_HARD = 32
+
+# Shoe rows hold rank indexes (``state.RANKS`` order).
+_SLOT_OF_RANK = np.array(RANK_SLOTS, dtype=np.int8)
+_VALUE_OF_SLOT = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 1], dtype=np.int16)
+
+
+def _best(hard: np.ndarray, ace: np.ndarray) -> np.ndarray:
+    return hard + 10 * (ace & (hard <= 11))
+
+
+@lru_cache(maxsize=16)
+def strategy_arrays(decks: int, rules: Rules) -> Tuple[np.ndarray, np.ndarray]:
+    """Basic strategy for a full shoe as lookup arrays.
+
+    Returns ``actions[context, soft, hard, upcard]`` (action codes, with
+    upcards and pairs as ``dealer`` slots) and ``splits[pair, upcard]``,
+    which is true where a pair should be split.
+    """
+
+    engine = StrategyEngine(rules)
+    shoe = full_shoe(decks)
+    actions = np.full((3, 2, _MAX_HARD, len(_VALUE_OF_SLOT)), ACT_STAND, dtype=np.int8)
+    splits = np.zeros((len(_VALUE_OF_SLOT), len(_VALUE_OF_SLOT)), dtype=bool)
+    for upcard in range(len(_VALUE_OF_SLOT)):
+        analysis = engine.analysis(remove_card(shoe, upcard), upcard)
+        for has_ace in (False, True):
+            for hard in range(2, 21):
+                if hard + (10 if has_ace and hard <= 11 else 0) >= 21:
+                    continue
+                evs = dict(analysis.advise(hard, has_ace).evs)
+                opening = max(evs, key=evs.__getitem__)
+                evs.pop(SURRENDER, None)
+                if not rules.double_after_split:
+                    evs.pop(DOUBLE)
+                after_split = max(evs, key=evs.__getitem__)
+                drawn = analysis.advise(hard, has_ace, first_two=False).best
+                for context, action in ((OPENING, opening), (SPLIT_HAND, after_split), (DRAWN, drawn)):
+                    actions[context, int(has_ace), hard, upcard] = _ACTION_CODES[action]
+        for pair in range(len(_VALUE_OF_SLOT)):
+            value = int(_VALUE_OF_SLOT[pair])
+            splits[pair, upcard] = analysis.advise(2 * value, pair == ACE, pair=pair).best == SPLIT
+    return actions, splits
+
+
+@dataclass
+class RoundSums:
+    """Seat results per counting system and true-count bucket.
+
+    ``hands[s, b]`` counts seat-rounds that started in bucket ``b`` for
+    system ``s``; ``results`` and ``squares`` sum the seat's result (in
+    tenths of a unit) and its square.
+    """
+
+    systems: Tuple[str, ...]
+    hands: np.ndarray
+    results: np.ndarray
+    squares: np.ndarray
+    rounds: int = 0
+    shoes: int = 0
+
+    @classmethod
+    def empty(cls, systems: Sequence[str]) -> "RoundSums":
+        shape = (len(systems), TC_MAX - TC_MIN + 1)
+        return cls(tuple(systems), *(np.zeros(shape, dtype=np.int64) for _ in range(3)))
+
+    def merge(self, other: "RoundSums") -> None:
+        if self.systems != other.systems:
+            raise ValueError("Cannot merge round sums for different systems")
+        self.hands += other.hands
+        self.results += other.results
+        self.squares += other.squares
+        self.rounds += other.rounds
+        self.shoes += other.shoes
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "hands": self.hands,
+            "results": self.results,
+            "squares": self.squares,
+            "rounds": np.array(self.rounds, dtype=np.int64),
+            "shoes": np.array(self.shoes, dtype=np.int64),
+        }
+
+    def load_arrays(self, arrays: Mapping[str, np.ndarray]) -> None:
+        self.hands[...] = arrays["hands"]
+        self.results[...] = arrays["results"]
+        self.squares[...] = arrays["squares"]
+        self.rounds = int(arrays["rounds"])
+        self.shoes = int(arrays["shoes"])
+
+    @property
+    def true_counts(self) -> np.ndarray:
+        return np.arange(TC_MIN, TC_MAX + 1)
+
+    def edge(self) -> float:
+        """Player expectation per hand over all rounds, in units."""
+
+        hands = self.hands[0].sum()
+        return float(self.results[0].sum() / (RESULT_SCALE * hands)) if hands else 0.0
+
+    def edges(self) -> np.ndarray:
+        """Mean result per bucket in units (NaN where no hands were played)."""
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.results / (RESULT_SCALE * self.hands)
+
+    def variances(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_square = self.squares / (RESULT_SCALE ** 2 * self.hands)
+        return mean_square - self.edges() ** 2
+
+    def format(self) -> str:
+        lines = [f"{self.rounds:,} rounds from {self.shoes:,} shoes, player edge {self.edge():+.3%}"]
+        header = "TC".rjust(5)
+        for key in self.systems:
+            header += f"{key:>28}"
+        lines.append(header)
+        lines.append(" " * 5 + "      freq     edge      var" * len(self.systems))
+        totals = self.hands.sum(axis=1, keepdims=True)
+        frequencies = self.hands / np.maximum(totals, 1)
+        edges, variances = self.edges(), self.variances()
+        for bucket, true_count in enumerate(self.true_counts):
+            row = f"{true_count:>+5d}"
+            for system in range(len(self.systems)):
+                if self.hands[system, bucket]:
+                    row += (
+                        f"{frequencies[system, bucket]:>10.2%}{edges[system, bucket]:>+9.2%}"
+                        f"{variances[system, bucket]:>9.2f}"
+                    )
+                else:
+                    row += " " * 28
+            lines.append(row)
+        return "\n".join(lines)
+
+
+class _Round:
+    """One round dealt from the same position of many shoes at once."""
+
+    def __init__(self, task: "TableTask", shoes: np.ndarray, rows: np.ndarray, cursor: np.ndarray) -> None:
+        self.task = task
+        self.shoes = shoes
+        self.cards = shoes.shape[1]
+        self.rows = rows
+        self.cursor = cursor
+        count = len(rows)
+        shape = (count, task.seats, task.max_hands)
+        self.hard = np.zeros(shape, dtype=np.int16)
+        self.ace = np.zeros(shape, dtype=bool)
+        self.ncards = np.zeros(shape, dtype=np.int8)
+        self.first = np.zeros(shape, dtype=np.int8)
+        self.second = np.zeros(shape, dtype=np.int8)
+        self.stake = np.zeros(shape, dtype=np.int8)
+        self.surrendered = np.zeros(shape, dtype=bool)
+        self.hands = np.ones((count, task.seats), dtype=np.int8)
+        self.split = np.zeros((count, task.seats), dtype=bool)
+
+    def draw(self, index: np.ndarray) -> np.ndarray:
+        """Next card slot for each of the rows in ``index``.
+
+        A round that runs off the end of a shoe carries on from its start,
+        as if the discards were shuffled back in.
+        """
+
+        slots = _SLOT_OF_RANK[self.shoes[self.rows[index], self.cursor[index] % self.cards]]
+        self.cursor[index] += 1
+        return slots
+
+    def give(self, index: np.ndarray, seat: int, hand: int) -> None:
+        if not index.size:
+            return
+        slots = self.draw(index)
+        self.hard[index, seat, hand] += _VALUE_OF_SLOT[slots]
+        self.ace[index, seat, hand] |= slots == ACE
+        one_card = self.ncards[index, seat, hand] == 1
+        self.second[index[one_card], seat, hand] = slots[one_card]
+        self.ncards[index, seat, hand] += 1
+
+    def deal(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Two cards to every seat and the dealer; returns upcard and hole slots."""
+
+        seats = self.task.seats
+        offsets = np.arange(2 * seats + 2)
+        positions = (self.cursor[:, None] + offsets) % self.cards
+        slots = _SLOT_OF_RANK[self.shoes[self.rows[:, None], positions]]
+        self.cursor += len(offsets)
+        first, second = slots[:, :seats], slots[:, seats + 1 : 2 * seats + 1]
+        self.first[:, :, 0] = first
+        self.second[:, :, 0] = second
+        self.hard[:, :, 0] = _VALUE_OF_SLOT[first] + _VALUE_OF_SLOT[second]
+        self.ace[:, :, 0] = (first == ACE) | (second == ACE)
+        self.ncards[:, :, 0] = 2
+        self.stake[:, :, 0] = 1
+        return slots[:, seats], slots[:, -1]
+
+    def play_seat(self, seat: int, live: np.ndarray, upcard: np.ndarray, actions: np.ndarray, splits: np.ndarray) -> None:
+        """Play every hand of ``seat`` in order, working only on rows still deciding."""
+
+        task = self.task
+        for hand in range(task.max_hands):
+            index = np.flatnonzero(live & (self.hands[:, seat] > hand))
+            if not index.size:
+                return
+            # Hands made by a split start with one card.
+            self.give(index[self.ncards[index, seat, hand] == 1], seat, hand)
+            while index.size:
+                hard = self.hard[index, seat, hand]
+                ace = self.ace[index, seat, hand]
+                deciding = _best(hard, ace) < 21
+                index, hard, ace = index[deciding], hard[deciding], ace[deciding]
+                if not index.size:
+                    break
+                split_seat = self.split[index, seat]
+                two = self.ncards[index, seat, hand] == 2
+                context = np.where(two, np.where(split_seat, SPLIT_HAND, OPENING), DRAWN)
+                up = upcard[index]
+                action = actions[context, ace.view(np.int8), hard, up]
+
+                first = self.first[index, seat, hand]
+                split_aces = split_seat & (first == ACE)
+                if not task.hit_split_aces:
+                    action[split_aces] = ACT_STAND
+                can_split = two & (first == self.second[index, seat, hand]) & (self.hands[index, seat] < task.max_hands)
+                if not task.resplit_aces:
+                    can_split &= ~split_aces
+                action[can_split & splits[first, up]] = ACT_SPLIT
+
+                splitting = index[action == ACT_SPLIT]
+                if splitting.size:
+                    self._split(splitting, seat, hand)
+                    self.give(splitting, seat, hand)
+                self.surrendered[index[action == ACT_SURRENDER], seat, hand] = True
+                doubling = index[action == ACT_DOUBLE]
+                self.stake[doubling, seat, hand] = 2
+                self.give(doubling, seat, hand)
+                hitting = index[action == ACT_HIT]
+                self.give(hitting, seat, hand)
+                index = np.concatenate([hitting, splitting])
+
+    def _split(self, rows: np.ndarray, seat: int, hand: int) -> None:
+        new = self.hands[rows, seat].astype(np.intp)
+        first = self.first[rows, seat, hand]
+        value = _VALUE_OF_SLOT[first]
+        for target in (new, np.full(len(rows), hand)):
+            self.hard[rows, seat, target] = value
+            self.ace[rows, seat, target] = first == ACE
+            self.ncards[rows, seat, target] = 1
+            self.first[rows, seat, target] = first
+            self.stake[rows, seat, target] = 1
+        self.hands[rows, seat] += 1
+        self.split[rows, seat] = True
+
+    def finish_dealer(self, hard: np.ndarray, ace: np.ndarray, mask: np.ndarray) -> None:
+        index = np.flatnonzero(mask)
+        while index.size:
+            best = _best(hard[index], ace[index])
+            hitting = best < 17
+            if self.task.hits_soft_17:
+                hitting |= (best == 17) & ace[index] & (hard[index] <= 11)
+            index = index[hitting]
+            if not index.size:
+                return
+            slots = self.draw(index)
+            hard[index] += _VALUE_OF_SLOT[slots]
+            ace[index] |= slots == ACE
+
+
+@dataclass(frozen=True)
+class TableTask:
+    """Picklable work-unit description for ``parallel.ParallelRunner``."""
+
+    decks: int = 6
+    seats: int = DEFAULT_SEATS
+    penetration: float = DEFAULT_PENETRATION
+    burn_cards: int = DEFAULT_BURN_CARDS
+    blackjack_payout: float = DEFAULT_BLACKJACK_PAYOUT
+    hits_soft_17: bool = False
+    double_after_split: bool = True
+    surrender: bool = False
+    max_hands: int = 4
+    resplit_aces: bool = False
+    hit_split_aces: bool = False
+    systems: Tuple[str, ...] = DEFAULT_SYSTEMS
+    shoes_per_unit: int = DEFAULT_UNIT_SHOES
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    def __post_init__(self) -> None:
+        if self.seats < 1:
+            raise ValueError("a table needs at least one seat")
+        payout = self.blackjack_payout * RESULT_SCALE
+        if abs(payout - round(payout)) > 1e-9:
+            raise ValueError(f"blackjack payout must be a multiple of 1/{RESULT_SCALE}")
+
+    @property
+    def rules(self) -> Rules:
+        return Rules(
+            hits_soft_17=self.hits_soft_17,
+            double_after_split=self.double_after_split,
+            max_split_hands=self.max_hands,
+            resplit_aces=self.resplit_aces,
+            hit_split_aces=self.hit_split_aces,
+            surrender=self.surrender,
+        )
+
+    def empty(self) -> RoundSums:
+        return RoundSums.empty(self.systems)
+
+    def run_unit(self, rng: np.random.Generator) -> RoundSums:
+        sums = self.empty()
+        remaining = self.shoes_per_unit
+        while remaining > 0:
+            batch = min(self.batch_size, remaining)
+            self.run_batch(rng, batch, sums)
+            remaining -= batch
+        return sums
+
+    def run_batch(self, rng: np.random.Generator, count: int, sums: RoundSums) -> None:
+        """Play ``count`` shoes to the cut card and add their rounds to ``sums``."""
+
+        actions, splits = strategy_arrays(self.decks, self.rules)
+        systems = [get_system(key) for key in self.systems]
+        tables = np.array([system.table for system in systems], dtype=np.int16)
+        initial = np.array([round(system.initial_running_count(self.decks) * 2) for system in systems])
+        payout = round(self.blackjack_payout * RESULT_SCALE)
+
+        shoes = deal_shoes(rng, self.decks, count)
+        cards = shoes.shape[1]
+        cut = cut_positions(self.decks, (self.penetration,))[0]
+        # Running count (half-units) of everything dealt, per system and shoe.
+        prefix = np.zeros((len(systems), count, cards + 1), dtype=np.int32)
+        np.cumsum(tables[:, shoes], axis=2, out=prefix[:, :, 1:])
+        prefix -= prefix[:, :, self.burn_cards : self.burn_cards + 1]
+
+        width = TC_MAX - TC_MIN + 1
+        offsets = (np.arange(len(systems)) * width)[:, None]
+        rows = np.arange(count)
+        cursor = np.full(count, self.burn_cards, dtype=np.int64)
+        while rows.size:
+            halves = prefix[:, rows, cursor] + initial[:, None]
+            decks_left = np.maximum((cards - cursor) / CARDS_PER_DECK, MIN_DECKS_DIVISOR)
+            buckets = np.clip(np.floor(halves / (2 * decks_left)), TC_MIN, TC_MAX).astype(np.intp) - TC_MIN
+
+            results = self._play_round(_Round(self, shoes, rows, cursor), actions, splits, payout)
+
+            flat = np.repeat(buckets + offsets, self.seats, axis=1).ravel()
+            weights = np.tile(results.ravel(), len(systems))
+            size = len(systems) * width
+            sums.hands += np.bincount(flat, minlength=size).reshape(len(systems), width)
+            sums.results += np.rint(np.bincount(flat, weights=weights, minlength=size)).astype(np.int64).reshape(
+                len(systems), width
+            )
+            sums.squares += np.rint(
+                np.bincount(flat, weights=weights.astype(np.float64) ** 2, minlength=size)
+            ).astype(np.int64).reshape(len(systems), width)
+            sums.rounds += rows.size
+
+            going = cursor < cut
+            rows, cursor = rows[going], cursor[going]
+        sums.shoes += count
+
+    def _play_round(self, table: _Round, actions: np.ndarray, splits: np.ndarray, payout: int) -> np.ndarray:
+        """Play one round on every row; returns seat results in tenths, shape (rows, seats)."""
+
+        upcard, hole = table.deal()
+        up_value, hole_value = _VALUE_OF_SLOT[upcard], _VALUE_OF_SLOT[hole]
+        dealer_blackjack = ((upcard == ACE) & (hole_value == 10)) | ((hole == ACE) & (up_value == 10))
+        natural = table.hard[:, :, 0] + 10 * table.ace[:, :, 0] == 21
+
+        for seat in range(self.seats):
+            live = ~dealer_blackjack & ~natural[:, seat]
+            table.play_seat(seat, live, upcard, actions, splits)
+
+        exists = np.arange(self.max_hands) < table.hands[:, :, None]
+        player = _best(table.hard, table.ace)
+        open_hands = exists & (player <= 21) & ~table.surrendered & ~natural[:, :, None]
+        dealer_hard = up_value + hole_value
+        dealer_ace = (upcard == ACE) | (hole == ACE)
+        table.finish_dealer(dealer_hard, dealer_ace, ~dealer_blackjack & open_hands.any(axis=(1, 2)))
+        dealer = _best(dealer_hard, dealer_ace)[:, None, None]
+
+        outcome = np.sign(player - dealer)
+        outcome[(dealer > 21) & (player <= 21)] = 1
+        outcome[player > 21] = -1
+        per_hand = np.where(exists, outcome * table.stake * RESULT_SCALE, 0)
+        per_hand[table.surrendered] = -RESULT_SCALE // 2
+        results = per_hand.sum(axis=2)
+        results = np.where(natural, payout, results)
+        results = np.where(dealer_blackjack[:, None], np.where(natural, 0, -RESULT_SCALE), results)
+        return results.astype(np.int64)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decks", type=int, default=6, help="decks per shoe (default: 6)")
+    parser.add_argument("--seats", type=int, default=DEFAULT_SEATS, help="players at the table (default: 5)")
+    parser.add_argument("--penetration", type=float, default=DEFAULT_PENETRATION, help="cut-card depth")
+    parser.add_argument("--burn", type=int, default=DEFAULT_BURN_CARDS, help="cards burned after the shuffle")
+    parser.add_argument("--payout", type=float, default=DEFAULT_BLACKJACK_PAYOUT, help="blackjack pays (1.5 or 1.2)")
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument("--no-das", action="store_true", help="no doubling after a split")
+    parser.add_argument("--surrender", action="store_true", help="late surrender allowed")
+    parser.add_argument("--split-hands", type=int, default=4, help="most hands a seat can split to")
+    parser.add_argument("--resplit-aces", action="store_true", help="aces may be resplit")
+    parser.add_argument("--hit-split-aces", action="store_true", help="split aces may be hit")
+    parser.add_argument(
+        "--system",
+        action="append",
+        dest="systems",
+        choices=[system.key for system in registered_systems()],
+        help="system to bucket results by; repeat for several (default: hilo and wong_halves)",
+    )
+    parser.add_argument("--shoes", type=int, default=100_000, help="shoes to play (default: 100000)")
+    parser.add_argument("--unit-shoes", type=int, default=DEFAULT_UNIT_SHOES, help="shoes per work unit")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    seed = args.seed if args.seed is not None else new_seed()
+    task = TableTask(
+        decks=args.decks,
+        seats=args.seats,
+        penetration=args.penetration,
+        burn_cards=args.burn,
+        blackjack_payout=args.payout,
+        hits_soft_17=args.h17,
+        double_after_split=not args.no_das,
+        surrender=args.surrender,
+        max_hands=args.split_hands,
+        resplit_aces=args.resplit_aces,
+        hit_split_aces=args.hit_split_aces,
+        systems=tuple(args.systems or DEFAULT_SYSTEMS),
+        shoes_per_unit=args.unit_shoes,
+    )
+    runner = ParallelRunner(
+        task, units_for(args.shoes, args.unit_shoes), seed, workers=args.workers, progress=print_progress
+    )
+    sums = runner.run()
+    print(f"seed {seed}")
+    print(sums.format())
+
+
+if __name__ == "__main__":
+    main()
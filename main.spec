@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets/blackjack_by_freepik.png', 'assets'), ('assets/torta_girl.png', 'assets')],
+    datas=[('assets/blackjack_by_freepik.png', 'assets'), ('assets/torta_girl.png', 'assets'), ('assets/deviations.json', 'assets'), ('assets/ramps.json', 'assets')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},